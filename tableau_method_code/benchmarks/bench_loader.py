@@ -0,0 +1,105 @@
+"""Benchmark of the transaction loader against the preprocessing of experiment.py
+
+Generates a synthetic fitbit-like set of transaction CSVs, then builds the
+lexical dataset both with the steps of experiment.py (splitting the features
+into per-cluster files, reading them back and converting every cell on its
+own) and with tools.loader, checking that the datasets are the same.
+
+Usage:
+    python benchmarks/bench_loader.py [transactions] [events per timeline]
+"""
+
+import os
+import sys
+import random
+import tempfile
+import time
+
+import pandas as pd
+
+from lexapriori_mem.tools import loader, preprocess
+from lexapriori_mem.lex.lex_mem import memLexRepr
+
+
+def generate_files(path, transactions, events, seed=0):
+    random.seed(seed)
+
+    start = pd.Timestamp('2020-01-01')
+    names = {feature: [f'{feature}_{i}_{j}' for i in range(2) for j in range(3)] for feature in loader.FEATURES}
+    names.update({state: [f'{state}_{i}' for i in range(3)] for state in loader.STATES})
+
+    for name, clusters in names.items():
+        rows = []
+        for transaction in range(transactions):
+            t = start + pd.Timedelta(days=transaction)
+            for _ in range(events):
+                length = pd.Timedelta(minutes=random.randint(1, 30))
+                rows.append((transaction, random.choice(clusters), t.strftime(loader.TIMESTAMP_FORMAT),
+                             (t + length).strftime(loader.TIMESTAMP_FORMAT)))
+                t += length + pd.Timedelta(minutes=random.randint(0, 30))
+        # Exported data contains some duplicated rows
+        rows += rows[::17]
+        pd.DataFrame(rows, columns=['transaction', 'cluster', 'begin', 'end']).to_csv(
+            os.path.join(path, f'{name}.csv'), index=False)
+
+
+def legacy_dataset(path, work):
+
+    # Same steps as experiment.py
+    for n in loader.FEATURES:
+        df = pd.read_csv(os.path.join(path, f'{n}.csv'))
+        df["cluster"] = df.cluster.apply(lambda x: "".join(x.split('_')[0:2]) if n != "heart_rate" else "".join(x.split('_')[0:3]))
+        for name, g in df.groupby("cluster"):
+            g.to_csv(os.path.join(work, f"{name}.csv"), index=False)
+    for n in loader.STATES:
+        pd.read_csv(os.path.join(path, f'{n}.csv')).to_csv(os.path.join(work, f'{n}.csv'), index=False)
+
+    feature_files = sorted(os.path.join(work, f) for f in os.listdir(work))
+
+    digit_to_letter = {str(i): chr(ord('A') + i) for i in range(10)}
+
+    def sanitize_label(l):
+        r = l.replace('_', '-')
+        for d in [str(i) for i in range(10)]:
+            r = r.replace(d, digit_to_letter[d])
+        return r
+
+    def sanitize_timestamp(f):
+        return pd.to_datetime(f, format="%Y-%m-%d %H:%M:%S").timestamp()
+
+    def tokenize_dict(d):
+        return tuple([sanitize_label(d[key]) if key == 'cluster' else sanitize_timestamp(d[key]) for key in ['cluster', 'begin', 'end']])
+
+    transactions = {}
+    for i in range(len(feature_files)):
+        current_feature = pd.read_csv(feature_files[i])
+        current_feature.drop_duplicates(inplace=True)
+        grouped = current_feature.groupby('transaction')
+        state = {name: [tokenize_dict(d) for d in list(group.to_dict(orient='records'))] for name, group in grouped}
+        for j in state:
+            if j not in transactions:
+                transactions[j] = {t: [] for t in range(len(feature_files))}
+            transactions[j][i] = state[j]
+
+    return [memLexRepr(preprocess.intervals_to_words(preprocess.dict_to_list(i))) for i in transactions.values()]
+
+
+if __name__ == '__main__':
+    transactions = int(sys.argv[1]) if len(sys.argv) > 1 else 50
+    events = int(sys.argv[2]) if len(sys.argv) > 2 else 20
+
+    with tempfile.TemporaryDirectory() as path, tempfile.TemporaryDirectory() as work:
+        generate_files(path, transactions, events)
+
+        start = time.perf_counter()
+        expected = legacy_dataset(path, work)
+        legacy = time.perf_counter() - start
+
+        start = time.perf_counter()
+        dataset = loader.load_dataset(path)
+        loaded = time.perf_counter() - start
+
+    assert dataset == expected, 'The loader built a different dataset'
+    print(f'{transactions} transactions, {events} events per file and transaction')
+    print(f'experiment.py steps: {legacy:.3f}s')
+    print(f'tools.loader: {loaded:.3f}s ({legacy/loaded:.1f}x)')
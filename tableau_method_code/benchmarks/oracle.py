@@ -0,0 +1,177 @@
+"""End-to-end regression benchmark and equivalence oracle
+
+Mines a dataset with every engine and number of workers, each run in its own
+process, records its time and peak memory, and checks that the frequent
+itemsets it saves in its database, with their supports, are exactly the ones
+of a reference database.
+
+References are databases written by apriori, as the ones of paper_results/.
+The default one has been mined from the committed synthetic dataset
+benchmarks/reference/synthetic.jsonl (see tools.random_data_generator) at
+EPSILON, by the code the paper results were obtained with. That code ordered
+the singlets by hashes depending on memory addresses, and the itemsets of
+later levels depend on that order, so it has been run with the singlets in
+the order they are found, as the miner does now. The dataset has been
+generated with:
+
+    >>> patterns = [(random_pattern(3, 3, ['x', 'y'], seed), support) for seed, support in [(0, 0.4), (1, 0.5)]]
+    >>> write_intervals('synthetic.jsonl', generate_transactions(30, 3, labels=4, horizon=40, patterns=patterns, seed=0))
+
+Usage:
+    python benchmarks/oracle.py [--reference synthetic.sqlite] [--input synthetic.jsonl]
+                                [--epsilon 0.25] [--engines regex,group] [--workers 1,2]
+                                [--output results.json]
+
+The input is a JSON lines file of intervals (see
+random_data_generator.write_intervals), a directory of transaction CSVs or a
+dataset saved by lex_store, as for the lexapriori mine command. The inputs
+of paper_results/ are not in the repository, when available the published
+runs are checked with e.g.:
+
+    python benchmarks/oracle.py --reference ../paper_results/p03.sqlite \\
+        --input fitbit/p3/fitbit/transaction/ --epsilon 0.05
+
+The oracle exits with status 1 if any run does not match the reference.
+"""
+
+import argparse
+import json
+import os
+import platform
+import resource
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import time
+
+from lexapriori_mem.cli import load_input
+from lexapriori_mem.lex.lex_mem import memLexRepr
+from lexapriori_mem.lexical_apriori.budget import peak_memory
+from lexapriori_mem.lexical_apriori.lexApriori import apriori
+from lexapriori_mem.tools import preprocess
+from lexapriori_mem.tools.random_data_generator import read_intervals
+
+REFERENCE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'reference')
+
+# Minimum support the default reference has been mined with
+EPSILON = 0.25
+
+
+def read_itemsets(database):
+    # Frequent itemsets saved by apriori.insert, with their supports
+    with sqlite3.connect(database) as conn:
+        return sorted(conn.execute('SELECT itemset, support FROM frequent_itemsets').fetchall())
+
+
+def load(path, epsilon, **kwargs):
+    if path.endswith('.jsonl'):
+        words = [preprocess.intervals_to_words(preprocess.dict_to_list(t)) for t in read_intervals(path)]
+        return apriori(memLexRepr.from_many(words), epsilon, **kwargs)
+    return load_input(path, epsilon, **kwargs)
+
+
+def run(path, epsilon, engine, workers, database):
+    # Single run, in the process started by measure
+    start = time.perf_counter()
+    miner = load(path, epsilon, workers=workers, engine=engine, database=database, save_all=True)
+    loaded = time.perf_counter()
+    miner.apriori()
+    end = time.perf_counter()
+
+    # Linux reports kilobytes, macOS bytes
+    children = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss
+    return {
+        'load_seconds': loaded - start,
+        'seconds': end - loaded,
+        'peak_memory': peak_memory(),
+        'workers_peak_memory': children if sys.platform == 'darwin' else children * 1024,
+    }
+
+
+def measure(path, epsilon, engine, workers, directory):
+    # Runs are isolated in their own process, so that their peak memory is their own
+    database = os.path.join(directory, f'{engine}-{workers}.sqlite')
+    command = [sys.executable, os.path.abspath(__file__), '--input', path, '--epsilon', str(epsilon),
+               '--engines', engine, '--workers', str(workers), '--run', database]
+    # The miner reports its progress on stdout and stderr
+    subprocess.run(command, check=True, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+    with open(database + '.json') as file:
+        result = json.load(file)
+    result['itemsets'] = read_itemsets(database)
+    return result
+
+
+def compare(itemsets, expected):
+    # Itemsets missing from the run, and not in the reference or with another support
+    found = dict(itemsets)
+    reference = dict(expected)
+    missing = [itemset for itemset in reference if itemset not in found]
+    unexpected = [itemset for itemset in found if reference.get(itemset) != found[itemset]]
+    return missing, unexpected
+
+
+def run_oracle(path, epsilon, reference, engines, workers):
+    expected = read_itemsets(reference)
+    print(f'{reference}: {len(expected)} frequent itemsets', file=sys.stderr)
+
+    results = []
+    with tempfile.TemporaryDirectory() as directory:
+        for engine in engines:
+            for count in workers:
+                result = measure(path, epsilon, engine, count, directory)
+                missing, unexpected = compare(result.pop('itemsets'), expected)
+                result.update(engine=engine, workers=count, match=not missing and not unexpected,
+                              missing=missing, unexpected=unexpected)
+                results.append(result)
+
+                status = 'ok' if result['match'] else f'MISMATCH ({len(missing)} missing, {len(unexpected)} unexpected)'
+                print(f"{engine:12} {count:3} workers {result['seconds']:10.2f} s "
+                      f"{result['peak_memory'] / 2**20:10.1f} MB  {status}", file=sys.stderr)
+
+    return {
+        'reference': reference,
+        'input': path,
+        'epsilon': epsilon,
+        'python': platform.python_version(),
+        'machine': platform.machine(),
+        'results': results,
+    }
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--reference', default=os.path.join(REFERENCE, 'synthetic.sqlite'),
+                        help='Database with the frequent itemsets expected')
+    parser.add_argument('--input', default=os.path.join(REFERENCE, 'synthetic.jsonl'),
+                        help='Dataset the reference has been mined from')
+    parser.add_argument('--epsilon', type=float, default=EPSILON, help='Minimum support of the reference')
+    parser.add_argument('--engines', default=','.join(apriori.ENGINES),
+                        help=f'Comma separated engines among {", ".join(apriori.ENGINES)}')
+    parser.add_argument('--workers', default='1,2', help='Comma separated numbers of worker processes')
+    parser.add_argument('--output', default=None, help='JSON file to save the results into')
+    # Internal, a single run saving into the given database
+    parser.add_argument('--run', default=None, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    engines = args.engines.split(',')
+    for engine in engines:
+        if engine not in apriori.ENGINES:
+            parser.error(f'Unknown engine {engine}, expected one of {", ".join(apriori.ENGINES)}')
+    workers = [int(count) for count in args.workers.split(',')]
+
+    if args.run is not None:
+        # One worker is the serial miner
+        result = run(args.input, args.epsilon, engines[0], workers[0] if workers[0] > 1 else None, args.run)
+        with open(args.run + '.json', 'w') as file:
+            json.dump(result, file)
+        sys.exit(0)
+
+    output = run_oracle(args.input, args.epsilon, args.reference, engines, workers)
+
+    if args.output is not None:
+        with open(args.output, 'w') as file:
+            json.dump(output, file, indent=1)
+
+    sys.exit(0 if all(result['match'] for result in output['results']) else 1)
@@ -0,0 +1,296 @@
+"""Benchmark suite for the mining hot paths
+
+Times the functions the miner spends most of its time in, each one at a few
+dataset sizes, plus whole apriori runs with every engine. Results are saved
+as JSON, so that two commits can be compared.
+
+Every benchmark is a function taking a size and returning the callable to
+time, so that building its input is not measured. Every callable is run in
+batches big enough to last BATCH_SECONDS, and the best batch is reported as
+seconds per call.
+
+Usage:
+    python benchmarks/suite.py [--sizes small,medium] [--only merge,contains]
+                               [--output results.json] [--compare baseline.json]
+                               [--threshold 1.25]
+
+Sizes up to 'large' are a handful of small transactions from generate_data,
+'xlarge' is a few hundred transactions from generate_transactions, with a
+pattern planted in most of them so that apriori goes a few levels deep.
+
+With --compare, every result is printed next to the baseline one and the
+suite exits with status 1 if any benchmark is slower than the baseline by
+more than the threshold.
+"""
+
+import argparse
+import contextlib
+import datetime
+import io
+import json
+import platform
+import subprocess
+import sys
+import time
+
+from lexapriori_mem.lex.lex_base import baseLexRepr
+from lexapriori_mem.lex.lex_mem import memLexRepr
+from lexapriori_mem.lexical_apriori.lexApriori import apriori
+from lexapriori_mem.tools import preprocess
+from lexapriori_mem.tools.random_data_generator import generate_data, generate_transactions, label_name, random_pattern
+
+# Timelines, events per timeline, labels and transactions of every size
+SIZES = {
+    'small': (2, 3, ['a', 'b'], 6),
+    'medium': (2, 5, ['a', 'b', 'c'], 10),
+    'large': (3, 8, ['a', 'b', 'c', 'd'], 20),
+}
+
+# Transactions, timelines, labels and horizon of the sizes built with generate_transactions
+GENERATED_SIZES = {
+    'xlarge': (500, 4, 10, 60),
+}
+
+# Events of the pattern planted in the generated sizes, and its support
+PLANTED_EVENTS = 4
+PLANTED_SUPPORT = 0.6
+
+# Minimum support of the whole apriori runs
+EPSILON = 0.5
+
+BATCH_SECONDS = 0.2
+REPEAT = 3
+
+BENCHMARKS = {}
+
+
+def benchmark(name):
+    def register(function):
+        BENCHMARKS[name] = function
+        return function
+    return register
+
+
+def raw_dataset(size, seed=0):
+    if size in GENERATED_SIZES:
+        transactions, timelines, labels, horizon = GENERATED_SIZES[size]
+        pattern = random_pattern(PLANTED_EVENTS, timelines, [label_name(i) for i in range(labels)], seed)
+        return [preprocess.dict_to_list(transaction) for transaction in generate_transactions(
+            transactions, timelines, labels=labels, horizon=horizon, patterns=[(pattern, PLANTED_SUPPORT)], seed=seed)]
+
+    tables, events, labels, transactions = SIZES[size]
+    return [preprocess.dict_to_list(preprocess.data_to_intervals(generate_data(tables, events, labels, seed + i)))
+            for i in range(transactions)]
+
+
+def dataset(size, seed=0):
+    return memLexRepr.from_many([preprocess.intervals_to_words(i) for i in raw_dataset(size, seed)])
+
+
+class _Quiet(contextlib.ExitStack):
+    # The miner reports its progress on stdout and stderr
+    def __enter__(self):
+        super().__enter__()
+        self.enter_context(contextlib.redirect_stdout(io.StringIO()))
+        self.enter_context(contextlib.redirect_stderr(io.StringIO()))
+        return self
+
+
+def half_pattern(transaction):
+    # Transaction with half of its events deleted, always contained in it
+    pattern = baseLexRepr(transaction.data)
+    for i in range(len(transaction.events_list) // 2):
+        # Deleting an event can remove instants, look for the next one again
+        pattern = pattern.delete_event(pattern.events_list[i % len(pattern.events_list)])
+    return pattern
+
+
+def level_miner(size, levels):
+    # Miner stopped after the given number of levels
+    miner = apriori(dataset(size), EPSILON)
+    with _Quiet():
+        for level, _ in miner.levels():
+            if level == levels:
+                break
+    return miner
+
+
+@benchmark('merge')
+def bench_merge(size):
+    miner = level_miner(size, 2)
+    bases = miner.frequent_itemsets[2]
+    singlets = miner.frequent_itemsets[1]
+
+    def run():
+        for base in bases[:20]:
+            for singlet in singlets:
+                base.merge(singlet)
+    return run
+
+
+@benchmark('contains')
+def bench_contains(size):
+    data = dataset(size)
+    patterns = [half_pattern(transaction) for transaction in data[:5]]
+
+    def run():
+        for pattern in patterns:
+            for transaction in data:
+                pattern in transaction
+    return run
+
+
+@benchmark('check_reasonable')
+def bench_check_reasonable(size):
+    miner = level_miner(size, 2)
+    miner.size = 3
+    previous = miner.frequent_itemsets[2]
+    candidates = [candidate for base in previous[:10]
+                  for singlet in miner.frequent_itemsets[1] for candidate in base.merge(singlet)]
+
+    def run():
+        # Checks write forbidden rules into both sides, start again from the same ones every time
+        miner.frequent_itemsets[2] = [itemset.copy() for itemset in previous]
+        for candidate in candidates:
+            miner._check_reasonable(candidate.copy())
+    return run
+
+
+@benchmark('delete_event')
+def bench_delete_event(size):
+    # Transactions have no instants, which memLexRepr needs to delete rows
+    data = [baseLexRepr(transaction.data) for transaction in dataset(size)[:5]]
+
+    def run():
+        for transaction in data:
+            for event in transaction.events_list:
+                transaction.delete_event(event)
+    return run
+
+
+@benchmark('intervals_to_words')
+def bench_intervals_to_words(size):
+    raw = raw_dataset(size)
+
+    def run():
+        for transaction in raw:
+            preprocess.intervals_to_words(transaction)
+    return run
+
+
+@benchmark('check_well_formed')
+def bench_check_well_formed(size):
+    data = [transaction.data for transaction in dataset(size)]
+
+    def run():
+        for rows in data:
+            baseLexRepr.check_well_formed(rows)
+    return run
+
+
+def bench_apriori(engine):
+    def setup(size):
+        data = dataset(size)
+
+        def run():
+            with _Quiet():
+                apriori([i.copy() for i in data], EPSILON, engine=engine).apriori()
+        return run
+    return setup
+
+
+for engine in apriori.ENGINES:
+    benchmark(f'apriori[{engine}]')(bench_apriori(engine))
+
+
+def measure(run):
+    # Calls per batch, so that a batch lasts about BATCH_SECONDS
+    number = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(number):
+            run()
+        elapsed = time.perf_counter() - start
+        if elapsed >= BATCH_SECONDS or number >= 2**20:
+            break
+        number *= 2
+
+    batches = [elapsed / number]
+    for _ in range(REPEAT - 1):
+        start = time.perf_counter()
+        for _ in range(number):
+            run()
+        batches.append((time.perf_counter() - start) / number)
+
+    batches.sort()
+    return {'best': batches[0], 'median': batches[len(batches) // 2], 'calls': number}
+
+
+def commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', 'HEAD'], capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run_suite(names, sizes):
+    results = {}
+    for name in names:
+        results[name] = {}
+        for size in sizes:
+            results[name][size] = measure(BENCHMARKS[name](size))
+            print(f"{name:24} {size:8} {results[name][size]['best']*1000:10.3f} ms", file=sys.stderr)
+
+    return {
+        'commit': commit(),
+        'date': datetime.datetime.now().isoformat(),
+        'python': platform.python_version(),
+        'machine': platform.machine(),
+        'results': results,
+    }
+
+
+def compare(output, baseline, threshold):
+    regressions = []
+    for name, sizes in output['results'].items():
+        for size, result in sizes.items():
+            expected = baseline['results'].get(name, {}).get(size)
+            if expected is None:
+                continue
+            ratio = result['best'] / expected['best']
+            flag = ' REGRESSION' if ratio > threshold else ''
+            print(f"{name:24} {size:8} {expected['best']*1000:10.3f} -> {result['best']*1000:10.3f} ms "
+                  f"({ratio:.2f}x){flag}")
+            if flag:
+                regressions.append((name, size))
+    return regressions
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', default='small,medium', help=f'Comma separated sizes among {", ".join([*SIZES, *GENERATED_SIZES])}')
+    parser.add_argument('--only', default=None, help='Comma separated benchmarks to run, all by default')
+    parser.add_argument('--output', default=None, help='JSON file to save the results into')
+    parser.add_argument('--compare', default=None, help='JSON file with the results to compare with')
+    parser.add_argument('--threshold', type=float, default=1.25, help='Slowdown ratio reported as a regression')
+    args = parser.parse_args()
+
+    names = args.only.split(',') if args.only else list(BENCHMARKS)
+    sizes = args.sizes.split(',')
+    for name in names:
+        if name not in BENCHMARKS:
+            parser.error(f'Unknown benchmark {name}, expected one of {", ".join(BENCHMARKS)}')
+    for size in sizes:
+        if size not in SIZES and size not in GENERATED_SIZES:
+            parser.error(f'Unknown size {size}, expected one of {", ".join([*SIZES, *GENERATED_SIZES])}')
+
+    output = run_suite(names, sizes)
+
+    if args.output is not None:
+        with open(args.output, 'w') as file:
+            json.dump(output, file, indent=1)
+
+    if args.compare is not None:
+        with open(args.compare) as file:
+            regressions = compare(output, json.load(file), args.threshold)
+        sys.exit(1 if regressions else 0)
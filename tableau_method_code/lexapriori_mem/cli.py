@@ -0,0 +1,172 @@
+"""Command line interface
+
+Installed as the lexapriori console script.
+
+Example:
+    Mining a directory of transaction CSVs (see tools.loader) within one hour
+    and 8 GB, with 4 worker processes:
+
+        $ lexapriori mine fitbit/p1/fitbit/transaction/ p1.json --epsilon 0.05 \\
+              --workers 4 --time 3600 --memory 8G
+
+    The input can also be a dataset saved by lex.lex_store.save_dataset.
+    With --export DIR, every level is also written to DIR as a Parquet file.
+
+    Finding the association rules of the frequent itemsets saved in a database:
+
+        $ lexapriori rules p1.sqlite rules-p1.csv --confidence 0.8
+
+"""
+
+from __future__ import annotations
+import argparse
+import json
+import os
+import sys
+
+MEMORY_UNITS = {'K': 2**10, 'M': 2**20, 'G': 2**30, 'T': 2**40}
+
+
+def parse_memory(value: str) -> int:
+    """Parse a memory size such as 512M or 8G into bytes"""
+
+    unit = MEMORY_UNITS.get(value[-1:].upper())
+    try:
+        return int(float(value[:-1]) * unit) if unit is not None else int(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f'Invalid memory size {value}')
+
+
+def load_input(path: str, epsilon: float, **kwargs):
+    """Create the apriori object for a dataset directory
+
+    Args:
+        path: A dataset saved by lex_store.save_dataset, or a directory of transaction CSVs.
+        epsilon: The minimum support threshold.
+        kwargs: Other arguments of apriori.
+
+    Returns:
+        The apriori object.
+    """
+
+    from .lex import lex_store
+    from .lexical_apriori.lexApriori import apriori
+    from .tools import loader
+
+    if os.path.exists(os.path.join(path, 'header.json')):
+        return apriori.from_encoded(lex_store.load_dataset(path), epsilon, **kwargs)
+    return apriori(loader.load_dataset(path, workers=kwargs.get('workers')), epsilon, **kwargs)
+
+
+def mine(args) -> int:
+    from .lexical_apriori.budget import resourceBudget
+
+    hooks = []
+    if args.profile is not None:
+        from .lexical_apriori.profiler import phaseProfiler
+        profiler = phaseProfiler()
+        hooks.append(profiler)
+
+    budget = resourceBudget(args.time, args.memory, raise_threshold=not args.no_raise)
+    miner = load_input(args.input, args.epsilon, workers=args.workers, engine=args.engine,
+                       stats=args.stats is not None, hooks=hooks)
+
+    exporter = None
+    if args.export is not None:
+        from .lexical_apriori.export import levelExporter
+        exporter = levelExporter(args.export, args.export_format)
+
+    stopped = False
+    for size, itemsets in miner.levels():
+        print(f'size {size}: {len(itemsets)} frequent itemsets, {budget.elapsed():.1f}s', file=sys.stderr)
+
+        action = budget.govern(miner)
+        if action == 'raise':
+            print(f'raised epsilon to {miner.epsilon:.4f} to fit the budget', file=sys.stderr)
+
+        if exporter is not None:
+            if action == 'raise':
+                # Raising epsilon pruned the levels already written as well
+                exporter.export(miner)
+            elif miner.frequent_itemsets[size] != []:
+                exporter.write_level(size, miner.frequent_itemsets[size],
+                                     [miner.lattice.support(itemset) for itemset in miner.frequent_itemsets[size]])
+
+        if action == 'stop' and itemsets != []:
+            print('stopping after this level to fit the budget', file=sys.stderr)
+            stopped = True
+            break
+
+    output = {
+        'epsilon': miner.epsilon,
+        'requested_epsilon': args.epsilon,
+        'complete': not stopped,
+        'seconds': budget.elapsed(),
+        'transactions': miner.n_transactions(),
+        'budget': [{'size': size, 'action': action, 'epsilon': epsilon} for size, action, epsilon in budget.actions],
+        'itemsets': {size: [{'events': miner.describe(itemset), 'support': miner.lattice.support(itemset)}
+                            for itemset in itemsets]
+                     for size, itemsets in miner.frequent_itemsets.items() if itemsets != []},
+    }
+
+    with open(args.output, 'w') as file:
+        json.dump(output, file, indent=1)
+
+    if args.stats is not None:
+        miner.stats.dump(args.stats)
+
+    if args.profile is not None:
+        profiler.export(args.profile)
+
+    return 0
+
+
+def rules(args) -> int:
+    from .lexical_apriori.rules import database_rules, write_rules
+
+    write_rules(args.output, database_rules(args.database, args.confidence))
+    return 0
+
+
+def build_parser() -> argparse.ArgumentParser:
+    from .lexical_apriori.lexApriori import apriori
+    from .lexical_apriori.rules import DEFAULT_CONFIDENCE
+
+    parser = argparse.ArgumentParser(prog='lexapriori')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    parser_mine = commands.add_parser('mine', help='Mine the frequent itemsets of a dataset')
+    parser_mine.add_argument('input', help='Directory of transaction CSVs, or a dataset saved by lex_store')
+    parser_mine.add_argument('output', help='JSON file to write the frequent itemsets into')
+    parser_mine.add_argument('--epsilon', type=float, default=0.05, help='Minimum support threshold')
+    parser_mine.add_argument('--workers', type=int, default=None, help='Number of worker processes')
+    parser_mine.add_argument('--engine', choices=apriori.ENGINES, default='regex', help='Matching engine')
+    parser_mine.add_argument('--time', type=float, default=None, help='Wall-clock budget in seconds')
+    parser_mine.add_argument('--memory', type=parse_memory, default=None, help='Memory budget, e.g. 512M or 8G')
+    parser_mine.add_argument('--no-raise', action='store_true',
+                             help='Stop after the current level instead of raising epsilon when over budget')
+    parser_mine.add_argument('--stats', default=None, help='JSON file to write per-level statistics into')
+    parser_mine.add_argument('--profile', default=None,
+                             help='Directory to write sampled profiles of every level into, see lexical_apriori.profiler')
+    parser_mine.add_argument('--export', default=None,
+                             help='Directory to write every level into as it is found, see lexical_apriori.export')
+    parser_mine.add_argument('--export-format', choices=('parquet', 'arrow'), default='parquet',
+                             help='Format of the files written by --export')
+    parser_mine.set_defaults(run=mine)
+
+    parser_rules = commands.add_parser('rules', help='Find the association rules of the frequent itemsets of a database')
+    parser_rules.add_argument('database', help='SQLite database written by apriori')
+    parser_rules.add_argument('output', help='CSV file to write the rules into')
+    parser_rules.add_argument('--confidence', type=float, default=DEFAULT_CONFIDENCE, help='Minimum confidence')
+    parser_rules.set_defaults(run=rules)
+
+    return parser
+
+
+def main(argv: list[str] = None) -> int:
+    args = build_parser().parse_args(argv)
+    return args.run(args)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -21,9 +21,93 @@ Example:
 
 
 from __future__ import annotations
+import functools
 import re
+import sys
 from  ..lib.event import eventClass
 
+# Maximum number of distinct events kept by the flyweight cache
+EVENT_CACHE_SIZE = 2**16
+
+
+@functools.lru_cache(maxsize=EVENT_CACHE_SIZE)
+def shared_event(timeline: int, label: str, interval: tuple[int, int]) -> eventClass:
+    """Get the event object for the given values
+
+    Events are immutable values, so the same object is returned for the same
+    values instead of building and validating a new one on every access to
+    events_list. The returned objects are shared and must not be modified.
+
+    Args:
+        timeline: The timeline of the event.
+        label: The label of the event.
+        interval: The (start_index, end_index) of the event.
+
+    Returns:
+        The event object.
+    """
+
+    return eventClass(timeline, label, interval)
+
+
+# Maximum number of distinct instants whose fragments are kept
+FRAGMENT_CACHE_SIZE = 2**16
+
+# Separator between the events of an instant in regular expressions. chr(92) is the backslash character
+_REGEX_SEPARATOR = chr(92)+"s*,"+chr(92)+"s*"
+
+
+def _regex_token(value: str) -> str:
+    """Turn a single event into the regular expression recognizing it"""
+
+    # If the value is blank we recognize any event
+    if value == "_":
+        return r"[a-zA-Z_-]+"
+
+    # If the value is an endind event we recognize either an end or another start
+    elif value.startswith("E"):
+        return r"([SE]_[a-zA-Z_-]+)"
+
+    # Every other event is recognized as a literal of itself
+    return f"{value}"
+
+
+@functools.lru_cache(maxsize=FRAGMENT_CACHE_SIZE)
+def regex_fragment(row: tuple[str]) -> tuple[str, str]:
+    """Part of the regular expression matching an instant, and the filler following it
+
+    The filler is the null instant generated by gen_null after this one,
+    which can be matched 0 or more times.
+    Instants are shared by many itemsets, as every candidate only differs
+    from its parent by one event, so fragments are cached.
+
+    Args:
+        row: The events of the instant.
+
+    Returns:
+        The pair (instant, filler) of regular expressions.
+    """
+
+    # Only if the instant has an active event, propagate it as Intermediate
+    filler = ["I_" + i.split("_")[1] if i.startswith("S") or i.startswith("I") else "_" for i in row]
+
+    return (f'(\[{_REGEX_SEPARATOR.join(_regex_token(i) for i in row)}\])',
+            f'(?:\[{_REGEX_SEPARATOR.join(_regex_token(i) for i in filler)}\])*?')
+
+
+@functools.lru_cache(maxsize=FRAGMENT_CACHE_SIZE)
+def searchable_fragment(row: tuple[str]) -> str:
+    """Part of the searchable string of an instant, cached like regex_fragment"""
+
+    return f"[{','.join(row)}]"
+
+
+@functools.lru_cache(maxsize=FRAGMENT_CACHE_SIZE)
+def compile_regex(regex: str) -> re.Pattern:
+    """Compile a regular expression, keeping more of them than the cache of re"""
+
+    return re.compile(regex)
+
 
 class baseLexRepr():
     """Base class for lexical representations of events.
@@ -40,11 +124,19 @@ class baseLexRepr():
 
     """
 
+    # Millions of these are alive at deep levels, avoid a __dict__ for each one
+    __slots__ = ('data', 'timelines', '_as_regex', '_as_searchable_string', '_event_list')
+
     def __init__(self, input: list[list[str]]):
         # Check if the input is acceptable
         if not self.check_format(input):
             raise ValueError(f"Input data has wrong format. Got {input}")
 
+        self._setup(input)
+
+    def _setup(self, input: list[list[str]]) -> None:
+        """Set the attributes of the object, without any check on the input"""
+
         self.data = input
 
         self.timelines = len(self.data[0])
@@ -53,6 +145,43 @@ class baseLexRepr():
         self._as_searchable_string = None
         self._event_list = None
 
+    @classmethod
+    def _from_trusted(cls, *args) -> baseLexRepr:
+        """Create an object skipping the validation of its data
+
+        Only for data built by the library itself from valid objects, like
+        copies, merges and deletions. The arguments are the ones of __init__.
+        """
+
+        temp = cls.__new__(cls)
+        temp._setup(*args)
+        return temp
+
+    @classmethod
+    def from_many(cls, inputs: list[list[list[str]]]) -> list[baseLexRepr]:
+        """Create many objects, validating their data at once
+
+        Uses the vectorized validator of lex_validate, which is faster than
+        checking every input on its own.
+
+        Args:
+            inputs: The data of every object.
+
+        Returns:
+            The list of objects, in the same order.
+
+        Raises:
+            ValueError: If any input has the wrong format.
+        """
+
+        from .lex_validate import check_many
+
+        for input, valid in zip(inputs, check_many(inputs)):
+            if not valid:
+                raise ValueError(f"Input data has wrong format. Got {input}")
+
+        return [cls._from_trusted(input) for input in inputs]
+
     ### Methods for handling attributes ###
 
     # Regex representation
@@ -84,42 +213,9 @@ class baseLexRepr():
             str: The lexical representation of the data as a regular expression.
         """
 
-        # TODO: Change this to avoid needing a copy
-
-        # Copy to avoid modifying the original
-        data = self.copy()
-
-        # Insert fillers between events to add flexibility in recognition
-        for i in range(1, len(data.data)):
-            data.data.insert(i * 2 - 1, data.gen_null(i * 2 - 1))
-
-        # Convert to regex
-        for row in range(len(data)):
-            for column in range(len(data[row])):
-                value = data[row][column]
-
-                # If the value is blank we recognize any event
-                if value == "_":
-                    data[row][column] = r"[a-zA-Z_-]+"
-
-                # If the value is an endind event we recognize either an end or another start
-                elif value.startswith("E"):
-                    data[row][column] = r"([SE]_[a-zA-Z_-]+)"
-
-                # Every other event is recognized as a literal of itself
-                else:
-                    data[row][column] = f"{value}"
-
-        # Generate regex. Even positions contains filler that can be matched 0 or more times, odd positions contains events that must be matched exactly
-        regex = ""
-        for it, i in enumerate(data.data):
-            if it % 2 == 0:
-                # chr(92) is the backslash character. The f-string wouldn't allow to use it directly
-                regex += f'(\[{(chr(92)+"s*,"+chr(92)+"s*").join(i)}\])'
-            else:
-                regex += f'(?:\[{(chr(92)+"s*,"+chr(92)+"s*").join(i)}\])*?'
-
-        return regex
+        # Every instant but the last one is followed by its filler
+        fragments = [regex_fragment(tuple(i)) for i in self.data]
+        return "".join(row + filler for row, filler in fragments[:-1]) + fragments[-1][0]
 
     # Searchable string representation
     @property
@@ -135,7 +231,7 @@ class baseLexRepr():
         return self._as_searchable_string
 
     def _to_searchable_string(self) -> str:
-        return "".join(f"[{j}]" for j in [",".join(i) for i in self.data])
+        return "".join(searchable_fragment(tuple(i)) for i in self.data)
 
     @as_searchable_string.deleter
     def as_searchable_string(self):
@@ -196,7 +292,42 @@ class baseLexRepr():
         # {timeline: [(event, start_time, end_time), ...], ...}
         # into a list of events
         # [(timeline, (timeline, event, start_time, end_time)), ...]
-        return [eventClass(n_timeline, *event) for n_timeline in events for event in events[n_timeline]]
+        return [shared_event(n_timeline, *event) for n_timeline in events for event in events[n_timeline]]
+
+    @property
+    def event_spans(self) -> dict[int, list[tuple[int, int]]]:
+        """dict: The (start, end) instants of the events on every timeline.
+
+        Derived from events_list, so it follows its incremental updates."""
+
+        spans = {timeline: [] for timeline in range(self.timelines)}
+        for event in self.events_list:
+            spans[event[0]].append(tuple(event[2]))
+        return spans
+
+    def _shift_events(self, index: int) -> None:
+        """Update the cached events after the deletion of an instant
+
+        Events after the deleted instant are moved back by one. If the instant
+        held the Start or the End of an event, the events can't be derived
+        anymore and the cache is invalidated.
+
+        Args:
+            index: The deleted instant.
+        """
+
+        if self._event_list is None:
+            return
+
+        shifted = []
+        for event in self._event_list:
+            start, end = event[2]
+            if start == index or end == index:
+                self._event_list = None
+                return
+            shifted.append(shared_event(event[0], event[1], (start - (start > index), end - (end > index))))
+
+        self._event_list = shifted
 
     ### Methods for checking validity ###
     @staticmethod
@@ -478,7 +609,7 @@ class baseLexRepr():
                 return False
 
         # Return search result. True if anything has been found, False otherwise
-        return re.search(query.as_regex, self.as_searchable_string) is not None
+        return compile_regex(query.as_regex).search(self.as_searchable_string) is not None
 
     # Wrap data list
     def __getitem__(self, index) -> list[str]:
@@ -494,7 +625,7 @@ class baseLexRepr():
         # Data changed, invalidate cached values
         self._as_regex = None
         self._as_searchable_string = None
-        self._event_list = None
+        self._shift_events(index)
 
     def __iter__(self):
         return iter(self.data)
@@ -507,7 +638,7 @@ class baseLexRepr():
         return isinstance(o, baseLexRepr) and self.data == o.data
 
     def __hash__(self) -> int:
-        return hash(hash((j for j in i)) for i in self.data)
+        return hash(tuple(tuple(i) for i in self.data))
 
     ### Data manipulation ###
     def delete_event(self, event: tuple | eventClass) -> baseLexRepr:
@@ -538,6 +669,10 @@ class baseLexRepr():
             
         temp = self.copy()
 
+        # The other events are left where they are
+        deleted = (event[0], event[1], tuple(event[2]))
+        events = [i for i in temp.events_list if (i[0], i[1], tuple(i[2])) != deleted]
+
         for i in range(event[2][0], event[2][1] + 1):
             # Check that the Start event is not an End event
             if (
@@ -555,6 +690,11 @@ class baseLexRepr():
                 break
             temp[i][event[0]] = "_"
 
+        # Data changed, update cached values
+        temp._as_regex = None
+        temp._as_searchable_string = None
+        temp._event_list = events
+
         temp.del_null()
         return temp.copy()
 
@@ -577,11 +717,10 @@ class baseLexRepr():
             else:
                 j += 1
 
-        # Data have changed, invalidate cached values
+        # Data have changed, invalidate cached values. Events are moved by __delitem__
         if changed:
             self._as_regex = None
             self._as_searchable_string = None
-            self._event_list = None
 
     def gen_null(self, index: int) -> list[list[str]]:
         """Generates a null event at the input index.
@@ -618,14 +757,24 @@ class baseLexRepr():
                 if self[index - 1][k].startswith("S") or self[index - 1][k].startswith(
                     "I"
                 ):
-                    data[k] = "I_" + self[index - 1][k].split("_")[1]
+                    data[k] = sys.intern("I_" + self[index - 1][k].split("_")[1])
                 # Otherwise leave blank
 
         return data
 
     # Here may be necessary to override to change copy behavior of children classes
     def copy(self) -> baseLexRepr:
-        return baseLexRepr([i.copy() for i in self.data])
+        temp = baseLexRepr._from_trusted([i.copy() for i in self.data])
+        temp._copy_cached(self)
+        return temp
+
+    def _copy_cached(self, other: baseLexRepr) -> None:
+        """Carry over the cached values of an object with the same data"""
+
+        self._as_regex = other._as_regex
+        self._as_searchable_string = other._as_searchable_string
+        if other._event_list is not None:
+            self._event_list = list(other._event_list)
 
     # To be implemented in children classes
     def merge(self, other) -> list[baseLexRepr]:
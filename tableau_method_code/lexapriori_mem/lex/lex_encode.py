@@ -0,0 +1,210 @@
+"""Integer encoding of lexical representations
+
+This module turns the tokens of a lexical representation into integers, so
+that matching can be done by comparing numbers instead of strings or regular
+expressions.
+
+Every token is encoded as (label << 3) | (unsafe << 2) | kind where:
+    - kind is 0 for '_', 1 for Start, 2 for Intermediate and 3 for End events,
+      so Start and End events are the odd codes
+    - unsafe is set when the label contains characters outside [a-zA-Z_-].
+      Those tokens are not matched by the wildcards of the regular expression
+      built by baseLexRepr.as_regex, and the flag allows to reproduce it
+    - label is the position of the label in a vocabulary
+
+The blank token '_' is always encoded as 0.
+
+Example:
+    The following example shows how to encode the rows of a lexical representation:
+
+        >>> from lex_encode import vocabulary
+        >>> v = vocabulary()
+        >>> rows = v.encode_rows([['S_a', '_'], ['E_a', '_']])
+        >>> rows.cells
+        (9, 0, 11, 0)
+        >>> v.decode(rows.cells[0])
+        'S_a'
+
+"""
+
+from __future__ import annotations
+import re
+
+BLANK = 0
+START = 1
+INTERMEDIATE = 2
+END = 3
+
+UNSAFE = 4
+
+_KINDS = {'S': START, 'I': INTERMEDIATE, 'E': END}
+_PREFIXES = {START: 'S_', INTERMEDIATE: 'I_', END: 'E_'}
+_SAFE_LABEL = re.compile('[a-zA-Z_-]*')
+
+
+class encodedRows():
+    """Encoded lexical representation
+
+    Stores the codes of a lexical representation row by row in a single flat
+    sequence, so that the cell of instant r and timeline c is cells[r*width + c].
+    Any indexable sequence of integers can be used as storage, like a tuple,
+    an array or a memoryview over shared memory.
+
+    Attributes:
+        cells: The flat sequence of codes.
+        rows: The number of instants.
+        width: The number of timelines.
+        unsafe: The set of instants containing at least one unsafe token.
+    """
+
+    __slots__ = ('cells', 'rows', 'width', 'unsafe')
+
+    def __init__(self, cells, rows: int, width: int, unsafe: frozenset = frozenset()):
+        self.cells = cells
+        self.rows = rows
+        self.width = width
+        self.unsafe = unsafe
+
+    def row(self, index: int) -> tuple[int]:
+        """tuple: The codes of an instant."""
+
+        return tuple(self.cells[index*self.width:(index+1)*self.width])
+
+    def __len__(self) -> int:
+        return self.rows
+
+    def __getstate__(self):
+        return (tuple(self.cells), self.rows, self.width, self.unsafe)
+
+    def __setstate__(self, state):
+        self.cells, self.rows, self.width, self.unsafe = state
+
+
+class vocabulary():
+    """Map between labels and the integers used to encode them
+
+    Label 0 is the empty label, so that the blank token is encoded as 0.
+    New labels are added the first time they are encoded.
+
+    Attributes:
+        labels: The list of known labels, indexed by their code.
+    """
+
+    def __init__(self, labels: list[str] = None):
+        self.labels = ['']
+        self._index = {'': 0}
+        self._tokens = {'_': BLANK}
+
+        for label in labels or []:
+            self.add(label)
+
+    def add(self, label: str) -> int:
+        """Add a label to the vocabulary
+
+        Args:
+            label: The label to add.
+
+        Returns:
+            The code of the label.
+        """
+
+        if label not in self._index:
+            self._index[label] = len(self.labels)
+            self.labels.append(label)
+        return self._index[label]
+
+    def encode_token(self, token: str) -> int:
+        """Encode a single token
+
+        Args:
+            token: The token to encode, like 'S_a', 'I_a', 'E_a' or '_'.
+
+        Returns:
+            The code of the token.
+
+        Raises:
+            ValueError: If the token is not valid.
+        """
+
+        code = self._tokens.get(token)
+        if code is None:
+            if token[:2] not in ('S_', 'I_', 'E_') or '_' in token[2:]:
+                raise ValueError(f'Invalid token {token}')
+
+            label = token[2:]
+            unsafe = UNSAFE if _SAFE_LABEL.fullmatch(label) is None else 0
+            code = (self.add(label) << 3) | unsafe | _KINDS[token[0]]
+            self._tokens[token] = code
+
+        return code
+
+    def decode(self, code: int) -> str:
+        """Decode a single token
+
+        Args:
+            code: The code to decode.
+
+        Returns:
+            The token corresponding to the code.
+        """
+
+        if code & 3 == BLANK:
+            return '_'
+        return _PREFIXES[code & 3] + self.labels[code >> 3]
+
+    def encode_rows(self, data: list[list[str]]) -> encodedRows:
+        """Encode a lexical representation
+
+        Args:
+            data: The rows of the lexical representation.
+
+        Returns:
+            The encoded representation.
+        """
+
+        encode = self.encode_token
+        cells = tuple(encode(token) for row in data for token in row)
+        width = len(data[0]) if len(data) != 0 else 0
+
+        return encodedRows(cells, len(data), width, unsafe_rows(cells, len(data), width))
+
+    def decode_rows(self, rows: encodedRows) -> list[list[str]]:
+        """Decode a lexical representation
+
+        Args:
+            rows: The encoded representation.
+
+        Returns:
+            The rows of the lexical representation.
+        """
+
+        cells = list(rows.cells)
+        width = rows.width
+
+        # Decode every distinct code only once
+        tokens = {code: self.decode(code) for code in set(cells)}
+        return [[tokens[code] for code in cells[r*width:(r+1)*width]] for r in range(rows.rows)]
+
+    def __len__(self) -> int:
+        return len(self.labels)
+
+    def __getstate__(self):
+        return self.labels
+
+    def __setstate__(self, labels):
+        self.__init__(labels[1:])
+
+
+def unsafe_rows(cells, rows: int, width: int) -> frozenset:
+    """Find the instants containing unsafe tokens
+
+    Args:
+        cells: The flat sequence of codes.
+        rows: The number of instants.
+        width: The number of timelines.
+
+    Returns:
+        The set of instants containing at least one unsafe token.
+    """
+
+    return frozenset(r for r in range(rows) if any(cells[r*width + c] & UNSAFE for c in range(width)))
@@ -0,0 +1,496 @@
+"""Matching of encoded lexical representations
+
+This module finds where a pattern occurs inside a transaction, both encoded
+with lex_encode, reproducing the semantics of the regular expression built by
+baseLexRepr.as_regex without using it.
+
+An embedding of a pattern in a transaction is a tuple with the instant of the
+transaction matched by every instant of the pattern. Instants of the pattern
+must be matched in order, and the instants of the transaction skipped between
+two of them must be compatible with the filler generated by gen_null, i.e.
+events that are active in the pattern must stay active.
+
+Since every candidate generated by memLexRepr.merge is its base plus a single
+event, the embeddings of a candidate can be computed from the ones of its
+base: the instants of the base are already placed, and only the instants of
+the new event have to be checked (see extension and extend_embeddings).
+
+Example:
+    The following example shows how to find the embeddings of a pattern:
+
+        >>> from lex_encode import vocabulary
+        >>> v = vocabulary()
+        >>> pattern = compiledPattern(v.encode_rows([['S_a'], ['E_a']]))
+        >>> embeddings(pattern, v.encode_rows([['S_a'], ['I_a'], ['E_a']]))
+        [(0, 2)]
+
+"""
+
+from __future__ import annotations
+
+from .lex_encode import encodedRows, BLANK, START, INTERMEDIATE, END, UNSAFE
+
+
+def compile_row(row: tuple[int]) -> tuple[tuple, ...]:
+    """Turn an instant of a pattern into the checks needed to match it
+
+    Args:
+        row: The codes of the instant.
+
+    Returns:
+        The tuple (exact, boundary, wildcards, filler_exact, filler_wildcards),
+        see compiledPattern.
+    """
+
+    exact, boundary, wildcards, filler_exact, filler_wildcards = [], [], [], [], []
+
+    for c, code in enumerate(row):
+        kind = code & 3
+
+        # Blank values recognize any event
+        if kind == BLANK:
+            wildcards.append(c)
+        # Ending events recognize either an end or another start
+        elif kind == END:
+            boundary.append(c)
+        # Every other event is recognized as a literal of itself
+        else:
+            exact.append((c, code))
+
+        # Active events must stay active while skipping instants
+        if kind == START or kind == INTERMEDIATE:
+            filler_exact.append((c, (code & ~3) | INTERMEDIATE))
+        else:
+            filler_wildcards.append(c)
+
+    return tuple(exact), tuple(boundary), tuple(wildcards), tuple(filler_exact), tuple(filler_wildcards)
+
+
+def _check(exact: tuple, boundary: tuple, wildcards: tuple, transaction: encodedRows, t: int) -> bool:
+    """Check an instant of a transaction against compiled checks"""
+
+    cells = transaction.cells
+    offset = t*transaction.width
+
+    for c, code in exact:
+        if cells[offset + c] != code:
+            return False
+
+    # Start or End event, with a safe and nonempty label
+    for c in boundary:
+        code = cells[offset + c]
+        if code & (1 | UNSAFE) != 1 or code < 8:
+            return False
+
+    if t in transaction.unsafe:
+        for c in wildcards:
+            if cells[offset + c] & UNSAFE:
+                return False
+
+    return True
+
+
+class compiledPattern():
+    """Encoded pattern prepared for matching
+
+    Every instant of the pattern is turned into the list of checks needed to
+    match an instant of a transaction, and into the checks needed by the
+    instants skipped after it.
+
+    Attributes:
+        rows: The encoded pattern.
+        exact: For every instant, the (timeline, code) that must be found as is.
+        boundary: For every instant, the timelines that must hold a Start or an End event.
+        wildcards: For every instant, the timelines that accept any safe token.
+        filler_exact: For every instant, the (timeline, code) that must be found as is
+            in the instants skipped after it.
+        filler_wildcards: For every instant, the timelines that accept any safe token
+            in the instants skipped after it.
+    """
+
+    __slots__ = ('rows', 'exact', 'boundary', 'wildcards', 'filler_exact', 'filler_wildcards')
+
+    def __init__(self, rows: encodedRows):
+        self.rows = rows
+        self.exact = []
+        self.boundary = []
+        self.wildcards = []
+        self.filler_exact = []
+        self.filler_wildcards = []
+
+        for r in range(rows.rows):
+            exact, boundary, wildcards, filler_exact, filler_wildcards = compile_row(rows.row(r))
+            self.exact.append(exact)
+            self.boundary.append(boundary)
+            self.wildcards.append(wildcards)
+            self.filler_exact.append(filler_exact)
+            self.filler_wildcards.append(filler_wildcards)
+
+    def __len__(self) -> int:
+        return self.rows.rows
+
+
+def row_matches(pattern: compiledPattern, r: int, transaction: encodedRows, t: int) -> bool:
+    """Check if instant r of the pattern matches instant t of the transaction"""
+
+    return _check(pattern.exact[r], pattern.boundary[r], pattern.wildcards[r], transaction, t)
+
+
+def filler_matches(pattern: compiledPattern, r: int, transaction: encodedRows, t: int) -> bool:
+    """Check if instant t of the transaction can be skipped after instant r of the pattern"""
+
+    return _check(pattern.filler_exact[r], (), pattern.filler_wildcards[r], transaction, t)
+
+
+def contains(pattern: compiledPattern, transaction: encodedRows) -> bool:
+    """Check if a pattern occurs in a transaction
+
+    Equivalent to baseLexRepr.__contains__ for lexical representations.
+    Failed searches are remembered, so every (instant, position) couple is
+    explored at most once.
+
+    Args:
+        pattern: The pattern to search.
+        transaction: The transaction to search into.
+
+    Returns:
+        True if the pattern occurs in the transaction, False otherwise.
+    """
+
+    if len(pattern) == 0:
+        return True
+    if transaction.width != pattern.rows.width:
+        return False
+
+    failed = set()
+
+    def search(r: int, previous: int) -> bool:
+        # All instants have been placed
+        if r == len(pattern):
+            return True
+        if (r, previous) in failed:
+            return False
+
+        for t in range(previous + 1, transaction.rows):
+            if row_matches(pattern, r, transaction, t) and search(r + 1, t):
+                return True
+            # The instant can't be skipped, no later position is reachable
+            if r != 0 and not filler_matches(pattern, r - 1, transaction, t):
+                break
+
+        failed.add((r, previous))
+        return False
+
+    return search(0, -1)
+
+
+class _trieNode():
+    """Instant shared by the patterns of a patternTrie
+
+    Attributes:
+        checks: The compiled checks of the instant, see compile_row.
+        children: The next instants, indexed by their codes.
+        members: Bitmap of the patterns going through this node.
+        terminal: Bitmap of the patterns ending at this node.
+    """
+
+    __slots__ = ('checks', 'children', 'members', 'terminal')
+
+    def __init__(self, checks: tuple = None):
+        self.checks = checks
+        self.children = {}
+        self.members = 0
+        self.terminal = 0
+
+
+class patternTrie():
+    """Set of patterns matched together
+
+    Patterns are stored in a trie over their instants, so that the instants
+    shared by several patterns, like the ones of the itemset a candidate group
+    has been merged from, are matched only once per transaction.
+
+    Attributes:
+        roots: The root of the trie for every number of timelines.
+        size: The number of patterns.
+    """
+
+    def __init__(self, patterns: list[encodedRows]):
+        self.roots = {}
+        self.size = len(patterns)
+
+        compiled = {}
+        for index, rows in enumerate(patterns):
+            bit = 1 << index
+
+            node = self.roots.setdefault(rows.width, _trieNode())
+            node.members |= bit
+            for r in range(rows.rows):
+                row = rows.row(r)
+                if row not in node.children:
+                    if row not in compiled:
+                        compiled[row] = compile_row(row)
+                    node.children[row] = _trieNode(compiled[row])
+                node = node.children[row]
+                node.members |= bit
+            node.terminal |= bit
+
+    def match(self, transaction: encodedRows, wanted: int = None) -> int:
+        """Find which patterns occur in a transaction
+
+        Args:
+            transaction: The transaction to search into.
+            wanted: Bitmap of the patterns to search, all of them if None.
+
+        Returns:
+            Bitmap of the wanted patterns occurring in the transaction.
+        """
+
+        root = self.roots.get(transaction.width)
+        if root is None:
+            return 0
+        if wanted is None:
+            wanted = (1 << self.size) - 1
+
+        found = root.terminal & wanted
+        wanted &= ~found
+        visited = set()
+
+        def search(node: _trieNode, previous: int) -> None:
+            nonlocal found, wanted
+
+            for child in node.children.values():
+                if child.members & wanted == 0:
+                    continue
+                if (child, previous) in visited:
+                    continue
+                visited.add((child, previous))
+
+                exact, boundary, wildcards, _, _ = child.checks
+                for t in range(previous + 1, transaction.rows):
+                    if _check(exact, boundary, wildcards, transaction, t):
+                        if child.terminal & wanted:
+                            found |= child.terminal & wanted
+                            wanted &= ~child.terminal
+                        search(child, t)
+                        if child.members & wanted == 0:
+                            break
+                    # The instant can't be skipped, no later position is reachable
+                    if node.checks is not None and \
+                            not _check(node.checks[3], (), node.checks[4], transaction, t):
+                        break
+
+        search(root, -1)
+        return found
+
+
+def embeddings(pattern: compiledPattern, transaction: encodedRows, limit: int = None) -> list[tuple[int]] | None:
+    """Find every embedding of a pattern in a transaction
+
+    Args:
+        pattern: The pattern to search.
+        transaction: The transaction to search into.
+        limit: The maximum number of embeddings to collect.
+
+    Returns:
+        The list of embeddings, empty if the pattern does not occur, or None
+        if there are more than limit embeddings.
+    """
+
+    found = []
+    if transaction.width != pattern.rows.width:
+        return found
+
+    positions = [0]*len(pattern)
+
+    def search(r: int, previous: int) -> bool:
+        # All instants have been placed
+        if r == len(pattern):
+            found.append(tuple(positions))
+            return limit is None or len(found) <= limit
+
+        for t in range(previous + 1, transaction.rows):
+            if row_matches(pattern, r, transaction, t):
+                positions[r] = t
+                if not search(r + 1, t):
+                    return False
+            # The instant can't be skipped, no later position is reachable
+            if r != 0 and not filler_matches(pattern, r - 1, transaction, t):
+                break
+
+        return True
+
+    if not search(0, -1):
+        return None
+    return found
+
+
+class extension():
+    """Description of a pattern as its base plus a single event
+
+    Attributes:
+        rows: For every instant of the pattern, the instant of the base it
+            corresponds to, or None if it has been added by the merge.
+        start: The instant of the pattern where the new event starts.
+        end: The instant of the pattern where the new event ends.
+        timeline: The timeline of the new event.
+        start_code: The code of the Start event.
+        intermediate_code: The code of the Intermediate events.
+        end_code: The code found in the pattern where the new event ends.
+    """
+
+    __slots__ = ('rows', 'start', 'end', 'timeline', 'start_code', 'intermediate_code', 'end_code')
+
+    def __init__(self, rows: list, start: int, end: int, timeline: int, start_code: int, end_code: int):
+        self.rows = rows
+        self.start = start
+        self.end = end
+        self.timeline = timeline
+        self.start_code = start_code
+        self.intermediate_code = (start_code & ~3) | INTERMEDIATE
+        self.end_code = end_code
+
+    def _bounds(self, embedding: tuple, index: int, transaction: encodedRows) -> tuple[int, int]:
+        """Positions of the closest base instants around an instant of the pattern"""
+
+        lower = -1
+        for r in range(index - 1, -1, -1):
+            if self.rows[r] is not None:
+                lower = embedding[self.rows[r]]
+                break
+
+        upper = transaction.rows
+        for r in range(index + 1, len(self.rows)):
+            if self.rows[r] is not None:
+                upper = embedding[self.rows[r]]
+                break
+
+        return lower, upper
+
+    def _end_matches(self, transaction: encodedRows, t: int) -> bool:
+        code = transaction.cells[t*transaction.width + self.timeline]
+        if self.end_code & 3 == END:
+            return code & (1 | UNSAFE) == 1 and code >= 8
+        return code == self.end_code
+
+    def extend(self, embedding: tuple, transaction: encodedRows) -> list[tuple[int]]:
+        """Find the embeddings of the pattern that extend an embedding of its base
+
+        Instants of the base are kept where they are, new instants are placed
+        between them, and only the timeline of the new event is checked.
+
+        Args:
+            embedding: An embedding of the base in the transaction.
+            transaction: The transaction.
+
+        Returns:
+            The list of embeddings of the pattern.
+        """
+
+        cells = transaction.cells
+        width = transaction.width
+        timeline = self.timeline
+
+        # Candidate positions for the Start event
+        if self.rows[self.start] is not None:
+            starts = [embedding[self.rows[self.start]]]
+        else:
+            lower, upper = self._bounds(embedding, self.start, transaction)
+            starts = range(lower + 1, upper)
+
+        if self.rows[self.end] is not None:
+            fixed_end = embedding[self.rows[self.end]]
+        else:
+            fixed_end = None
+            end_lower, end_upper = self._bounds(embedding, self.end, transaction)
+
+        found = []
+        for start in starts:
+            if cells[start*width + timeline] != self.start_code:
+                continue
+
+            if fixed_end is not None:
+                # Everything between Start and End must be Intermediate
+                if all(cells[t*width + timeline] == self.intermediate_code for t in range(start + 1, fixed_end)) \
+                        and self._end_matches(transaction, fixed_end):
+                    found.append(self._place(embedding, start, fixed_end))
+                continue
+
+            for t in range(start + 1, end_upper):
+                if t > end_lower and self._end_matches(transaction, t):
+                    found.append(self._place(embedding, start, t))
+                # Everything between Start and End must be Intermediate
+                if cells[t*width + timeline] != self.intermediate_code:
+                    break
+
+        return found
+
+    def _place(self, embedding: tuple, start: int, end: int) -> tuple[int]:
+        positions = []
+        for r, base_row in enumerate(self.rows):
+            if base_row is not None:
+                positions.append(embedding[base_row])
+            elif r == self.start:
+                positions.append(start)
+            else:
+                positions.append(end)
+        return tuple(positions)
+
+
+def describe_extension(base, pattern, vocabulary) -> extension:
+    """Describe a pattern generated by memLexRepr.merge as an extension of its base
+
+    Instants of the base are carried over by the merge with a '0' appended,
+    while new ones end with '4' or '6'. The new event is the last insertion
+    recorded in the history of the pattern.
+
+    Args:
+        base: The memLexRepr the pattern has been generated from.
+        pattern: The memLexRepr generated by the merge.
+        vocabulary: The vocabulary used to encode the transactions.
+
+    Returns:
+        The description of the pattern.
+    """
+
+    base_rows = {instant + '0': index for index, instant in enumerate(base.instants)}
+    rows = [base_rows.get(instant) for instant in pattern.instants]
+
+    item, (start_instant, end_instant) = pattern.history[-1]
+    start = pattern.instants.index(start_instant)
+    end = pattern.instants.index(end_instant)
+
+    # The new event is the Start that was not in the base
+    start_token = 'S_' + item
+    for timeline in range(len(pattern[start])):
+        if pattern[start][timeline] == start_token and \
+                (rows[start] is None or base[rows[start]][timeline] != start_token):
+            break
+
+    return extension(rows, start, end, timeline,
+                     vocabulary.encode_token(start_token),
+                     vocabulary.encode_token(pattern[end][timeline]))
+
+
+def extend_embeddings(description: extension, base_embeddings: list[tuple[int]], transaction: encodedRows,
+                      limit: int = None) -> list[tuple[int]] | None:
+    """Find the embeddings of a pattern from the ones of its base
+
+    Args:
+        description: The pattern as an extension of its base.
+        base_embeddings: Every embedding of the base in the transaction.
+        transaction: The transaction.
+        limit: The maximum number of embeddings to collect.
+
+    Returns:
+        The list of embeddings, empty if the pattern does not occur, or None
+        if there are more than limit embeddings.
+    """
+
+    found = []
+    for embedding in base_embeddings:
+        found.extend(description.extend(embedding, transaction))
+        if limit is not None and len(found) > limit:
+            return None
+
+    return found
@@ -19,8 +19,9 @@ Example:
 from __future__ import annotations
 import copy
 import itertools
+import sys
 
-from .lex_base import baseLexRepr
+from .lex_base import baseLexRepr, shared_event
 from ..lib import intervals
 from ..tools import helper as utils
 
@@ -37,29 +38,41 @@ class memLexRepr(baseLexRepr):
     Attributes:
         data: The data to be wrapped into a lexical representation.
         instants: The instants corresponding to the data.
+        tids: Bitmap of the transactions that may contain the itemset, as an int
+            where bit i is set for the i-th transaction of the dataset.
+        embeddings: The embeddings of the itemset in every transaction containing it,
+            see lex_match. Not pickled, as they are only meaningful for the dataset
+            of the process that computed them.
 
     Raises:
         ValueError: If the data is not in the correct format.
         ValueError: If the size of input instants is not equal to the number of instants in the data.
     """
-    
+
+    __slots__ = ('instants', '_forbidden', '_history', 'tids', 'embeddings')
+
     def __init__(self, input: list[list[str]], instants: list[str] = None):
         if not super().check_format(input):
             raise ValueError("Wrong format for input data")
-        super().__init__(input)
+        if instants is not None and len(instants) != len(input):
+            raise ValueError(f"Wrong number of instants. Expected {len(input)} got {len(instants)}")
+
+        self._setup(input, instants)
+
+    def _setup(self, input: list[list[str]], instants: list[str] = None) -> None:
+        super()._setup(input)
 
         # Save instants values
-        if instants is None:
-            self.instants = []
-        else:
-            if len(instants) != len(input):
-                raise ValueError(f"Wrong number of instants. Expected {len(input)} got {len(instants)}")
-            self.instants = instants
+        self.instants = [] if instants is None else instants
 
         # Forbidden insertions
         self._forbidden = {}
         # Story of insertions
         self._history = []
+        # Bitmap of the transactions that may contain this itemset, None if unknown
+        self.tids = None
+        # Embeddings in every transaction containing this itemset, None if not computed
+        self.embeddings = None
 
     @property
     def forbidden(self) -> dict:    
@@ -167,6 +180,15 @@ class memLexRepr(baseLexRepr):
     def __delitem__(self, index: int) -> None:
         super().__delitem__(index)
         del self.instants[index]
+
+    def __getstate__(self) -> dict:
+        state = {name: getattr(self, name) for name in baseLexRepr.__slots__ + memLexRepr.__slots__}
+        state['embeddings'] = None
+        return state
+
+    def __setstate__(self, state: dict) -> None:
+        for name, value in state.items():
+            setattr(self, name, value)
     
     def copy(self) -> baseLexRepr:
         # Check if instants are present
@@ -176,13 +198,14 @@ class memLexRepr(baseLexRepr):
             instants = None
         
         # Copy over the data
-        temp = memLexRepr([copy.deepcopy(i) for i in self.data], instants)
+        temp = memLexRepr._from_trusted([copy.deepcopy(i) for i in self.data], instants)
         temp._forbidden = copy.deepcopy(self.forbidden)
         temp._history = copy.deepcopy(self.history)
+        temp._copy_cached(self)
 
         return temp
 
-    def merge(self, other: memLexRepr) -> list[memLexRepr]:
+    def merge(self, other: memLexRepr, stats=None, hooks=None) -> list[memLexRepr]:
         """Merge two lexical representations.
         
         This method merges two lexical representations, where one is a singlet,
@@ -190,6 +213,10 @@ class memLexRepr(baseLexRepr):
         
         Args:
             other: The other lexical representation to merge with.
+            stats: Optional lexical_apriori.stats.levelStats, where the insertions
+                ruled out by the forbidden rules are counted.
+            hooks: Optional list of lexical_apriori.hooks.miningHooks, notified
+                around every step of lexical_apriori.hooks.MERGE_STEPS.
             
         Raises:
             TypeError: If the input is not a memLexRepr object.
@@ -219,25 +246,49 @@ class memLexRepr(baseLexRepr):
         # Saving which timeline we are merging in and has conflicts
         timeline = add.events_list[0].timeline
 
+        if hooks:
+            for hook in hooks:
+                hook.enter('insertion_points')
+
         # Generate all accepted insertion points
         combinations_graph = memLexRepr._generate_insertion_points(
             base, timeline)
 
+        if hooks:
+            for hook in reversed(hooks):
+                hook.exit('insertion_points')
+            for hook in hooks:
+                hook.enter('forbidden')
+
         # Extract item name we are merging
         item = other.events_list[0].event
 
         # Prune insertion points based on forbidden
+        if stats is not None:
+            insertions = sum(len(i) for i in combinations_graph.values())
         self._prune_from_memory(item, combinations_graph)
+        if stats is not None:
+            stats.pruned_forbidden += insertions - sum(len(i) for i in combinations_graph.values())
 
         # Prune empty insertion points
         for i in [i for i in combinations_graph]:
             if combinations_graph[i] == []:
                 del combinations_graph[i]
 
+        if hooks:
+            for hook in reversed(hooks):
+                hook.exit('forbidden')
+            for hook in hooks:
+                hook.enter('combinations')
+
         # Generate the actual combinations
         combinations_list = memLexRepr._generate_combinations(
             base, add, timeline, combinations_graph)
 
+        if hooks:
+            for hook in reversed(hooks):
+                hook.exit('combinations')
+
         # Delete duplicates
         return combinations_list
 
@@ -318,6 +369,46 @@ class memLexRepr(baseLexRepr):
                                 combinations_graph[start_point].remove(
                                     end_point)
 
+    def forbids(self, item: str, start_point: str, end_point: str) -> bool:
+        """Check if an insertion is ruled out by the forbidden rules.
+
+        Mirrors the test performed by _prune_from_memory on a single
+        insertion point, so that a merge can be filtered after it has been
+        generated.
+
+        Args:
+            item: The name of the item being inserted.
+            start_point: The insertion point of the Start event.
+            end_point: The insertion point of the End event.
+
+        Returns:
+            True if the insertion is forbidden, False otherwise.
+        """
+
+        return any(forbidden.contains_start(start_point) and forbidden.contains_end(end_point)
+                   for forbidden in self.forbidden.get(item, []))
+
+    def insertion_points(self) -> tuple[str, tuple[str, str]]:
+        """Recover the insertion that generated this lexical representation.
+
+        The last entry of the history stores the Start and End instants of the
+        merged item, where middle points have been turned into 4 (Start) and
+        6 (End). This method turns them back into the points used by
+        _generate_insertion_points.
+
+        Returns:
+            A tuple with the item name and the (start, end) insertion points.
+        """
+
+        item, (start, end) = self.history[-1]
+
+        if start[-1] == '4':
+            start = start[:-1] + '5'
+        if end[-1] == '6':
+            end = end[:-1] + '5'
+
+        return item, (start, end)
+
     def _generate_combinations(base, add, timeline, combinations_graph) -> list:
         if not (isinstance(base, memLexRepr) and isinstance(add, memLexRepr)):
             raise TypeError('Input must be a memLexRepr object')
@@ -368,8 +459,8 @@ class memLexRepr(baseLexRepr):
 
                 # Fill in the Intermediate events between the start and the end that has just been added
                 for k in range(i_position+1, j_position+offset):
-                    combination[k][timeline] = 'I_' + \
-                        add_data[0][timeline].split('_')[1]
+                    combination[k][timeline] = sys.intern('I_' + \
+                        add_data[0][timeline].split('_')[1])
 
                 # Get a copy of previous instants
                 temp_instants = [i+'0' for i in positions[1:-1]]
@@ -384,12 +475,54 @@ class memLexRepr(baseLexRepr):
                     temp_instants.insert(j_position+offset, j)
 
                 combinations_list.append(
-                    memLexRepr(combination, temp_instants))
+                    memLexRepr._from_trusted(combination, temp_instants))
                 combinations_list[-1].history.append(
                     (add.events_list[0].event, (i, j)))
+                combinations_list[-1]._event_list = memLexRepr._derive_events(
+                    base, combinations_list[-1], timeline, i_position)
 
         return combinations_list
 
+    @staticmethod
+    def _derive_events(base: memLexRepr, combination: memLexRepr, timeline: int, start: int) -> list:
+        """Derive the events of a combination from the ones of its base
+
+        Instants carried over from the base end with '0', so the events of the
+        base only have to be moved to their new instants, and the event added
+        by the merge is inserted keeping the order of _get_events.
+
+        Args:
+            base: The lexical representation the combination has been generated from.
+            combination: The combination.
+            timeline: The timeline of the added event.
+            start: The instant where the added event starts.
+
+        Returns:
+            The list of events of the combination.
+        """
+
+        # New instant of every instant of the base, events not ended are ended with the data
+        carried = [k for k, instant in enumerate(combination.instants) if instant[-1] == '0']
+        carried.append(len(combination))
+
+        # The added event ends at the next Start or End
+        end = start + 1
+        while end < len(combination) and not combination[end][timeline][:1] in ('S', 'E'):
+            end += 1
+        added = shared_event(timeline, combination[start][timeline].split('_')[1], (start, end))
+
+        events = []
+        for event in base.events_list:
+            moved = (carried[event[2][0]], carried[event[2][1]])
+            if added is not None and (event[0], moved[0]) > (timeline, start):
+                events.append(added)
+                added = None
+            events.append(shared_event(event[0], event[1], moved))
+        if added is not None:
+            events.append(added)
+
+        return events
+
     def del_null(self) -> None:
         """Removes all the null events
 
@@ -409,11 +542,10 @@ class memLexRepr(baseLexRepr):
             else:
                 j += 1
 
-        # Data have changed, invalidate cached values
+        # Data have changed, invalidate cached values. Events are moved by __delitem__
         if changed:
             self._as_regex = None
             self._as_searchable_string = None
-            self._event_list = None
 
 
     # Representation
@@ -0,0 +1,136 @@
+"""Encoded datasets shared between processes
+
+This module publishes an encoded dataset once into shared memory, so that
+worker processes can match itemsets against it without receiving a pickled
+copy of every transaction.
+
+The codes of every transaction are written one after the other into a single
+block of shared memory. Workers attach to it by name and get, for every
+transaction, an encodedRows whose cells are a memoryview over that block:
+nothing is copied, and lex_match works on it as on any other sequence of
+codes. Only the small description of the block (its name, where every
+transaction starts and its shape) is sent to the workers.
+
+Workers must be started with multiprocessing (a pool, an executor...) by the
+process that published the dataset, which is the only one unlinking it.
+
+Example:
+    The following example shows how to share a dataset with a pool:
+
+        >>> shared = sharedDataset.publish(encoded_dataset)
+        >>> with ProcessPoolExecutor(initializer=init, initargs=(shared.handle(),)) as executor:
+        ...     ...
+        >>> shared.close()
+
+    and, in the worker processes:
+
+        >>> def init(handle):
+        ...     global dataset
+        ...     dataset = sharedDataset.attach(handle)
+
+"""
+
+from __future__ import annotations
+from array import array
+from multiprocessing import shared_memory
+
+from .lex_encode import encodedRows
+
+# Format of the codes in shared memory, signed 64 bit integers
+CODE_FORMAT = 'q'
+
+
+class sharedDataset():
+    """Encoded dataset stored in shared memory
+
+    Behaves as a read-only list of encodedRows objects.
+
+    Attributes:
+        memory: The shared memory block holding the codes.
+        offsets: Where the codes of every transaction start, followed by the total number of codes.
+        shapes: The number of instants and timelines of every transaction.
+        unsafe: The instants containing unsafe tokens in every transaction.
+    """
+
+    def __init__(self, memory: shared_memory.SharedMemory, offsets: list[int], shapes: list[tuple],
+                 unsafe: list[frozenset], owner: bool = False):
+        self.memory = memory
+        self.offsets = offsets
+        self.shapes = shapes
+        self.unsafe = unsafe
+
+        # Only the publishing process removes the block
+        self._owner = owner
+
+        itemsize = array(CODE_FORMAT).itemsize
+        self._cells = memory.buf[:offsets[-1]*itemsize].cast(CODE_FORMAT)
+        self._rows = [encodedRows(self._cells[offsets[i]:offsets[i+1]], rows, width, unsafe[i])
+                      for i, (rows, width) in enumerate(shapes)]
+
+    @classmethod
+    def publish(cls, encoded_dataset: list[encodedRows]) -> sharedDataset:
+        """Copy an encoded dataset into a new shared memory block
+
+        Args:
+            encoded_dataset: The encoded transactions, e.g. apriori.encoded_dataset.
+
+        Returns:
+            The shared dataset, owning the block.
+        """
+
+        offsets = [0]
+        for rows in encoded_dataset:
+            offsets.append(offsets[-1] + rows.rows*rows.width)
+
+        itemsize = array(CODE_FORMAT).itemsize
+        # Empty blocks are not allowed
+        memory = shared_memory.SharedMemory(create=True, size=max(1, offsets[-1]*itemsize))
+
+        cells = memory.buf[:offsets[-1]*itemsize].cast(CODE_FORMAT)
+        for start, end, rows in zip(offsets, offsets[1:], encoded_dataset):
+            cells[start:end] = array(CODE_FORMAT, rows.cells)
+        cells.release()
+
+        return cls(memory, offsets, [(rows.rows, rows.width) for rows in encoded_dataset],
+                   [rows.unsafe for rows in encoded_dataset], owner=True)
+
+    def handle(self) -> tuple:
+        """tuple: What a worker needs to attach to the dataset, see attach."""
+
+        return self.memory.name, self.offsets, self.shapes, self.unsafe
+
+    @classmethod
+    def attach(cls, handle: tuple) -> sharedDataset:
+        """Attach to a dataset published by another process
+
+        Args:
+            handle: The output of handle in the publishing process.
+
+        Returns:
+            The shared dataset, without copying its codes.
+        """
+
+        name, offsets, shapes, unsafe = handle
+        return cls(shared_memory.SharedMemory(name=name), offsets, shapes, unsafe)
+
+    def close(self) -> None:
+        """Detach from the dataset, removing it if this process published it"""
+
+        # Views over the block must be released before closing it
+        for rows in self._rows:
+            rows.cells.release()
+        self._cells.release()
+        self._rows = []
+
+        self.memory.close()
+        if self._owner:
+            self.memory.unlink()
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    def __getitem__(self, index):
+        return self._rows[index]
+
+    def __iter__(self):
+        return iter(self._rows)
@@ -0,0 +1,216 @@
+"""Memory-mappable storage of preprocessed datasets
+
+This module saves a dataset of lexical representations to a directory, once
+encoded with lex_encode, so that later runs can load it without parsing the
+original data or validating every transaction again.
+
+A stored dataset is a directory containing:
+    - header.json: the format version, the number of transactions and the
+      labels of the vocabulary
+    - cells.npy: the codes of every transaction, one after the other
+    - offsets.npy: where the codes of every transaction start in cells.npy,
+      followed by the total number of codes
+    - shapes.npy: the number of instants and timelines of every transaction
+    - events.npy: the events of every transaction, as rows of
+      (timeline, label, start, end), in the order of events_list
+    - event_offsets.npy: where the events of every transaction start in
+      events.npy, followed by the total number of events
+
+Arrays are loaded with numpy memory mapping, so nothing is read until it is
+used.
+
+Example:
+    The following example shows how to save a dataset and mine it later:
+
+        >>> save_dataset('dataset', dataset)
+        >>> stored = load_dataset('dataset')
+        >>> a = apriori.from_encoded(stored, 0.5, engine='group')
+
+"""
+
+from __future__ import annotations
+from collections import OrderedDict
+import json
+import os
+
+from .lex_encode import vocabulary, encodedRows, UNSAFE
+from .lex_mem import memLexRepr
+from .lex_base import shared_event
+
+FORMAT_VERSION = 1
+
+# Number of decoded transactions kept by a stored dataset
+DEFAULT_CACHE_SIZE = 1024
+
+_ARRAYS = ('cells', 'offsets', 'shapes', 'events', 'event_offsets')
+
+
+def save_dataset(path: str, dataset: list[memLexRepr]) -> None:
+    """Save a dataset of lexical representations
+
+    Args:
+        path: The directory to save into, created if it does not exist.
+        dataset: The transactions to save.
+    """
+
+    import numpy as np
+
+    encoder = vocabulary()
+
+    cells, offsets, shapes, events, event_offsets = [], [0], [], [], [0]
+    for data in dataset:
+        rows = encoder.encode_rows(data.data)
+        cells.extend(rows.cells)
+        offsets.append(len(cells))
+        shapes.append((rows.rows, rows.width))
+
+        for event in data.events_list:
+            events.append((event[0], encoder.add(event[1]), event[2][0], event[2][1]))
+        event_offsets.append(len(events))
+
+    os.makedirs(path, exist_ok=True)
+
+    arrays = {
+        'cells': np.array(cells, dtype=np.int64),
+        'offsets': np.array(offsets, dtype=np.int64),
+        'shapes': np.array(shapes, dtype=np.int64).reshape(-1, 2),
+        'events': np.array(events, dtype=np.int64).reshape(-1, 4),
+        'event_offsets': np.array(event_offsets, dtype=np.int64),
+    }
+    for name, array in arrays.items():
+        np.save(os.path.join(path, f'{name}.npy'), array)
+
+    with open(os.path.join(path, 'header.json'), 'w') as file:
+        json.dump({'version': FORMAT_VERSION, 'transactions': len(dataset), 'labels': encoder.labels[1:]}, file)
+
+
+def load_dataset(path: str, mmap: bool = True, cache_size: int = DEFAULT_CACHE_SIZE) -> storedDataset:
+    """Load a dataset saved by save_dataset
+
+    Args:
+        path: The directory the dataset has been saved into.
+        mmap: If True, arrays are memory mapped instead of read.
+        cache_size: The number of decoded transactions kept, see storedDataset.
+
+    Returns:
+        The stored dataset.
+
+    Raises:
+        ValueError: If the dataset has been saved with another version of the format.
+    """
+
+    import numpy as np
+
+    with open(os.path.join(path, 'header.json')) as file:
+        header = json.load(file)
+
+    if header['version'] != FORMAT_VERSION:
+        raise ValueError(f"Unsupported format version {header['version']}, expected {FORMAT_VERSION}")
+
+    arrays = {name: np.load(os.path.join(path, f'{name}.npy'), mmap_mode='r' if mmap else None)
+              for name in _ARRAYS}
+
+    return storedDataset(vocabulary(header['labels']), **arrays, cache_size=cache_size)
+
+
+class storedDataset():
+    """Dataset loaded by load_dataset
+
+    Behaves as a read-only list of memLexRepr objects, which are decoded when
+    they are accessed. Only the most recently used ones are kept, so that
+    scanning the whole dataset doesn't hold all of it in memory decoded:
+    decoding again is cheap, as the events are stored. The encoded
+    transactions are also available as they are stored, for the engines
+    working on codes.
+
+    Attributes:
+        vocabulary: The vocabulary the transactions have been encoded with.
+        cells: The codes of every transaction.
+        offsets: Where the codes of every transaction start.
+        shapes: The number of instants and timelines of every transaction.
+        events: The events of every transaction.
+        event_offsets: Where the events of every transaction start.
+        cache_size: The number of decoded transactions kept, 0 keeps none.
+    """
+
+    def __init__(self, vocabulary: vocabulary, cells, offsets, shapes, events, event_offsets,
+                 cache_size: int = DEFAULT_CACHE_SIZE):
+        self.vocabulary = vocabulary
+        self.cells = cells
+        self.offsets = offsets
+        self.shapes = shapes
+        self.events = events
+        self.event_offsets = event_offsets
+
+        self.cache_size = cache_size
+
+        # Decoded transactions, from the least to the most recently used
+        self._decoded = OrderedDict()
+        self._unsafe = None
+
+    def __len__(self) -> int:
+        return len(self.shapes)
+
+    def _unsafe_rows(self, index: int) -> frozenset:
+        import numpy as np
+
+        # Find unsafe cells once for the whole dataset
+        if self._unsafe is None:
+            self._unsafe = np.flatnonzero(np.asarray(self.cells) & UNSAFE)
+
+        start, end = int(self.offsets[index]), int(self.offsets[index + 1])
+        width = int(self.shapes[index][1])
+        first, last = np.searchsorted(self._unsafe, [start, end])
+        return frozenset(int(cell - start) // width for cell in self._unsafe[first:last])
+
+    def encoded(self, index: int) -> encodedRows:
+        """Get an encoded transaction
+
+        The codes are a view of the stored ones, nothing is copied.
+
+        Args:
+            index: The position of the transaction.
+
+        Returns:
+            The encoded transaction.
+        """
+
+        start, end = int(self.offsets[index]), int(self.offsets[index + 1])
+        rows, width = (int(i) for i in self.shapes[index])
+        return encodedRows(memoryview(self.cells[start:end]), rows, width, self._unsafe_rows(index))
+
+    def encoded_dataset(self) -> list[encodedRows]:
+        """list: Every encoded transaction, see encoded."""
+
+        return [self.encoded(index) for index in range(len(self))]
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError('Index out of range')
+
+        if index in self._decoded:
+            self._decoded.move_to_end(index)
+            return self._decoded[index]
+
+        data = memLexRepr._from_trusted(self.vocabulary.decode_rows(self.encoded(index)))
+
+        # Events are stored, no need to scan the data for them
+        labels = self.vocabulary.labels
+        data._event_list = [
+            shared_event(int(timeline), labels[label], (int(start), int(end)))
+            for timeline, label, start, end in
+            self.events[int(self.event_offsets[index]):int(self.event_offsets[index + 1])].tolist()]
+
+        if self.cache_size > 0:
+            self._decoded[index] = data
+            if len(self._decoded) > self.cache_size:
+                self._decoded.popitem(last=False)
+
+        return data
+
+    def __iter__(self):
+        return (self[index] for index in range(len(self)))
@@ -0,0 +1,147 @@
+"""Vectorized validation of lexical representations
+
+This module checks many lexical representations at once, with the same rules
+as baseLexRepr.check_format. The tokens are encoded with lex_encode and the
+rules are evaluated with numpy on whole matrices of codes, comparing every
+instant with its neighbors through shifted views instead of looping over
+every token in Python.
+
+It is meant for untrusted input, like user data or the output of
+preprocess.intervals_to_words, where many transactions have to be checked
+before being wrapped into lexical representations. Objects built by the
+library itself from valid ones don't need to be checked again (see
+baseLexRepr._from_trusted).
+
+Example:
+    The following example shows how to check a batch of representations:
+
+        >>> check_many([[['S_a'], ['E_a']], [['E_a'], ['S_a']]])
+        [True, False]
+
+"""
+
+from __future__ import annotations
+
+from .lex_encode import vocabulary, encodedRows, BLANK, START, INTERMEDIATE, END
+
+
+def encode_input(input, encoder: vocabulary) -> encodedRows | None:
+    """Encode an input, checking its shape
+
+    Args:
+        input: The data to be encoded.
+        encoder: The vocabulary used to encode the tokens.
+
+    Returns:
+        The encoded data, or None if the input is not a nonempty list of
+        nonempty lists of the same length, or if any token is not valid.
+    """
+
+    if not isinstance(input, list) or len(input) == 0:
+        return None
+    if not isinstance(input[0], list) or len(input[0]) == 0:
+        return None
+
+    width = len(input[0])
+    for row in input:
+        if not isinstance(row, list) or len(row) != width:
+            return None
+
+    try:
+        return encoder.encode_rows(input)
+    except (ValueError, TypeError):
+        return None
+
+
+def check_encoded(batch: list[encodedRows]) -> list[bool]:
+    """Check if encoded representations are well-formed
+
+    Representations with the same number of timelines are stacked into a
+    single matrix, and the rules of baseLexRepr.check_well_formed are
+    evaluated on all of them at once.
+
+    Args:
+        batch: The encoded representations to be checked.
+
+    Returns:
+        For every representation, True if it is well-formed, False otherwise.
+    """
+
+    import numpy as np
+
+    output = [False]*len(batch)
+
+    # Group representations by number of timelines
+    widths = {}
+    for position, rows in enumerate(batch):
+        widths.setdefault(rows.width, []).append(position)
+
+    for width, positions in widths.items():
+        lengths = np.array([batch[i].rows for i in positions])
+        matrix = np.fromiter((code for i in positions for code in batch[i].cells), dtype=np.int64,
+                             count=int(lengths.sum())*width).reshape(-1, width)
+
+        kinds = matrix & 3
+        labels = matrix >> 3
+
+        # First and last instant of every representation
+        starts = np.concatenate(([0], np.cumsum(lengths)[:-1]))
+        first = np.zeros(len(matrix), dtype=bool)
+        first[starts] = True
+        last = np.zeros(len(matrix), dtype=bool)
+        last[starts + lengths - 1] = True
+        last &= ~first
+        middle = ~(first | last)
+
+        # Neighbors of every instant, only meaningful for the middle ones
+        previous_kinds = np.roll(kinds, 1, axis=0)
+        previous_labels = np.roll(labels, 1, axis=0)
+        next_kinds = np.roll(kinds, -1, axis=0)
+        next_labels = np.roll(labels, -1, axis=0)
+
+        active_before = ((previous_kinds == START) | (previous_kinds == INTERMEDIATE)) & (previous_labels == labels)
+        continues_after = (next_kinds == START) | \
+            (((next_kinds == END) | (next_kinds == INTERMEDIATE)) & (next_labels == labels))
+
+        wrong = np.zeros(matrix.shape, dtype=bool)
+        # The starting instant can only hold Start or blank events
+        wrong |= first[:, None] & ((kinds == INTERMEDIATE) | (kinds == END))
+        # The ending instant can only hold End or blank events
+        wrong |= last[:, None] & ((kinds == INTERMEDIATE) | (kinds == START))
+        # Intermediate events must continue an event and be followed by it
+        wrong |= middle[:, None] & (kinds == INTERMEDIATE) & ~(active_before & continues_after)
+        # End events must close an event and be followed by a blank or a Start
+        wrong |= middle[:, None] & (kinds == END) & \
+            ~(active_before & ((next_kinds == BLANK) | (next_kinds == START)))
+        # Start events can't be followed by a blank
+        wrong |= middle[:, None] & (kinds == START) & (next_kinds == BLANK)
+
+        # Instants with only blank events are not allowed
+        wrong_instants = wrong.any(axis=1) | (kinds == BLANK).all(axis=1)
+
+        for position, valid in zip(positions, ~np.logical_or.reduceat(wrong_instants, starts)):
+            output[position] = bool(valid)
+
+    return output
+
+
+def check_many(inputs: list, encoder: vocabulary = None) -> list[bool]:
+    """Check if many inputs can be used to create lexical representations
+
+    Equivalent to calling baseLexRepr.check_format on every input.
+
+    Args:
+        inputs: The data to be checked.
+        encoder: The vocabulary used to encode the tokens, a new one if None.
+
+    Returns:
+        For every input, True if it is valid, False otherwise.
+    """
+
+    if encoder is None:
+        encoder = vocabulary()
+
+    encoded = [encode_input(input, encoder) for input in inputs]
+    valid = iter(check_encoded([rows for rows in encoded if rows is not None]))
+
+    return [rows is not None and next(valid) for rows in encoded]
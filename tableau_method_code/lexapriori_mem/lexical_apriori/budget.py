@@ -0,0 +1,139 @@
+"""Time and memory budgets for a mining run
+
+This module decides, between two levels of apriori.levels, whether the run
+can afford the next level.
+
+The cost of the next level is estimated from the last one, grown by the
+ratio between the last two levels. When it does not fit in what is left of a
+budget, the run degrades gracefully: the minimum support threshold is raised
+(see apriori.raise_threshold) until the itemsets left make the estimate fit,
+and if that is not possible, or not allowed, the run stops after the current
+level.
+
+Memory is measured as the peak resident set size of the process, which never
+decreases, so the estimate is conservative. It is only available on Unix. Worker processes are not
+accounted for.
+
+Example:
+    The following example shows how to mine within 10 minutes and 4 GB:
+
+        >>> budget = resourceBudget(seconds=600, memory=4 * 2**30)
+        >>> a = apriori(dataset, 0.05)
+        >>> for size, itemsets in a.levels():
+        ...     if budget.govern(a) == 'stop':
+        ...         break
+
+"""
+
+from __future__ import annotations
+import sys
+import time
+
+# Factor applied to epsilon every time it has to be raised
+RAISE_FACTOR = 1.5
+
+
+def peak_memory() -> int:
+    """int: The peak resident set size of the process, in bytes, None where it can't be measured."""
+
+    # Only available on Unix
+    try:
+        import resource
+    except ImportError:
+        return None
+
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    return peak if sys.platform == 'darwin' else peak * 1024
+
+
+class resourceBudget():
+    """Time and memory budget for a mining run
+
+    The budget starts when the object is created.
+
+    Attributes:
+        seconds: The wall-clock budget, None for no limit.
+        memory: The memory budget in bytes, None for no limit.
+        raise_threshold: If False, the run is stopped instead of raising epsilon.
+        actions: Every decision taken, as (size, action, epsilon).
+    """
+
+    def __init__(self, seconds: float = None, memory: int = None, raise_threshold: bool = True):
+        self.seconds = seconds
+        self.memory = memory
+        self.raise_threshold = raise_threshold
+        self.actions = []
+
+        self._start = time.perf_counter()
+        # Time and peak memory at the end of every level
+        self._marks = [(self._start, peak_memory())]
+
+        if memory is not None and self._marks[0][1] is None:
+            raise ValueError('Memory budgets need the resource module, not available on this platform')
+
+    def elapsed(self) -> float:
+        """float: The seconds spent since the budget started."""
+
+        return time.perf_counter() - self._start
+
+    @staticmethod
+    def _estimate(costs: list[float]) -> float:
+        """Cost of the next level, from the cost of the previous ones"""
+
+        if len(costs) < 2 or costs[-2] <= 0:
+            return costs[-1]
+        return costs[-1] * max(1, costs[-1] / costs[-2])
+
+    def _fits(self, fraction: float) -> bool:
+        """Check whether the next level fits, when only a fraction of the itemsets is extended"""
+
+        now, peak = self._marks[-1]
+
+        if self.seconds is not None:
+            durations = [b[0] - a[0] for a, b in zip(self._marks, self._marks[1:])]
+            if now - self._start + fraction * self._estimate(durations) > self.seconds:
+                return False
+
+        if self.memory is not None:
+            growths = [b[1] - a[1] for a, b in zip(self._marks, self._marks[1:])]
+            if peak + fraction * self._estimate(growths) > self.memory:
+                return False
+
+        return True
+
+    def govern(self, miner) -> str:
+        """Decide how to go on after a level of miner.levels
+
+        Args:
+            miner: The apriori object, right after it yielded a level.
+
+        Returns:
+            'continue' if the next level fits in the budget, 'raise' if epsilon
+            has been raised to make it fit, 'stop' if the run has to stop.
+        """
+
+        self._marks.append((time.perf_counter(), peak_memory()))
+
+        action = 'continue'
+        if not self._fits(1):
+            action = 'stop'
+
+            current = miner.frequent_itemsets[miner.size]
+            if self.raise_threshold and current != []:
+                supports = sorted(miner.lattice.support(itemset) for itemset in current)
+
+                # Raise epsilon until the itemsets left make the next level fit
+                epsilon = miner.epsilon
+                while epsilon * RAISE_FACTOR <= 1:
+                    epsilon *= RAISE_FACTOR
+                    kept = len([support for support in supports if support >= epsilon])
+                    if kept == 0:
+                        break
+                    if self._fits(kept / len(supports)):
+                        miner.raise_threshold(epsilon)
+                        action = 'raise'
+                        break
+
+        self.actions.append((miner.size, action, miner.epsilon))
+        return action
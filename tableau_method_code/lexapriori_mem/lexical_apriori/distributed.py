@@ -0,0 +1,258 @@
+"""Sharded mining with a coordinator and a pluggable transport
+
+This module splits the transactions of a dataset into shards, each one owned
+by a worker process that may live on another machine. The coordinator runs
+the usual apriori level loop and, map-reduce style, broadcasts the candidates
+of every level to the shards and sums the partial support counts they send
+back.
+
+Workers are reached through a transport object. Two are provided:
+    - socketTransport connects to shards already served at known addresses,
+      for instance on other machines running serve_shard
+    - localTransport spawns one process per shard on the local machine and
+      connects to them through local sockets, which makes it possible to test
+      the whole setup on a single box
+
+Connections unpickle whatever they receive, so shards and coordinator must
+share a secret key: anyone knowing it can run code on the shards. There is no
+default key, localTransport generates a random one for the processes it
+spawns.
+
+Example:
+    Mining a dataset split in 4 local shards:
+
+        >>> from distributed import coordinator, localTransport
+        >>> with localTransport(dataset, 4) as transport:
+        ...     frequent_itemsets = coordinator(transport, 0.5).apriori()
+
+    Serving a shard on a remote machine:
+
+        >>> serve_shard(shard, address=('0.0.0.0', 6000), authkey=b'secret')
+
+"""
+
+from __future__ import annotations
+import multiprocessing
+import os
+from multiprocessing.connection import Client, Listener
+
+from .lexApriori import apriori
+from ..lex.lex_mem import memLexRepr
+
+# Length in bytes of the keys generated by localTransport
+AUTHKEY_LENGTH = 32
+
+
+def serve_shard(dataset: list[memLexRepr], authkey: bytes, address: tuple = ('localhost', 0), ready=None) -> None:
+    """Serve a shard of a dataset to a coordinator
+
+    Listens on the given address, accepts a single coordinator and answers its
+    requests until it asks to close.
+    Requests are tuples (command, payload) where command is one of:
+        - 'size': number of transactions in the shard
+        - 'singlets': every event of the shard as a singlet
+        - 'count': number of transactions containing each itemset of the payload
+        - 'close': stop serving
+
+    Args:
+        dataset: The transactions owned by this shard
+        authkey: The secret key shared with the coordinator
+        address: The (host, port) to listen on, port 0 picks a free one
+        ready: Optional connection used to send back the address actually used
+    """
+
+    with Listener(address, authkey=authkey) as listener:
+        if ready is not None:
+            ready.send(listener.address)
+            ready.close()
+
+        with listener.accept() as conn:
+            while True:
+                command, payload = conn.recv()
+
+                if command == 'count':
+                    conn.send([sum([itemset in data for data in dataset]) for itemset in payload])
+                elif command == 'singlets':
+                    conn.send(apriori._find_singlets(dataset))
+                elif command == 'size':
+                    conn.send(len(dataset))
+                elif command == 'close':
+                    break
+                else:
+                    conn.send(ValueError(f'Unknown command {command}'))
+
+
+class transport:
+    """Base class for the communication between coordinator and shards
+
+    Subclasses must implement _request, which sends a request to every shard
+    and returns the list of their answers, in shard order.
+    """
+
+    def _request(self, command: str, payload=None) -> list:
+        raise NotImplementedError
+
+    def size(self) -> int:
+        """int: The total number of transactions over all shards."""
+
+        return sum(self._request('size'))
+
+    def singlets(self) -> list[memLexRepr]:
+        """list: Every event of the dataset as a singlet, in shard order."""
+
+        return [j for i in self._request('singlets') for j in i]
+
+    def count(self, itemsets: list[memLexRepr]) -> list[int]:
+        """Count the transactions containing each itemset over all shards
+
+        Args:
+            itemsets: The itemsets to count
+
+        Returns:
+            The number of transactions containing every itemset, in the same order
+        """
+
+        if len(itemsets) == 0:
+            return []
+        return [sum(i) for i in zip(*self._request('count', itemsets))]
+
+    def close(self) -> None:
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
+
+
+class socketTransport(transport):
+    """Transport reaching shards served by serve_shard at known addresses
+
+    Attributes:
+        addresses: The (host, port) of every shard
+        authkey: The secret key shared with the shards
+    """
+
+    def __init__(self, addresses: list[tuple], authkey: bytes):
+        self.addresses = addresses
+        self.authkey = authkey
+        self.connections = [Client(address, authkey=authkey) for address in addresses]
+
+    def _request(self, command: str, payload=None) -> list:
+        # Broadcast first, so that shards work at the same time
+        for conn in self.connections:
+            conn.send((command, payload))
+
+        answers = [conn.recv() for conn in self.connections]
+        for answer in answers:
+            if isinstance(answer, Exception):
+                raise answer
+        return answers
+
+    def close(self) -> None:
+        for conn in self.connections:
+            try:
+                conn.send(('close', None))
+            except OSError:
+                pass
+            conn.close()
+        self.connections = []
+
+
+class localTransport(socketTransport):
+    """Transport spawning a process for every shard on the local machine
+
+    The dataset is split into contiguous shards of similar size. The key
+    shared with the processes is generated at random for every transport.
+
+    Attributes:
+        shards: The number of shards and worker processes
+    """
+
+    def __init__(self, dataset: list[memLexRepr], shards: int):
+        if shards < 1:
+            raise ValueError(f'At least one shard is needed, got {shards}')
+
+        self.shards = shards
+        self.processes = []
+        authkey = os.urandom(AUTHKEY_LENGTH)
+
+        addresses = []
+        size = -(-len(dataset) // shards)
+        for shard in range(shards):
+            receiver, sender = multiprocessing.Pipe(duplex=False)
+            process = multiprocessing.Process(
+                target=serve_shard,
+                args=(dataset[shard*size:(shard+1)*size], authkey, ('localhost', 0), sender),
+                daemon=True)
+            process.start()
+            sender.close()
+
+            addresses.append(receiver.recv())
+            self.processes.append(process)
+
+        super().__init__(addresses, authkey)
+
+    def close(self) -> None:
+        super().close()
+        for process in self.processes:
+            process.join()
+        self.processes = []
+
+
+class coordinator(apriori):
+    """Apriori algorithm over a sharded dataset
+
+    Runs the apriori level loop of the base class, but the dataset is only
+    known through a transport. Singlets are collected from every shard and the
+    support of each level is computed by summing the counts of the shards.
+
+    Attributes:
+        transport: The transport reaching the shards
+        transactions: The total number of transactions
+    """
+
+    # Shards match the itemsets in their transactions, the other engines work on a local dataset
+    ENGINES = ('regex',)
+
+    def __init__(self, transport: transport, epsilon, **kwargs):
+        """Create a coordinator
+
+        Args:
+            transport: The transport reaching the shards
+            epsilon: The minimum support threshold
+            kwargs: Any other argument of apriori, except the dataset
+
+        Raises:
+            ValueError: If the engine requested needs a local dataset
+        """
+
+        engine = kwargs.get('engine', 'regex')
+        if engine not in coordinator.ENGINES:
+            raise ValueError(f'Engine {engine} needs a local dataset, expected one of {coordinator.ENGINES}')
+        super().__init__(None, epsilon, **kwargs)
+
+        self.transport = transport
+        self.transactions = transport.size()
+
+    def _extract_items(self) -> None:
+        temp = list()
+
+        for new_event in self.transport.singlets():
+            if not (self.cut_solutions is not None and
+                             new_event in self.cut_solutions):
+                temp.append(new_event)
+
+        # Keep the first occurrence of every singlet, as the order of the singlets
+        # changes the forbidden rules found, and so the itemsets of later levels
+        self.singlets = list(dict.fromkeys(temp))
+
+    def n_transactions(self) -> int:
+        return self.transactions
+
+    def support(self, itemset: memLexRepr) -> float:
+        return self._count_support([itemset])[0]
+
+    def _count_support(self, itemsets: list[memLexRepr], bases: list[memLexRepr] = None) -> list[float]:
+        return [i/self.transactions for i in self.transport.count(itemsets)]
@@ -0,0 +1,216 @@
+"""Columnar export of the frequent itemsets
+
+This module writes the frequent itemsets of a run as Parquet files, or Arrow
+IPC files, one file per level, as soon as every level is found. When epsilon
+is raised during the run, the levels already written have to be written
+again (see levelExporter.export). Analytics
+tools read them directly, without parsing the itemsets saved by apriori in
+its SQLite database.
+
+Every file has one row per event of every itemset, with the columns:
+    - pattern: the id of the itemset, unique within the export directory
+    - size: the number of events of the itemset
+    - support: the support of the itemset
+    - key: the searchable string of the itemset
+    - timelines: the number of timelines of the itemset
+    - timeline, label, start, end: the event
+
+Parquet files keep the minimum and maximum of every column by row group, so
+readers filtering on size, support or label (see read_export) skip the files
+and row groups that cannot match without reading them. Arrow IPC files have
+no statistics and are read whole.
+
+pyarrow is only needed when exporting or reading.
+
+Example:
+    The following example shows how to export every level while mining, then
+    read the itemsets of size 3 containing an event labelled 'walk':
+
+        >>> exporter = levelExporter('p03')
+        >>> a = apriori(dataset, 0.05)
+        >>> for size, itemsets in a.levels():
+        ...     exporter.write_level(size, itemsets, [a.lattice.support(i) for i in itemsets])
+        >>> read_export('p03', size=3, label='walk')
+
+"""
+
+from __future__ import annotations
+import os
+
+from ..lex.lex_base import baseLexRepr, shared_event
+from ..lex.lex_mem import memLexRepr
+from .results import build_itemset
+
+FORMATS = {'parquet': 'parquet', 'arrow': 'ipc'}
+
+COLUMNS = ('pattern', 'size', 'support', 'key', 'timelines', 'timeline', 'label', 'start', 'end')
+
+
+def _schema():
+    import pyarrow as pa
+
+    return pa.schema([('pattern', pa.int64()), ('size', pa.int32()), ('support', pa.float64()),
+                      ('key', pa.string()), ('timelines', pa.int32()), ('timeline', pa.int32()),
+                      ('label', pa.string()), ('start', pa.int32()), ('end', pa.int32())])
+
+
+def _all(conditions):
+    # Conjunction of dataset expressions, None when there are none
+    condition = None
+    for expression in conditions:
+        condition = expression if condition is None else condition & expression
+    return condition
+
+
+class levelExporter():
+    """Writer of one columnar file per level of a run
+
+    Attributes:
+        directory: The directory the files are written into.
+        format: 'parquet' or 'arrow'.
+        row_group_size: The maximum number of rows of a Parquet row group.
+        written: The paths of the files written so far.
+    """
+
+    def __init__(self, directory: str, format: str = 'parquet', row_group_size: int = 65536):
+        if format not in FORMATS:
+            raise ValueError(f'Unknown format {format}, expected one of {tuple(FORMATS)}')
+
+        self.directory = directory
+        self.format = format
+        self.row_group_size = row_group_size
+        self.written = []
+
+        # Id of the next itemset, so that ids are unique across levels
+        self._next_pattern = 0
+        # Ids of the itemsets of every level written, kept when the level is written again
+        self._ids = {}
+
+    def write_level(self, size: int, itemsets: list[baseLexRepr], supports: list[float]) -> str:
+        """Write the frequent itemsets of a level
+
+        A level written again, e.g. after epsilon has been raised, replaces
+        its file, and its itemsets keep their ids.
+
+        Args:
+            size: The size of the itemsets.
+            itemsets: The frequent itemsets.
+            supports: The support of every itemset, in the same order.
+
+        Returns:
+            The path of the file written.
+        """
+
+        import pyarrow as pa
+
+        previous = self._ids.get(size, {})
+        ids = {}
+
+        columns = {name: [] for name in COLUMNS}
+        for itemset, support in zip(itemsets, supports):
+            # Every id is only given once, even to equal itemsets
+            pattern = previous.pop(itemset, None)
+            if pattern is None:
+                pattern = self._next_pattern
+                self._next_pattern += 1
+            ids[itemset] = pattern
+
+            events = itemset.events_list
+            for event in events:
+                columns['pattern'].append(pattern)
+                columns['size'].append(len(events))
+                columns['support'].append(support)
+                columns['key'].append(itemset.as_searchable_string)
+                columns['timelines'].append(len(itemset[0]))
+                columns['timeline'].append(event[0])
+                columns['label'].append(event[1])
+                columns['start'].append(event[2][0])
+                columns['end'].append(event[2][1])
+        self._ids[size] = ids
+
+        table = pa.table(columns, schema=_schema())
+
+        os.makedirs(self.directory, exist_ok=True)
+        path = os.path.join(self.directory, f'level-{size}.{self.format}')
+        if self.format == 'parquet':
+            import pyarrow.parquet as pq
+            pq.write_table(table, path, row_group_size=self.row_group_size)
+        else:
+            with pa.ipc.new_file(path, table.schema) as writer:
+                writer.write_table(table)
+
+        if path not in self.written:
+            self.written.append(path)
+        return path
+
+    def export(self, miner) -> list[str]:
+        """Write every level found so far by a run
+
+        Levels already written are written again, so that after epsilon has
+        been raised (see apriori.raise_threshold) the files only hold the
+        itemsets the run kept.
+
+        Args:
+            miner: The apriori object.
+
+        Returns:
+            The paths of the files written.
+        """
+
+        for size, itemsets in miner.frequent_itemsets.items():
+            if itemsets != [] or size in self._ids:
+                self.write_level(size, itemsets, [miner.lattice.support(itemset) for itemset in itemsets])
+        return self.written
+
+
+def read_export(directory: str, format: str = 'parquet', size: int = None, min_support: float = None,
+                label: str = None, cls: type = memLexRepr) -> list[tuple[int, baseLexRepr, float]]:
+    """Read the itemsets exported into a directory
+
+    Filters are pushed down to the files, so that only the row groups that
+    may contain matching itemsets are read.
+
+    Args:
+        directory: The directory written by levelExporter.
+        format: The format of the files, 'parquet' or 'arrow'.
+        size: If given, only the itemsets with this number of events are read.
+        min_support: If given, only the itemsets with at least this support are read.
+        label: If given, only the itemsets with an event with this label are read.
+        cls: The class of the itemsets, memLexRepr or baseLexRepr.
+
+    Returns:
+        The itemsets as (pattern id, itemset, support), in the order they have been exported.
+    """
+
+    import pyarrow.dataset as ds
+
+    if format not in FORMATS:
+        raise ValueError(f'Unknown format {format}, expected one of {tuple(FORMATS)}')
+
+    paths = [os.path.join(directory, name) for name in sorted(os.listdir(directory)) if name.endswith(f'.{format}')]
+    dataset = ds.dataset(paths, format=FORMATS[format], schema=_schema())
+
+    conditions = []
+    if size is not None:
+        conditions.append(ds.field('size') == size)
+    if min_support is not None:
+        conditions.append(ds.field('support') >= min_support)
+
+    if label is not None:
+        # Only the events with the label match, read every event of their itemsets
+        conditions.append(ds.field('label') == label)
+        matching = dataset.to_table(columns=['pattern'], filter=_all(conditions))
+        patterns = sorted(set(matching.column('pattern').to_pylist()))
+        conditions = [ds.field('pattern').isin(patterns)]
+
+    rows = dataset.to_table(filter=_all(conditions)).to_pylist()
+
+    # Events of an itemset are written together, sorted as in events_list
+    found = {}
+    for row in rows:
+        if row['pattern'] not in found:
+            found[row['pattern']] = (row['support'], row['timelines'], [])
+        found[row['pattern']][2].append(shared_event(row['timeline'], row['label'], (row['start'], row['end'])))
+
+    return [(pattern, build_itemset(found[pattern][2], found[pattern][1], cls), found[pattern][0])
+            for pattern in sorted(found)]
@@ -0,0 +1,58 @@
+"""Hooks around the phases of a mining run
+
+This module defines the interface of the objects notified by apriori while it
+mines, so that what happens inside a level can be observed, e.g. profiled
+(see lexical_apriori.profiler), without editing the miner.
+
+A run is a sequence of levels, and a level a sequence of phases, which can be
+nested:
+
+    generation: candidate generation, including
+        merge: a single memLexRepr.merge, made of the steps of MERGE_STEPS
+        reasonable: checking a candidate against the previous level
+    support: support counting, matching the candidates against the transactions
+    database: saving an itemset into the database
+
+Hooks are only called when given. When candidates are generated by worker
+processes, their merges and checks are not reported, the time spent waiting
+for them is reported as generation.
+
+Example:
+    The following example shows how to print every phase entered:
+
+        >>> class printer(miningHooks):
+        ...     def enter(self, phase):
+        ...         print('entering', phase)
+        >>> a = apriori(dataset, 0.5, hooks=[printer()])
+        >>> frequent_itemsets = a.apriori()
+
+"""
+
+from __future__ import annotations
+
+# Steps of memLexRepr.merge, reported within the merge phase
+MERGE_STEPS = ('insertion_points', 'forbidden', 'combinations')
+
+
+class miningHooks():
+    """Base class of the hooks of a mining run
+
+    Every callback does nothing, subclasses override the ones they need.
+    Phases are exited in the reverse order they have been entered, when the
+    run fails inside a phase only finish is called.
+    """
+
+    def start_level(self, size: int) -> None:
+        """Called when the level of the itemsets of the given size starts"""
+
+    def end_level(self, size: int) -> None:
+        """Called when the level of the itemsets of the given size ends, before it is yielded"""
+
+    def enter(self, phase: str) -> None:
+        """Called when a phase starts"""
+
+    def exit(self, phase: str) -> None:
+        """Called when a phase ends"""
+
+    def finish(self) -> None:
+        """Called when the run ends, even if it has been stopped or has failed"""
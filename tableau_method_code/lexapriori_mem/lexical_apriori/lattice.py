@@ -0,0 +1,235 @@
+"""Lattice of the frequent itemsets of a mining run
+
+While checking a candidate, apriori finds the itemset of the previous size
+left by deleting every one of its events (see apriori._find_parents). This
+module keeps these parent/child links between frequent itemsets, so that
+sub-patterns and extensions of an itemset are found by traversing the
+lattice instead of matching itemsets against each other.
+
+Itemsets are numbered in the order they are added, which is the order they
+are found, so parents always come before their children.
+
+When the run saves into a database, the links are saved as well in the
+lattice_edges table, as pairs of rowids of the frequent_itemsets table.
+
+Example:
+    The following example shows how to find all the extensions of an itemset:
+
+        >>> a = apriori(dataset, 0.05)
+        >>> frequent_itemsets = a.apriori()
+        >>> a.lattice.descendants(frequent_itemsets[1][0])
+
+"""
+
+from __future__ import annotations
+import ast
+import sqlite3
+
+from ..lex.lex_base import baseLexRepr
+from ..tools import preprocess
+from . import results
+
+EDGES_TABLENAME = 'lattice_edges'
+
+
+class patternLattice():
+    """Parent/child links between frequent itemsets
+
+    Attributes:
+        itemsets: The itemsets, in the order they have been added.
+        supports: The support of every itemset.
+        parents: The positions of the parents of every itemset.
+        children: The positions of the children of every itemset.
+        rowids: The rowid of every itemset in the database, None if not saved.
+        positions: The position of every itemset, by itemset.
+    """
+
+    def __init__(self):
+        self.itemsets = []
+        self.supports = []
+        self.parents = []
+        self.children = []
+        self.rowids = []
+        self.positions = {}
+
+    def add(self, itemset: baseLexRepr, support: float, parents: list[baseLexRepr] = (), rowid: int = None) -> int:
+        """Add an itemset, linked to its parents
+
+        Args:
+            itemset: The frequent itemset.
+            support: Its support.
+            parents: The itemsets of the previous size it has been found from,
+                already in the lattice.
+            rowid: Its rowid in the database, if saved.
+
+        Returns:
+            The position of the itemset. Itemsets already in the lattice are not added again.
+        """
+
+        if itemset in self.positions:
+            return self.positions[itemset]
+
+        position = len(self.itemsets)
+        self.positions[itemset] = position
+        self.itemsets.append(itemset)
+        self.supports.append(support)
+        self.rowids.append(rowid)
+
+        links = []
+        for parent in parents:
+            parent_position = self.positions[parent]
+            if parent_position not in links:
+                links.append(parent_position)
+                self.children[parent_position].append(position)
+        self.parents.append(links)
+        self.children.append([])
+
+        return position
+
+    def __len__(self) -> int:
+        return len(self.itemsets)
+
+    def __contains__(self, itemset: baseLexRepr) -> bool:
+        return itemset in self.positions
+
+    def __iter__(self):
+        return iter(self.itemsets)
+
+    def support(self, itemset: baseLexRepr) -> float:
+        """float: The support of an itemset of the lattice."""
+
+        return self.supports[self.positions[itemset]]
+
+    def parents_of(self, itemset: baseLexRepr) -> list[baseLexRepr]:
+        """list: The itemsets an itemset has been found from, with one event less."""
+
+        return [self.itemsets[i] for i in self.parents[self.positions[itemset]]]
+
+    def children_of(self, itemset: baseLexRepr) -> list[baseLexRepr]:
+        """list: The itemsets found from an itemset, with one event more."""
+
+        return [self.itemsets[i] for i in self.children[self.positions[itemset]]]
+
+    def _closure(self, position: int, links: list[list[int]]) -> list[int]:
+        # Positions reachable from position following links, in increasing order
+        found = set()
+        stack = [position]
+        while stack != []:
+            for linked in links[stack.pop()]:
+                if linked not in found:
+                    found.add(linked)
+                    stack.append(linked)
+        return sorted(found)
+
+    def ancestors(self, itemset: baseLexRepr) -> list[baseLexRepr]:
+        """list: Every frequent sub-pattern of an itemset, in the order they have been found."""
+
+        return [self.itemsets[i] for i in self._closure(self.positions[itemset], self.parents)]
+
+    def descendants(self, itemset: baseLexRepr) -> list[baseLexRepr]:
+        """list: Every frequent extension of an itemset, in the order they have been found."""
+
+        return [self.itemsets[i] for i in self._closure(self.positions[itemset], self.children)]
+
+    def is_closed(self, itemset: baseLexRepr) -> bool:
+        """Check whether no extension of an itemset has its same support
+
+        Support is anti-monotone, so only the children have to be checked.
+        """
+
+        position = self.positions[itemset]
+        return all(self.supports[child] < self.supports[position] for child in self.children[position])
+
+    def filter(self, keep) -> patternLattice:
+        """Lattice of the itemsets satisfying a condition
+
+        Links to dropped itemsets are dropped as well.
+
+        Args:
+            keep: A function taking an itemset and its support, True for the itemsets to keep.
+
+        Returns:
+            The new lattice.
+        """
+
+        lattice = patternLattice()
+        for position, itemset in enumerate(self.itemsets):
+            if keep(itemset, self.supports[position]):
+                lattice.add(itemset, self.supports[position],
+                            [self.itemsets[i] for i in self.parents[position] if self.itemsets[i] in lattice],
+                            self.rowids[position])
+        return lattice
+
+    @staticmethod
+    def create_table(conn: sqlite3.Connection) -> None:
+        """Create the table of the links in a results database"""
+
+        conn.execute(f'CREATE TABLE IF NOT EXISTS {EDGES_TABLENAME}(parent INTEGER, child INTEGER)')
+
+    def save_links(self, conn: sqlite3.Connection, itemset: baseLexRepr, rowid: int) -> None:
+        """Record the rowid of an itemset and save its links to its parents, saved before it
+
+        Args:
+            conn: The connection to the results database.
+            itemset: The itemset of the lattice.
+            rowid: Its rowid in the frequent_itemsets table.
+        """
+
+        position = self.positions[itemset]
+        self.rowids[position] = rowid
+        conn.executemany(f'INSERT INTO {EDGES_TABLENAME}(parent, child) VALUES(?,?)',
+                         [(self.rowids[parent], rowid) for parent in self.parents[position]])
+
+    @classmethod
+    def from_database(cls, database: str) -> patternLattice:
+        """Read the lattice saved in a results database
+
+        Itemsets are read from the normalized tables of lexical_apriori.results
+        when the database has them, and parsed from frequent_itemsets otherwise.
+
+        Args:
+            database: The path of the SQLite database written by apriori.
+
+        Returns:
+            The lattice, with baseLexRepr itemsets. The links of databases
+            saved without them are found again, looking for the itemsets left
+            by deleting every event of an itemset.
+        """
+
+        with sqlite3.connect(database) as conn:
+            normalized = results.has_tables(conn)
+            if not normalized:
+                rows = conn.execute('SELECT rowid, itemset, support FROM frequent_itemsets ORDER BY rowid').fetchall()
+            tables = {name for name, in conn.execute("SELECT name FROM sqlite_master WHERE type='table'")}
+            edges = []
+            if EDGES_TABLENAME in tables:
+                edges = conn.execute(f'SELECT parent, child FROM {EDGES_TABLENAME} ORDER BY rowid').fetchall()
+
+        if normalized:
+            rows = results.read_patterns(database, cls=baseLexRepr)
+        else:
+            # Itemsets are saved as the string of apriori.describe
+            rows = [(rowid, baseLexRepr(preprocess.intervals_to_words(preprocess.dict_to_list(
+                        ast.literal_eval(itemset)))), support) for rowid, itemset, support in rows]
+
+        parents = {}
+        for parent, child in edges:
+            parents.setdefault(child, []).append(parent)
+
+        lattice = cls()
+        itemsets = {}
+        for rowid, itemset, support in rows:
+            itemsets[rowid] = itemset
+
+            if EDGES_TABLENAME in tables:
+                found = [itemsets[i] for i in parents.get(rowid, [])]
+            else:
+                found = []
+                events = itemsets[rowid].events_list
+                if len(events) > 1:
+                    for event in events:
+                        parent = itemsets[rowid].delete_event(event)
+                        if parent in lattice:
+                            found.append(parent)
+            lattice.add(itemsets[rowid], support, found, rowid)
+        return lattice
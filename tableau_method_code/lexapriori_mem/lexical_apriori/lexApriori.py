@@ -1,6 +1,13 @@
 import re
 import copy
+import time
 from ..lex.lex_mem import memLexRepr
+from ..lex import lex_match
+from ..lex.lex_encode import vocabulary
+from ..lex.lex_shared import sharedDataset
+from .stats import miningStats
+from .lattice import patternLattice
+from . import results
 from ..lib import intervals
 from ..tools import preprocess
 from tqdm import tqdm
@@ -22,13 +29,44 @@ class apriori:
     Attributes:
         dataset: The dataset to use for the algorithm
         epsilon: The minimum support threshold
+        workers: The number of processes used to generate candidates, and to count support with the group engine
+        engine: How itemsets are searched in the dataset, one of 'regex', 'embeddings' or 'group'
+        embedding_limit: The maximum number of embeddings stored for an itemset in a transaction
+        stats: The lexical_apriori.stats.miningStats of the run, None if not collected
+        hooks: The lexical_apriori.hooks.miningHooks notified around every phase of the run
+        lattice: The lexical_apriori.lattice.patternLattice linking every frequent itemset to its parents
 
     """
 
-    def __init__(self, dataset, epsilon, database=None, save_all = False, cut_solutions=None):
+    ENGINES = ('regex', 'embeddings', 'group')
+
+    def __init__(self, dataset, epsilon, database=None, save_all = False, cut_solutions=None, workers=None,
+                 engine='regex', embedding_limit=None, stats=False, hooks=None):
         self.dataset = dataset
         self.epsilon = epsilon
 
+        # Number of processes for candidate generation, None runs serially
+        self.workers = workers
+
+        # Matching engine
+        if engine not in apriori.ENGINES:
+            raise ValueError(f'Unknown engine {engine}, expected one of {apriori.ENGINES}')
+        self.engine = engine
+        self.embedding_limit = embedding_limit
+
+        # Encoded dataset, built on first use by the engines working on codes
+        self.vocabulary = None
+        self.encoded_dataset = None
+
+        # Encoded dataset published to the worker processes, see _share_dataset
+        self.shared_dataset = None
+
+        # Per-level statistics, only collected when requested
+        self.stats = miningStats() if stats else None
+
+        # Hooks around the phases of the run, see hooks.miningHooks
+        self.hooks = list(hooks) if hooks is not None else []
+
         # Structure to save the itemsets during execution
         self.frequent_itemsets = {}
         self.frequent_itemsets_set = {}
@@ -36,6 +74,13 @@ class apriori:
         # Structure to save the candidates generated during execution
         self.candidate_next = {}
 
+        # Structure to save the itemset every group of candidates has been generated from
+        self.candidate_bases = {}
+
+        # Frequent itemsets linked to their parents, and the parents of the candidates of the level
+        self.lattice = patternLattice()
+        self._candidate_parents = {}
+
         # Structure to save the singlets extracted from the dataset
         self.singlets = []
 
@@ -55,14 +100,35 @@ class apriori:
 
         if cut_solutions is not None:
             
-            new_cut_solutions = []
-            for itemset in cut_solutions:
-                new_cut_solutions.append(memLexRepr(preprocess.intervals_to_words(preprocess.dict_to_list(itemset))))
+            new_cut_solutions = memLexRepr.from_many(
+                [preprocess.intervals_to_words(preprocess.dict_to_list(itemset)) for itemset in cut_solutions])
 
             self.cut_solutions = set(new_cut_solutions)
         else:
             self.cut_solutions = cut_solutions
 
+    @classmethod
+    def from_encoded(cls, stored, epsilon, **kwargs) -> "apriori":
+        """Create an apriori object over a dataset saved with lex_store
+
+        The encoded transactions and the vocabulary of the stored dataset are
+        used as they are by the engines working on codes, while transactions
+        are only decoded when the regex engine or singlet extraction need them.
+
+        Args:
+            stored: The lex_store.storedDataset to mine
+            epsilon: The minimum support
+            kwargs: Any other argument of the constructor
+
+        Returns:
+            The apriori object
+        """
+
+        miner = cls(stored, epsilon, **kwargs)
+        miner.vocabulary = stored.vocabulary
+        miner.encoded_dataset = stored.encoded_dataset()
+        return miner
+
     def _create_database(self) -> None:
         """ Create an SQLite database """
 
@@ -90,6 +156,9 @@ class apriori:
             cursor.execute(
                 f"CREATE TABLE IF NOT EXISTS {self.unfrequent_tablename}(itemset, support, timestamp)")
 
+        patternLattice.create_table(conn)
+        results.create_tables(conn)
+
         return conn
 
 
@@ -112,10 +181,20 @@ class apriori:
     def insert(self, itemset, support, tablename) -> None:
         """ Insert an itemset, support couple into the database
 
+        Frequent itemsets are also saved in the normalized tables of
+        lexical_apriori.results, and the ones of the lattice with their links
+        to their parents.
+
         """
 
         import datetime
 
+        stats = self._level_stats()
+        if stats is not None:
+            start = time.perf_counter()
+        if self.hooks:
+            self._enter('database')
+
         with self._database_connection() as conn:
 
             sql = f''' INSERT INTO {tablename}(itemset, support, timestamp)
@@ -123,16 +202,51 @@ class apriori:
 
             cur = conn.cursor()
 
-            eventlist = {}
-            for timeline in range(len(itemset[0])):
-                eventlist[timeline] = []
-            for event in itemset.events_list:
-                eventlist[event.timeline].append(
-                    (event.event, event.start, event.end))
-
-            cur.execute(sql, (str(eventlist), support, datetime.datetime.now()))
+            cur.execute(sql, (str(apriori.describe(itemset)), support, datetime.datetime.now()))
+            if tablename == self.frequent_tablename:
+                results.save_pattern(conn, cur.lastrowid, itemset, support)
+                if itemset in self.lattice:
+                    self.lattice.save_links(conn, itemset, cur.lastrowid)
             conn.commit()
 
+        if self.hooks:
+            self._exit('database')
+        if stats is not None:
+            stats.time['database'] += time.perf_counter() - start
+
+    @staticmethod
+    def describe(itemset: memLexRepr) -> dict[int, list[tuple]]:
+        """Events of an itemset by timeline, as (label, start, end)
+
+        The string of this dictionary is what insert saves in the database.
+        """
+
+        eventlist = {}
+        for timeline in range(len(itemset[0])):
+            eventlist[timeline] = []
+        for event in itemset.events_list:
+            eventlist[event.timeline].append(
+                (event.event, event.start, event.end))
+
+        return eventlist
+
+    def _level_stats(self):
+        """lexical_apriori.stats.levelStats: The statistics of the current level, None if not collected."""
+
+        return None if self.stats is None else self.stats.level(self.size)
+
+    def _enter(self, phase: str) -> None:
+        """Notify the hooks that a phase starts"""
+
+        for hook in self.hooks:
+            hook.enter(phase)
+
+    def _exit(self, phase: str) -> None:
+        """Notify the hooks that a phase ends, in the reverse order"""
+
+        for hook in reversed(self.hooks):
+            hook.exit(phase)
+
     def _extract_items(self) -> None:
         """Extract all singlets from the dataset
 
@@ -143,19 +257,38 @@ class apriori:
         """
         temp = list()
 
+        for new_event in apriori._find_singlets(self.dataset):
+            if not (self.cut_solutions is not None and 
+                             new_event in self.cut_solutions):
+                temp.append(new_event)
+
+        # Keep the first occurrence of every singlet, as the order of the singlets
+        # changes the forbidden rules found, and so the itemsets of later levels
+        self.singlets = list(dict.fromkeys(temp))
+
+    @staticmethod
+    def _find_singlets(dataset) -> list[memLexRepr]:
+        """List every event of a dataset as a singlet
+
+        Args:
+            dataset: The transactions to parse
+
+        Returns:
+            A list of memLexRepr objects with a single event each, in the
+            order they are found in the dataset. Duplicates are not removed.
+        """
+        temp = list()
+
         # In the whole dataset
-        for data in self.dataset:
+        for data in dataset:
             text_events = data.events_list
             # For every timeline
             for event in text_events:
                 # Generate new event
-                new_event = memLexRepr(memLexRepr.from_event(
-                    event, total_timelines=len(data[0])), ['1', '2'])
-                if not (self.cut_solutions is not None and 
-                                 new_event in self.cut_solutions):
-                    temp.append(new_event)
+                temp.append(memLexRepr._from_trusted(memLexRepr.from_event(
+                    event, total_timelines=len(data[0])), ['1', '2']))
 
-        self.singlets = list(set(temp))
+        return temp
 
     def _generate_next(self) -> list[memLexRepr]:
         """Generate the next size of itemsets
@@ -166,13 +299,25 @@ class apriori:
         the next size.
         If they are, it also adds the forbidden rules of the previous
         size to the current candidate.
+        When more than one worker is requested the generation is
+        delegated to a process pool, see parallel.generate_next.
 
         Returns:
             A list of memLexRepr objects with the next size of itemsets
 
         """
 
+        if self.workers is not None and self.workers > 1:
+            from . import parallel
+            return parallel.generate_next(self)
+
         next_size = []
+        self.candidate_bases[self.size] = []
+
+        stats = self._level_stats()
+        if stats is not None:
+            start = time.perf_counter()
+            reasonable = stats.time['reasonable']
 
         print(f'generating {self.size}:')
 
@@ -180,29 +325,77 @@ class apriori:
             for j in self.frequent_itemsets[1]:
 
                 # Merge itemsets
-                candidates = i.merge(j)
-
-                # Check if candidate is backed by previous size
-                # Remove all events one by one and check if the remaining is in the previous size
-                # If it can always be found, then it is backed by the previous size and can be measured
-                known_candidates = []
-                for candidate in [i for i in candidates]:
-                    if candidate not in known_candidates:
-                        if (not self._check_reasonable(candidate) or
-                                (self.cut_solutions is not None and 
-                                 candidate in self.cut_solutions)):
-                            candidates.remove(candidate)
-                        else:
-                            known_candidates.append(candidate)
-                    else:
-                        candidates.remove(candidate)
+                if self.hooks:
+                    self._enter('merge')
+                    merged = i.merge(j, stats, self.hooks)
+                    self._exit('merge')
+                else:
+                    merged = i.merge(j, stats)
+                if stats is not None:
+                    stats.merges += 1
+                    stats.candidates += len(merged)
+                candidates = self._filter_group(merged, self._check_reasonable)
 
                 # If there are some candidates left, add them to the next size
                 if candidates != []:
                     next_size.append(candidates)
+                    self.candidate_bases[self.size].append(i)
+
+        # Reasonableness checking is measured on its own
+        if stats is not None:
+            stats.time['generation'] += time.perf_counter() - start - (stats.time['reasonable'] - reasonable)
 
         return next_size
 
+    def _filter_group(self, candidates: list[memLexRepr], check) -> list[memLexRepr]:
+        """Remove duplicated and unreasonable candidates from a merge group
+
+        Check if candidate is backed by previous size.
+        Remove all events one by one and check if the remaining is in the previous size.
+        If it can always be found, then it is backed by the previous size and can be measured.
+
+        Args:
+            candidates: The candidates generated by a single merge
+            check: The function used to check if a candidate is reasonable
+
+        Returns:
+            The list of candidates that survived the checks
+
+        """
+
+        stats = self._level_stats()
+
+        known_candidates = []
+        for candidate in [i for i in candidates]:
+            if candidate not in known_candidates:
+                if self.hooks:
+                    self._enter('reasonable')
+                if stats is None:
+                    reasonable = check(candidate)
+                else:
+                    start = time.perf_counter()
+                    reasonable = check(candidate)
+                    stats.time['reasonable'] += time.perf_counter() - start
+                if self.hooks:
+                    self._exit('reasonable')
+
+                if not reasonable:
+                    if stats is not None:
+                        stats.pruned_reasonable += 1
+                    candidates.remove(candidate)
+                elif self.cut_solutions is not None and candidate in self.cut_solutions:
+                    if stats is not None:
+                        stats.pruned_cut += 1
+                    candidates.remove(candidate)
+                else:
+                    known_candidates.append(candidate)
+            else:
+                if stats is not None:
+                    stats.pruned_duplicates += 1
+                candidates.remove(candidate)
+
+        return candidates
+
     def _check_reasonable(self, candidate: memLexRepr) -> bool:
         """Check if a candidate is backed by the previous size
 
@@ -216,14 +409,37 @@ class apriori:
 
         Args:
             candidate: The candidate to check
-            current_set: The previous size as set for faster search
 
         Returns:
             True if the candidate is backed by the previous size,
             False otherwise
 
         """
-        found = True
+
+        parents = apriori._find_parents(candidate, self.frequent_itemsets[self.size-1])
+        return self._apply_reasonable(candidate, parents)
+
+    @staticmethod
+    def _find_parents(candidate: memLexRepr, previous: list[memLexRepr]) -> list[tuple]:
+        """Find the itemsets of the previous size backing a candidate
+
+        Removes all events one by one from the candidate and looks for the
+        remaining itemset in the previous size.
+        This step only reads the itemsets, so it can be run in a separate
+        process. The rules it computes are applied by _apply_reasonable.
+
+        Args:
+            candidate: The candidate to check
+            previous: The frequent itemsets of the previous size
+
+        Returns:
+            A list with an entry for every event of the candidate, in the form
+            (event, index of the match in previous or None, instants of the
+            candidate without the event, rule to forbid for the match or None)
+
+        """
+
+        parents = []
 
         # Check if candidate is backed by previous size
         for event in candidate.events_list:
@@ -232,128 +448,175 @@ class apriori:
             candidate_previous = candidate.delete_event(event)
 
             # Try to get a match
-            # match_candidate = self.frequent_itemsets_set[self.size-1] & {candidate_previous}
             match_candidate = []
-            for i in self.frequent_itemsets[self.size-1]:
+            for index, i in enumerate(previous):
                 if i == candidate_previous:
-                    match_candidate.append(i)
+                    match_candidate.append(index)
 
             # If there is no match, then the candidate is not backed by the previous size and can be removed
             if len(match_candidate) == 0:
-                found = False
-            else:
-                assert len(
-                    match_candidate) == 1, f'Found more than one match for {candidate_previous}'
-
-                shifted_rule = {}
-                match_candidate = match_candidate.pop()
-                # Forward pass
-                for event_name in match_candidate.forbidden:
-                    shifted_rule[event_name] = []
-                for event_name in match_candidate.forbidden:
-
-                    for rule in match_candidate.forbidden[event_name]:
-
-                        # Create new shifted rule
-                        temp_start = []
-                        temp_end = []
-                        for i in rule.start:
-                            if bool(re.match('^0+$', i)):
-                                temp_start.append(
-                                    '0'*len(candidate.instants[0]))
-                            elif bool(re.match('^30*$', i)):
-                                temp_start.append(
-                                    '3' + '0'*(len(candidate.instants[0])-1))
-                            else:
-                                temp_start.append(
-                                    candidate_previous.instants[match_candidate.instants.index(i)])
-                        for i in rule.end:
-                            if bool(re.match('^0+$', i)):
-                                temp_end.append('0'*len(candidate.instants[0]))
-                            elif bool(re.match('^30*$', i)):
-                                temp_end.append(
-                                    '3' + '0'*(len(candidate.instants[0])-1))
-                            else:
-                                temp_end.append(
-                                    candidate_previous.instants[match_candidate.instants.index(i)])
-
-                        # Add rule to candidate forbidden
-                        shifted_rule[event_name].append(
-                            intervals.forbidden_interval(tuple(temp_start), tuple(temp_end)))
-                    candidate.forbidden = shifted_rule
-
-                # Backward pass
-                # Find start interval
-                temp_start = []
-                try:
-                    # If the instant actually coincides
-                    temp_start.append(match_candidate.instants[candidate_previous.instants.index(
-                        candidate.instants[event.start])])
-                except ValueError:
-                    # Start event is in the first instant
-                    if event.start == 0:
-
-                        # start of interval is 0, end is the first event
+                parents.append((event, None, candidate_previous.instants, None))
+                continue
+
+            assert len(
+                match_candidate) == 1, f'Found more than one match for {candidate_previous}'
+            match_index = match_candidate.pop()
+            match_candidate = previous[match_index]
+
+            # Backward pass
+            # Find start interval
+            temp_start = []
+            try:
+                # If the instant actually coincides
+                temp_start.append(match_candidate.instants[candidate_previous.instants.index(
+                    candidate.instants[event.start])])
+            except ValueError:
+                # Start event is in the first instant
+                if event.start == 0:
+
+                    # start of interval is 0, end is the first event
+                    temp_start.append(
+                        '0'*(len(match_candidate.instants[0])))
+                    temp_start.append(
+                        match_candidate.instants[event.start])
+
+                else:
+
+                    # Get the previous instant's index
+                    previous_instant = candidate.instants[event.start-1]
+                    previous_instant_index = candidate_previous.instants.index(
+                        previous_instant)
+
+                    # Add this instant as start
+                    temp_start.append(
+                        match_candidate.instants[previous_instant_index])
+
+                    # If it was the last instant, add 3 as end
+                    if previous_instant_index == len(candidate_previous.instants)-1:
                         temp_start.append(
-                            '0'*(len(match_candidate.instants[0])))
+                            '3' + '0'*(len(match_candidate.instants[0])-1))
+                    else:
+                        # Otherwise add the next instant as end
                         temp_start.append(
-                            match_candidate.instants[event.start])
+                            match_candidate.instants[previous_instant_index+1])
+
+            temp_end = []
+            try:
+                # If the instant actually coincides
+                temp_end.append(match_candidate.instants[candidate_previous.instants.index(
+                    candidate.instants[event.end])])
+            except ValueError:
+                # If the end event is the last instant
+                if event.end == len(candidate.instants)-1:
+                    # The interval is the last instant and 3
+                    temp_end.append(match_candidate.instants[-1])
+                    temp_end.append(
+                        '3' + '0'*(len(match_candidate.instants[0])-1))
+                else:
+
+                    # Otherwise get the next instant's index
+                    next_instant = candidate.instants[event.end+1]
+                    next_instant_index = candidate_previous.instants.index(
+                        next_instant)
 
+                    # If the next instant is the first one, add 0 as start
+                    if next_instant_index == 0:
+                        temp_end.append(
+                            '0'*(len(match_candidate.instants[0])))
                     else:
+                        # Otherwise add the previous instant as start
+                        temp_end.append(
+                            match_candidate.instants[next_instant_index-1])
 
-                        # Get the previous instant's index
-                        previous_instant = candidate.instants[event.start-1]
-                        previous_instant_index = candidate_previous.instants.index(
-                            previous_instant)
+                    # Add this instant as end
+                    temp_end.append(
+                        match_candidate.instants[next_instant_index])
 
-                        # Add this instant as start
-                        temp_start.append(
-                            match_candidate.instants[previous_instant_index])
+            shifted_rule = intervals.forbidden_interval(
+                tuple(temp_start), tuple(temp_end))
+            parents.append((event, match_index, candidate_previous.instants, shifted_rule))
+
+        return parents
+
+    def _apply_reasonable(self, candidate: memLexRepr, parents: list[tuple]) -> bool:
+        """Apply the forbidden rules found by _find_parents
+
+        Adds the forbidden rules of the matched itemsets of the previous size
+        to the candidate (forward pass) and forbids the candidate's insertion
+        in the matched itemsets (backward pass).
+        Entries are applied in order, as the forward pass of an event reads
+        the rules written by the backward pass of the previous ones.
+
+        Args:
+            candidate: The candidate to check
+            parents: The output of _find_parents for the candidate
 
-                        # If it was the last instant, add 3 as end
-                        if previous_instant_index == len(candidate_previous.instants)-1:
+        Returns:
+            True if the candidate is backed by the previous size,
+            False otherwise
+
+        """
+        found = True
+
+        for event, match_index, previous_instants, backward_rule in parents:
+
+            # If there is no match, then the candidate is not backed by the previous size and can be removed
+            if match_index is None:
+                found = False
+                continue
+
+            match_candidate = self.frequent_itemsets[self.size-1][match_index]
+
+            # The candidate can only be found where all of its parents are
+            if match_candidate.tids is not None:
+                if candidate.tids is None:
+                    candidate.tids = match_candidate.tids
+                else:
+                    candidate.tids &= match_candidate.tids
+
+            # Forward pass
+            shifted_rule = {}
+            for event_name in match_candidate.forbidden:
+                shifted_rule[event_name] = []
+            for event_name in match_candidate.forbidden:
+
+                for rule in match_candidate.forbidden[event_name]:
+
+                    # Create new shifted rule
+                    temp_start = []
+                    temp_end = []
+                    for i in rule.start:
+                        if bool(re.match('^0+$', i)):
+                            temp_start.append(
+                                '0'*len(candidate.instants[0]))
+                        elif bool(re.match('^30*$', i)):
                             temp_start.append(
-                                '3' + '0'*(len(match_candidate.instants[0])-1))
+                                '3' + '0'*(len(candidate.instants[0])-1))
                         else:
-                            # Otherwise add the next instant as end
                             temp_start.append(
-                                match_candidate.instants[previous_instant_index+1])
-
-                temp_end = []
-                try:
-                    # If the instant actually coincides
-                    temp_end.append(match_candidate.instants[candidate_previous.instants.index(
-                        candidate.instants[event.end])])
-                except ValueError:
-                    # If the end event is the last instant
-                    if event.end == len(candidate.instants)-1:
-                        # The interval is the last instant and 3
-                        temp_end.append(match_candidate.instants[-1])
-                        temp_end.append(
-                            '3' + '0'*(len(match_candidate.instants[0])-1))
-                    else:
-
-                        # Otherwise get the next instant's index
-                        next_instant = candidate.instants[event.end+1]
-                        next_instant_index = candidate_previous.instants.index(
-                            next_instant)
-
-                        # If the next instant is the first one, add 0 as start
-                        if next_instant_index == 0:
+                                previous_instants[match_candidate.instants.index(i)])
+                    for i in rule.end:
+                        if bool(re.match('^0+$', i)):
+                            temp_end.append('0'*len(candidate.instants[0]))
+                        elif bool(re.match('^30*$', i)):
                             temp_end.append(
-                                '0'*(len(match_candidate.instants[0])))
+                                '3' + '0'*(len(candidate.instants[0])-1))
                         else:
-                            # Otherwise add the previous instant as start
                             temp_end.append(
-                                match_candidate.instants[next_instant_index-1])
+                                previous_instants[match_candidate.instants.index(i)])
 
-                        # Add this instant as end
-                        temp_end.append(
-                            match_candidate.instants[next_instant_index])
+                    # Add rule to candidate forbidden
+                    shifted_rule[event_name].append(
+                        intervals.forbidden_interval(tuple(temp_start), tuple(temp_end)))
+                candidate.forbidden = shifted_rule
+
+            # Backward pass
+            match_candidate.forbidden = {event.event: [backward_rule]}
 
-                shifted_rule = intervals.forbidden_interval(
-                    tuple(temp_start), tuple(temp_end))
-                match_candidate.forbidden = {event.event: [shifted_rule]}
+        # Links of the lattice, added if the candidate turns out to be frequent
+        if found:
+            self._candidate_parents[candidate] = [
+                self.frequent_itemsets[self.size-1][match_index] for _, match_index, _, _ in parents]
 
         return found
 
@@ -367,19 +630,48 @@ class apriori:
 
         # Check support for every generated group and remove unsupported ones, saving them into forbidden rules
         temp = copy.deepcopy(self.candidate_next[self.size])
+
+        # Parents of the candidates, by value as the candidates are copied
+        parents = self._candidate_parents
+        self._candidate_parents = {}
+
+        stats = self._level_stats()
+        if stats is not None:
+            start = time.perf_counter()
+            stats.measured += sum(len(i) for i in temp)
+        if self.hooks:
+            self._enter('support')
+
+        if self.engine == 'group':
+            supports = iter(self._count_group_support([j for i in temp for j in i]))
+        else:
+            bases = [base for group, base in zip(temp, self.candidate_bases[self.size]) for _ in group]
+            supports = iter(self._count_support([j for i in temp for j in i], bases))
+
+        if self.hooks:
+            self._exit('support')
+        if stats is not None:
+            stats.time['support'] += time.perf_counter() - start
         for group in temp:
             for candidate in [i for i in group]:
-                if self.support(candidate) < self.epsilon:
+                supp = next(supports)
+                if supp < self.epsilon:
                     group.remove(candidate)
                     if self.database is not None and self.save_all:
-                        self.insert(candidate, self.support(candidate), self.unfrequent_tablename)
+                        self.insert(candidate, supp, self.unfrequent_tablename)
                 else:
+                    self.lattice.add(candidate, supp, parents.get(candidate, []))
                     if self.database is not None:
-                        self.insert(candidate, self.support(candidate), self.frequent_tablename)
+                        self.insert(candidate, supp, self.frequent_tablename)
 
         # Extract supported ones from nonempty groups
         return [j for i in temp for j in i if len(i) != 0]
 
+    def n_transactions(self) -> int:
+        """int: The number of transactions of the dataset."""
+
+        return len(self.dataset)
+
     def support(self, itemset: memLexRepr) -> float:
         """Calculate support for an itemset
 
@@ -390,6 +682,317 @@ class apriori:
         """
         return sum([itemset in data for data in self.dataset])/len(self.dataset)
 
+    def _count_support(self, itemsets: list[memLexRepr], bases: list[memLexRepr] = None) -> list[float]:
+        """Calculate support for a batch of itemsets
+
+        Every support of a level is requested through this method, so that
+        subclasses can count a whole level at once (see distributed.coordinator).
+
+        Args:
+            itemsets: The itemsets to measure
+            bases: The itemset every itemset has been merged from, if known
+
+        Returns:
+            The support of every itemset, in the same order
+        """
+        if bases is None:
+            bases = [None]*len(itemsets)
+        return [self._support_tids(itemset, base) for itemset, base in zip(itemsets, bases)]
+
+    def _support_tids(self, itemset: memLexRepr, base: memLexRepr = None) -> float:
+        """Calculate support for an itemset using its transactions bitmap
+
+        Support is anti-monotone, so an itemset can only be found in the
+        transactions containing all of its parents. Their intersection is
+        stored in itemset.tids by _apply_reasonable, and only those
+        transactions are searched. The bitmap is then replaced with the
+        transactions actually containing the itemset, to be inherited by
+        its children.
+        If the number of transactions left cannot reach epsilon, the search
+        is skipped and that upper bound is returned, unless the exact support
+        has to be saved into the database.
+
+        Args:
+            itemset: The itemset to measure
+            base: The itemset it has been merged from, used by the embeddings engine
+
+        Returns:
+            The support of the itemset, or an upper bound below epsilon
+        """
+
+        transactions = len(self.dataset)
+
+        # No parent has been measured, look everywhere
+        if itemset.tids is None:
+            itemset.tids = (1 << transactions) - 1
+
+        # Upper bound for the support
+        bound = apriori._count_tids(itemset.tids)/transactions
+        if bound < self.epsilon and not (self.database is not None and self.save_all):
+            return bound
+
+        if self.stats is not None:
+            self._level_stats().containment_checks += apriori._count_tids(itemset.tids)
+
+        if self.engine == 'embeddings':
+            found = self._match_embeddings(itemset, base)
+        else:
+            found = 0
+            for index in apriori._iter_tids(itemset.tids):
+                if itemset in self.dataset[index]:
+                    found |= 1 << index
+
+        itemset.tids = found
+        return apriori._count_tids(found)/transactions
+
+    def _count_group_support(self, itemsets: list[memLexRepr]) -> list[float]:
+        """Calculate support for a whole level in one pass per transaction
+
+        The itemsets are stored in a lex_match.patternTrie, so that the
+        instants they share are matched once per transaction. Every
+        transaction is searched only for the itemsets whose bitmap contains
+        it, and bounds below epsilon are handled as in _support_tids.
+
+        Args:
+            itemsets: The itemsets to measure
+
+        Returns:
+            The support of every itemset, or an upper bound below epsilon, in the same order
+        """
+
+        encoded = self._encode_dataset()
+        transactions = len(self.dataset)
+
+        supports = [None]*len(itemsets)
+        searched = []
+        wanted = [0]*transactions
+        for position, itemset in enumerate(itemsets):
+
+            # No parent has been measured, look everywhere
+            if itemset.tids is None:
+                itemset.tids = (1 << transactions) - 1
+
+            # Upper bound for the support
+            bound = apriori._count_tids(itemset.tids)/transactions
+            if bound < self.epsilon and not (self.database is not None and self.save_all):
+                supports[position] = bound
+                continue
+
+            bit = 1 << len(searched)
+            for index in apriori._iter_tids(itemset.tids):
+                wanted[index] |= bit
+            searched.append(position)
+
+            if self.stats is not None:
+                self._level_stats().containment_checks += apriori._count_tids(itemset.tids)
+
+        patterns = [self.vocabulary.encode_rows(itemsets[i].data) for i in searched]
+        if self.workers is not None and self.workers > 1:
+            from . import parallel
+            found = parallel.count_group_support(self, patterns, wanted)
+        else:
+            trie = lex_match.patternTrie(patterns)
+            found = [0]*len(searched)
+            for index in range(transactions):
+                if wanted[index] != 0:
+                    for pattern in apriori._iter_tids(trie.match(encoded[index], wanted[index])):
+                        found[pattern] |= 1 << index
+
+        for position, tids in zip(searched, found):
+            itemsets[position].tids = tids
+            supports[position] = apriori._count_tids(tids)/transactions
+
+        return supports
+
+    def _encode_dataset(self) -> list:
+        """Encode the dataset for the engines working on codes
+
+        Returns:
+            The list of encoded transactions
+        """
+
+        if self.encoded_dataset is None:
+            self.vocabulary = vocabulary()
+            self.encoded_dataset = [self.vocabulary.encode_rows(data.data) for data in self.dataset]
+        return self.encoded_dataset
+
+    def _share_dataset(self) -> sharedDataset:
+        """Publish the encoded dataset into shared memory for the worker processes
+
+        The dataset is published on first use and stays available until
+        _release_dataset is called at the end of apriori.
+
+        Returns:
+            The shared dataset
+        """
+
+        if self.shared_dataset is None:
+            self.shared_dataset = sharedDataset.publish(self._encode_dataset())
+        return self.shared_dataset
+
+    def _release_dataset(self) -> None:
+        """Remove the encoded dataset from shared memory, if it has been published"""
+
+        if self.shared_dataset is not None:
+            self.shared_dataset.close()
+            self.shared_dataset = None
+
+    def _match_embeddings(self, itemset: memLexRepr, base: memLexRepr = None) -> int:
+        """Search an itemset using the embeddings of its base
+
+        For every transaction in itemset.tids, the embeddings of the itemset
+        are derived from the ones of its base, checking only where the event
+        added by the merge can be placed. When the base is unknown, or it had
+        too many embeddings in a transaction to store them, the itemset is
+        matched from scratch.
+        The embeddings found are stored in itemset.embeddings, so that the
+        children of the itemset can do the same.
+
+        Args:
+            itemset: The itemset to search
+            base: The itemset it has been merged from
+
+        Returns:
+            The bitmap of the transactions containing the itemset
+        """
+
+        encoded = self._encode_dataset()
+
+        pattern = None
+        description = None
+        itemset.embeddings = {}
+
+        found = 0
+        for index in apriori._iter_tids(itemset.tids):
+            base_embeddings = None
+            if base is not None and base.embeddings is not None:
+                base_embeddings = base.embeddings.get(index)
+
+            if base_embeddings is not None:
+                if description is None:
+                    description = lex_match.describe_extension(base, itemset, self.vocabulary)
+                embeddings = lex_match.extend_embeddings(
+                    description, base_embeddings, encoded[index], self.embedding_limit)
+            else:
+                if pattern is None:
+                    pattern = lex_match.compiledPattern(self.vocabulary.encode_rows(itemset.data))
+                embeddings = lex_match.embeddings(pattern, encoded[index], self.embedding_limit)
+
+            # Too many embeddings to store, the itemset has been found anyway
+            if embeddings is None or len(embeddings) != 0:
+                found |= 1 << index
+                itemset.embeddings[index] = embeddings
+
+        return found
+
+    @staticmethod
+    def _count_tids(tids: int) -> int:
+        """Number of transactions in a bitmap"""
+
+        return bin(tids).count('1')
+
+    @staticmethod
+    def _iter_tids(tids: int):
+        """Iterate over the transactions of a bitmap in increasing order"""
+
+        while tids:
+            lowest = tids & -tids
+            yield lowest.bit_length() - 1
+            tids ^= lowest
+
+    def levels(self):
+        """Run the apriori algorithm one level at a time
+
+        Generator version of apriori: the frequent itemsets of every size are
+        yielded as soon as they are found, so that the caller can inspect the
+        run between two levels, change epsilon (see raise_threshold) or stop it
+        by closing the generator.
+
+        Yields:
+            The pair (size, frequent itemsets of that size), for every size.
+        """
+
+        self.size = 1
+        stats = self._level_stats()
+        for hook in self.hooks:
+            hook.start_level(self.size)
+
+        try:
+            # Generate first size
+            if stats is not None:
+                start = time.perf_counter()
+            if self.hooks:
+                self._enter('generation')
+            if self.singlets == []:
+                self._extract_items()
+            if self.hooks:
+                self._exit('generation')
+            if stats is not None:
+                stats.time['generation'] += time.perf_counter() - start
+                stats.candidates = stats.measured = len(self.singlets)
+
+            # Save first size
+            self.candidate_next[self.size] = [self.singlets]
+
+            self.frequent_itemsets[self.size] = []
+
+            # Filter out unsupported ones
+            if stats is not None:
+                start = time.perf_counter()
+            if self.hooks:
+                self._enter('support')
+            supports = self._count_support(self.singlets)
+            if self.hooks:
+                self._exit('support')
+            if stats is not None:
+                stats.time['support'] += time.perf_counter() - start
+
+            for itemset, supp in zip(self.singlets, supports):
+                if supp >= self.epsilon:
+                    self.frequent_itemsets[self.size].append(itemset)
+                    self.lattice.add(itemset, supp)
+                    if self.database is not None:
+                        self.insert(itemset, supp, self.frequent_tablename)
+                else:
+                    if self.database is not None and self.save_all:
+                        self.insert(itemset, supp, self.unfrequent_tablename)
+
+            if self.stats is not None:
+                self.stats.close_level(self.size, len(self.frequent_itemsets[self.size]))
+            for hook in self.hooks:
+                hook.end_level(self.size)
+            yield self.size, self.frequent_itemsets[self.size]
+
+            while self.frequent_itemsets[self.size] != []:
+                self.size += 1
+                for hook in self.hooks:
+                    hook.start_level(self.size)
+
+                # Generate next batch of candidates
+                if self.hooks:
+                    self._enter('generation')
+                self.candidate_next[self.size] = self._generate_next()
+                if self.hooks:
+                    self._exit('generation')
+
+                # Filter out unsupported ones
+                self.frequent_itemsets[self.size] = self._check_group_support()
+
+                # Embeddings are only needed to measure the children of an itemset
+                for itemset in self.frequent_itemsets[self.size-1]:
+                    itemset.embeddings = None
+
+                if self.stats is not None:
+                    self.stats.close_level(self.size, len(self.frequent_itemsets[self.size]))
+                for hook in self.hooks:
+                    hook.end_level(self.size)
+                yield self.size, self.frequent_itemsets[self.size]
+        finally:
+            # Shared memory outlives the process if not removed
+            self._release_dataset()
+            for hook in self.hooks:
+                hook.finish()
+
     def apriori(self) -> dict[int, list[memLexRepr]]:
         """Apriori algorithm
 
@@ -407,37 +1010,34 @@ class apriori:
 
         """
 
-        # Generate first size
-        if self.singlets == []:
-            self._extract_items()
-        self.size = 1
+        for _ in self.levels():
+            pass
 
-        # Save first size
-        self.candidate_next[self.size] = [self.singlets]
+        return self.frequent_itemsets
 
-        self.frequent_itemsets[self.size] = []
+    def raise_threshold(self, epsilon: float) -> None:
+        """Raise the minimum support threshold during a run
 
-        # Filter out unsupported ones
-        for itemset in self.singlets:
-            supp = self.support(itemset)
-            if supp >= self.epsilon:
-                self.frequent_itemsets[self.size].append(itemset)
-                if self.database is not None:
-                    self.insert(itemset, supp, self.frequent_tablename)
-            else:
-                if self.database is not None and self.save_all:
-                    self.insert(itemset, supp, self.unfrequent_tablename)
+        Frequent itemsets found so far whose support is below the new
+        threshold are dropped, so that the next levels are generated as if
+        the run had started with it.
 
-        while self.frequent_itemsets[self.size] != []:
-            self.size += 1
+        Args:
+            epsilon: The new minimum support threshold
 
-            # Generate next batch of candidates
-            self.candidate_next[self.size] = self._generate_next()
+        Raises:
+            ValueError: If the new threshold is lower than the current one
+        """
 
-            # Filter out unsupported ones
-            self.frequent_itemsets[self.size] = self._check_group_support()
+        if epsilon < self.epsilon:
+            raise ValueError(f'Threshold can only be raised, {epsilon} is lower than {self.epsilon}')
+        self.epsilon = epsilon
 
-        return self.frequent_itemsets
+        # Every frequent itemset is in the lattice, with its support
+        for size in self.frequent_itemsets:
+            self.frequent_itemsets[size] = [itemset for itemset in self.frequent_itemsets[size]
+                                            if self.lattice.support(itemset) >= epsilon]
+        self.lattice = self.lattice.filter(lambda itemset, support: support >= epsilon)
 
     def print_statistics(self) -> None:
 
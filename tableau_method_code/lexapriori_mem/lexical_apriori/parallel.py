@@ -0,0 +1,216 @@
+"""Parallel candidate generation for the apriori algorithm
+
+This module distributes the generation of the next size of itemsets over a
+pool of processes.
+
+Merging a frequent itemset with every singlet and looking up the parents of
+the resulting candidates only reads the itemsets of the previous size, so it
+is done by the workers. Forbidden rules, on the other hand, are written back
+into the itemsets while the level is generated and they change which
+insertions later merges are allowed to make. Workers therefore merge against
+the rules known at the start of the level, which can only produce more
+candidates than the serial run, and the main process replays the results in
+the serial order: every candidate is filtered with the rules known at that
+point and the rules found by the workers are applied one by one.
+This makes the generated groups, and the forbidden rules of every itemset,
+identical to the ones of the serial implementation.
+
+With the 'group' engine, the support of a level is counted by the pool as
+well. The encoded dataset is published once into shared memory (see
+lex_shared) and the workers attach to it instead of receiving a copy: every
+worker matches the candidates of the level against a slice of the
+transactions, and the main process collects the transactions containing
+every candidate.
+
+Example:
+    The number of processes is chosen when creating the apriori object:
+
+        >>> from lexApriori import apriori
+        >>> a = apriori(dataset, 0.5, workers=4)
+        >>> frequent_itemsets = a.apriori()
+
+"""
+
+from __future__ import annotations
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from tqdm import tqdm
+
+from ..lex import lex_match
+from ..lex.lex_shared import sharedDataset
+from .stats import levelStats
+
+# Itemsets shared with the worker processes, set once per level by _init_worker
+_previous = None
+_singlets = None
+
+# Dataset and candidates shared with the worker processes, set once per level by _init_counter
+_dataset = None
+_trie = None
+
+
+def _init_worker(previous: list, singlets: list) -> None:
+    """Store the itemsets of the current level in the worker process"""
+
+    global _previous, _singlets
+    _previous = previous
+    _singlets = singlets
+
+
+def _generate_chunk(indexes: list[int]) -> list[tuple]:
+    """Merge a chunk of frequent itemsets with every singlet
+
+    Args:
+        indexes: The positions of the itemsets to merge in the previous size
+
+    Returns:
+        A list with an entry for every merge, in the form
+        (index, [(candidate, parents), ...], pruned) where parents is the
+        output of apriori._find_parents for the candidate and pruned the
+        number of insertions ruled out by the forbidden rules.
+    """
+
+    from .lexApriori import apriori
+
+    output = []
+    for index in indexes:
+        for j in _singlets:
+            stats = levelStats(0)
+            candidates = _previous[index].merge(j, stats)
+
+            # Look for parents only once for duplicated candidates
+            parents = {}
+            group = []
+            for candidate in candidates:
+                if candidate not in parents:
+                    parents[candidate] = apriori._find_parents(candidate, _previous)
+                group.append((candidate, parents[candidate]))
+
+            output.append((index, group, stats.pruned_forbidden))
+
+    return output
+
+
+def _init_counter(handle: tuple, patterns: list) -> None:
+    """Attach the worker process to the shared dataset and compile the candidates of the level"""
+
+    global _dataset, _trie
+    _dataset = sharedDataset.attach(handle)
+    _trie = lex_match.patternTrie(patterns)
+
+
+def _count_chunk(wanted: list[tuple[int, int]]) -> list[tuple[int, int]]:
+    """Match the candidates of the level against a chunk of transactions
+
+    Args:
+        wanted: For every transaction of the chunk, the pair (index, candidates)
+            where candidates is the bitmap of the candidates to search in it.
+
+    Returns:
+        For every transaction of the chunk, the pair (index, found) where found
+        is the bitmap of the candidates it contains.
+    """
+
+    return [(index, _trie.match(_dataset[index], candidates)) for index, candidates in wanted]
+
+
+def _chunks(size: int, workers: int) -> list[list[int]]:
+    """Split the indexes of a level into chunks, a few for each worker"""
+
+    chunk_size = max(1, size // (workers * 4))
+    return [list(range(i, min(i + chunk_size, size))) for i in range(0, size, chunk_size)]
+
+
+def generate_next(miner) -> list:
+    """Generate the next size of itemsets using a pool of processes
+
+    Produces the same output as apriori._generate_next, including the
+    forbidden rules written into the itemsets of the previous size.
+
+    Args:
+        miner: The apriori object whose next size has to be generated
+
+    Returns:
+        A list of groups of memLexRepr objects with the next size of itemsets
+    """
+
+    previous = miner.frequent_itemsets[miner.size-1]
+    singlets = miner.frequent_itemsets[1]
+
+    stats = miner._level_stats()
+    if stats is not None:
+        start = time.perf_counter()
+        reasonable = stats.time['reasonable']
+
+    print(f'generating {miner.size} with {miner.workers} workers:')
+
+    with ProcessPoolExecutor(max_workers=miner.workers, initializer=_init_worker,
+                             initargs=(previous, singlets)) as executor:
+        results = [merge for chunk in executor.map(_generate_chunk, _chunks(len(previous), miner.workers))
+                   for merge in chunk]
+
+    # Replay the merges in the same order as the serial implementation
+    next_size = []
+    miner.candidate_bases[miner.size] = []
+    for index, group, pruned in tqdm(results):
+        base = previous[index]
+
+        # Workers only knew the rules at the start of the level, drop what has been forbidden since
+        candidates = []
+        parents = {}
+        for candidate, candidate_parents in group:
+            item, (start_point, end_point) = candidate.insertion_points()
+            if not base.forbids(item, start_point, end_point):
+                candidates.append(candidate)
+                parents[id(candidate)] = candidate_parents
+
+        if stats is not None:
+            stats.merges += 1
+            stats.candidates += len(candidates)
+            stats.pruned_forbidden += pruned + len(group) - len(candidates)
+
+        candidates = miner._filter_group(
+            candidates, lambda candidate: miner._apply_reasonable(candidate, parents[id(candidate)]))
+
+        # If there are some candidates left, add them to the next size
+        if candidates != []:
+            next_size.append(candidates)
+            miner.candidate_bases[miner.size].append(base)
+
+    # Reasonableness checking is measured on its own
+    if stats is not None:
+        stats.time['generation'] += time.perf_counter() - start - (stats.time['reasonable'] - reasonable)
+
+    return next_size
+
+
+def count_group_support(miner, patterns: list, wanted: list[int]) -> list[int]:
+    """Match the candidates of a level using a pool of processes
+
+    Produces the same output as matching a lex_match.patternTrie of the
+    patterns against every transaction in the main process.
+
+    Args:
+        miner: The apriori object whose level has to be measured
+        patterns: The encoded candidates to search
+        wanted: For every transaction, the bitmap of the candidates to search in it
+
+    Returns:
+        For every candidate, the bitmap of the transactions containing it
+    """
+
+    shared = miner._share_dataset()
+    searched = [(index, candidates) for index, candidates in enumerate(wanted) if candidates != 0]
+
+    with ProcessPoolExecutor(max_workers=miner.workers, initializer=_init_counter,
+                             initargs=(shared.handle(), patterns)) as executor:
+        chunks = [[searched[i] for i in chunk] for chunk in _chunks(len(searched), miner.workers)]
+        results = [match for chunk in executor.map(_count_chunk, chunks) for match in chunk]
+
+    found = [0]*len(patterns)
+    for index, matched in results:
+        for pattern in miner._iter_tids(matched):
+            found[pattern] |= 1 << index
+
+    return found
@@ -0,0 +1,220 @@
+"""Phase-level profiler of a mining run
+
+This module provides a hook (see lexical_apriori.hooks) profiling every phase
+of every level on its own, so that where the time goes inside a level can be
+seen on real data.
+
+Two modes are available:
+    sample: the stack of the miner is sampled every interval seconds of CPU
+        time with SIGPROF. Samples are saved per level as collapsed stacks,
+        the phases being the outermost frames (for flamegraph.pl, inferno,
+        speedscope...), and as speedscope files with a profile per phase.
+    cprofile: every phase of every level is profiled with its own
+        cProfile.Profile, saved as a pstats file per level and phase.
+
+Sampling uses signals, so the miner must run in the main thread, on Unix.
+Worker processes are not profiled.
+
+Example:
+    The following example shows how to profile a run:
+
+        >>> profiler = phaseProfiler('sample', interval=0.001)
+        >>> a = apriori(dataset, 0.05, hooks=[profiler])
+        >>> frequent_itemsets = a.apriori()
+        >>> profiler.export('profile/')
+
+"""
+
+from __future__ import annotations
+import collections
+import cProfile
+import json
+import os
+import signal
+
+from .hooks import miningHooks
+
+MODES = ('sample', 'cprofile')
+
+# Samples taken outside of every phase
+OTHER = 'other'
+
+SPEEDSCOPE_SCHEMA = 'https://www.speedscope.app/file-format-schema.json'
+
+
+def frame_name(code) -> str:
+    """Name of the function of a code object, with where it is defined"""
+
+    return f'{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})'
+
+
+class phaseProfiler(miningHooks):
+    """Profiler of every phase of every level of a mining run
+
+    Phases are named by their path, e.g. generation;merge;forbidden for the
+    forbidden step of a merge.
+
+    Attributes:
+        mode: How phases are profiled, one of MODES.
+        interval: The CPU seconds between two samples.
+        samples: The number of samples of every stack, by level and phase.
+        profiles: The cProfile.Profile of every phase, by level.
+    """
+
+    def __init__(self, mode: str = 'sample', interval: float = 0.005):
+        if mode not in MODES:
+            raise ValueError(f'Unknown mode {mode}, expected one of {MODES}')
+        self.mode = mode
+        self.interval = interval
+
+        self.samples = {}
+        self.profiles = {}
+
+        self._size = None
+        # Phases currently entered, the innermost last
+        self._phases = []
+        # Handler of SIGPROF before sampling started, if sampling
+        self._handler = None
+
+    def _phase(self) -> str:
+        return ';'.join(self._phases) if self._phases != [] else OTHER
+
+    def _profile(self) -> cProfile.Profile:
+        # Profile of the innermost phase entered
+        profiles = self.profiles.setdefault(self._size, {})
+        phase = self._phase()
+        if phase not in profiles:
+            profiles[phase] = cProfile.Profile()
+        return profiles[phase]
+
+    def _sample(self, signum, frame) -> None:
+        stack = []
+        while frame is not None:
+            stack.append(frame_name(frame.f_code))
+            frame = frame.f_back
+        stack.reverse()
+
+        stacks = self.samples.setdefault(self._size, {}).setdefault(self._phase(), collections.Counter())
+        stacks[tuple(stack)] += 1
+
+    def _stop(self) -> None:
+        if self._handler is not None:
+            signal.setitimer(signal.ITIMER_PROF, 0)
+            signal.signal(signal.SIGPROF, self._handler)
+            self._handler = None
+
+        if self.mode == 'cprofile' and self._phases != []:
+            self._profile().disable()
+        self._phases = []
+
+    def start_level(self, size: int) -> None:
+        self._size = size
+        self._phases = []
+        if self.mode == 'sample' and self._handler is None:
+            self._handler = signal.signal(signal.SIGPROF, self._sample)
+            signal.setitimer(signal.ITIMER_PROF, self.interval, self.interval)
+
+    def end_level(self, size: int) -> None:
+        self._stop()
+
+    def finish(self) -> None:
+        self._stop()
+
+    def enter(self, phase: str) -> None:
+        if self.mode == 'cprofile':
+            # Only one profiler can be active, the outer phase is paused
+            if self._phases != []:
+                self._profile().disable()
+            self._phases.append(phase)
+            self._profile().enable()
+        else:
+            self._phases.append(phase)
+
+    def exit(self, phase: str) -> None:
+        if self.mode == 'cprofile':
+            self._profile().disable()
+            self._phases.pop()
+            if self._phases != []:
+                self._profile().enable()
+        else:
+            self._phases.pop()
+
+    def collapsed(self, size: int) -> list[str]:
+        """Samples of a level as collapsed stacks
+
+        Args:
+            size: The size of the itemsets of the level.
+
+        Returns:
+            A line for every stack, with the phase followed by the frames from
+            the outermost, separated by semicolons, and the number of samples.
+        """
+
+        return [f"{phase};{';'.join(stack)} {count}"
+                for phase, stacks in self.samples.get(size, {}).items() for stack, count in stacks.items()]
+
+    def speedscope(self, size: int) -> dict:
+        """Samples of a level in the speedscope file format, with a profile per phase
+
+        Args:
+            size: The size of the itemsets of the level.
+
+        Returns:
+            The content of the speedscope file.
+        """
+
+        frames = {}
+        profiles = []
+        for phase, stacks in self.samples.get(size, {}).items():
+            samples = []
+            weights = []
+            for stack, count in stacks.items():
+                samples.append([frames.setdefault(name, len(frames)) for name in stack])
+                weights.append(count * self.interval)
+            profiles.append({'type': 'sampled', 'name': f'level {size} {phase}', 'unit': 'seconds',
+                             'startValue': 0, 'endValue': sum(weights), 'samples': samples, 'weights': weights})
+
+        return {
+            '$schema': SPEEDSCOPE_SCHEMA,
+            'name': f'level {size}',
+            'exporter': 'lexapriori',
+            'shared': {'frames': [{'name': name} for name in frames]},
+            'profiles': profiles,
+        }
+
+    def export(self, path: str) -> list[str]:
+        """Save the profiles of every level into a directory
+
+        Sampled levels are saved as level-<size>.collapsed and
+        level-<size>.speedscope.json, profiled phases as
+        level-<size>-<phase>.prof, with the semicolons of the phase replaced
+        by dots.
+
+        Args:
+            path: The directory, created if missing.
+
+        Returns:
+            The paths of the files written.
+        """
+
+        os.makedirs(path, exist_ok=True)
+        written = []
+
+        for size in self.samples:
+            name = os.path.join(path, f'level-{size}.collapsed')
+            with open(name, 'w') as file:
+                file.write('\n'.join(self.collapsed(size)) + '\n')
+            written.append(name)
+
+            name = os.path.join(path, f'level-{size}.speedscope.json')
+            with open(name, 'w') as file:
+                json.dump(self.speedscope(size), file)
+            written.append(name)
+
+        for size, profiles in self.profiles.items():
+            for phase, profile in profiles.items():
+                name = os.path.join(path, f"level-{size}-{phase.replace(';', '.')}.prof")
+                profile.dump_stats(name)
+                written.append(name)
+
+        return written
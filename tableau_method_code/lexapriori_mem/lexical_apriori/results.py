@@ -0,0 +1,135 @@
+"""Normalized schema of the results database
+
+The frequent_itemsets table written by apriori stores every itemset as the
+string of apriori.describe, which has to be parsed back with
+ast.literal_eval before anything can be done with it. Alongside it, apriori
+saves the frequent itemsets in typed tables:
+    - patterns: one row per itemset, as (id, size, support, key, timelines),
+      where id is the rowid of the itemset in frequent_itemsets, size its
+      number of events and key its searchable string
+    - pattern_events: the events of every itemset, as
+      (pattern, timeline, label, start, end)
+
+The links between itemsets and their parents are the lattice_edges table of
+lexical_apriori.lattice, whose rowids are the ids of patterns. Patterns are
+indexed by size, support and key, and their events by pattern.
+
+Example:
+    The following example shows how to read the frequent itemsets of size 2
+    with a support of at least 0.5 from a database:
+
+        >>> a = apriori(dataset, 0.05, database='p03.sqlite')
+        >>> frequent_itemsets = a.apriori()
+        >>> read_patterns('p03.sqlite', size=2, min_support=0.5)
+
+"""
+
+from __future__ import annotations
+import sqlite3
+
+from ..lex.lex_base import baseLexRepr, shared_event
+from ..lex.lex_mem import memLexRepr
+from ..tools import preprocess
+
+PATTERNS_TABLENAME = 'patterns'
+EVENTS_TABLENAME = 'pattern_events'
+
+
+def create_tables(conn: sqlite3.Connection) -> None:
+    """Create the tables of the normalized schema, and their indexes, in a results database"""
+
+    conn.execute(f'''CREATE TABLE IF NOT EXISTS {PATTERNS_TABLENAME}(
+                        id INTEGER PRIMARY KEY, size INTEGER NOT NULL, support REAL NOT NULL,
+                        key TEXT NOT NULL, timelines INTEGER NOT NULL)''')
+    conn.execute(f'''CREATE TABLE IF NOT EXISTS {EVENTS_TABLENAME}(
+                        pattern INTEGER NOT NULL REFERENCES {PATTERNS_TABLENAME}(id), timeline INTEGER NOT NULL,
+                        label TEXT NOT NULL, start INTEGER NOT NULL, end INTEGER NOT NULL,
+                        PRIMARY KEY(pattern, timeline, start)) WITHOUT ROWID''')
+    conn.execute(f'CREATE INDEX IF NOT EXISTS {PATTERNS_TABLENAME}_size ON {PATTERNS_TABLENAME}(size)')
+    conn.execute(f'CREATE INDEX IF NOT EXISTS {PATTERNS_TABLENAME}_support ON {PATTERNS_TABLENAME}(support)')
+    conn.execute(f'CREATE INDEX IF NOT EXISTS {PATTERNS_TABLENAME}_key ON {PATTERNS_TABLENAME}(key)')
+
+
+def has_tables(conn: sqlite3.Connection) -> bool:
+    """Check whether a results database has been saved with the normalized schema"""
+
+    tables = {name for name, in conn.execute("SELECT name FROM sqlite_master WHERE type='table'")}
+    return PATTERNS_TABLENAME in tables and EVENTS_TABLENAME in tables
+
+
+def save_pattern(conn: sqlite3.Connection, id: int, itemset: baseLexRepr, support: float) -> None:
+    """Save an itemset and its events
+
+    Args:
+        conn: The connection to the results database.
+        id: The id of the itemset, its rowid in the frequent_itemsets table.
+        itemset: The frequent itemset.
+        support: Its support.
+    """
+
+    events = itemset.events_list
+    conn.execute(f'INSERT INTO {PATTERNS_TABLENAME}(id, size, support, key, timelines) VALUES(?,?,?,?,?)',
+                 (id, len(events), support, itemset.as_searchable_string, len(itemset[0])))
+    conn.executemany(f'INSERT INTO {EVENTS_TABLENAME}(pattern, timeline, label, start, end) VALUES(?,?,?,?,?)',
+                     [(id, event[0], event[1], event[2][0], event[2][1]) for event in events])
+
+
+def read_patterns(database: str, size: int = None, min_support: float = None,
+                  cls: type = memLexRepr) -> list[tuple[int, baseLexRepr, float]]:
+    """Read the itemsets saved in the normalized schema of a results database
+
+    Itemsets are built straight from their typed events, with one query for
+    all of them, without parsing any string nor validating their data.
+
+    Args:
+        database: The path of the SQLite database written by apriori.
+        size: If given, only the itemsets with this number of events are read.
+        min_support: If given, only the itemsets with at least this support are read.
+        cls: The class of the itemsets, memLexRepr or baseLexRepr.
+
+    Returns:
+        The itemsets as (id, itemset, support), in the order they have been found.
+    """
+
+    conditions, parameters = [], []
+    if size is not None:
+        conditions.append('p.size = ?')
+        parameters.append(size)
+    if min_support is not None:
+        conditions.append('p.support >= ?')
+        parameters.append(min_support)
+    where = f"WHERE {' AND '.join(conditions)}" if conditions else ''
+
+    with sqlite3.connect(database) as conn:
+        patterns = conn.execute(f'SELECT p.id, p.support, p.timelines FROM {PATTERNS_TABLENAME} p {where} '
+                                f'ORDER BY p.id', parameters).fetchall()
+        events = conn.execute(f'SELECT e.pattern, e.timeline, e.label, e.start, e.end '
+                              f'FROM {EVENTS_TABLENAME} e JOIN {PATTERNS_TABLENAME} p ON p.id = e.pattern {where} '
+                              f'ORDER BY e.pattern, e.timeline, e.start', parameters).fetchall()
+
+    by_pattern = {}
+    for pattern, timeline, label, start, end in events:
+        by_pattern.setdefault(pattern, []).append(shared_event(timeline, label, (start, end)))
+
+    return [(id, build_itemset(by_pattern.get(id, []), timelines, cls), support) for id, support, timelines in patterns]
+
+
+def build_itemset(events: list, timelines: int, cls: type = memLexRepr) -> baseLexRepr:
+    """Build an itemset from its events, without validating its data
+
+    Args:
+        events: The events of the itemset, sorted by timeline then start, as in events_list.
+        timelines: The number of timelines of the itemset.
+        cls: The class of the itemset, memLexRepr or baseLexRepr.
+
+    Returns:
+        The itemset, with its events list already set.
+    """
+
+    intervals = [(timeline, []) for timeline in range(timelines)]
+    for event in events:
+        intervals[event[0]][1].append((event[1], event[2][0], event[2][1]))
+
+    itemset = cls._from_trusted(preprocess.intervals_to_words(intervals))
+    itemset._event_list = events
+    return itemset
@@ -0,0 +1,108 @@
+"""Association rules between frequent itemsets
+
+This module finds the rules X => XY between the frequent itemsets of a
+mining run, where X is a sub-pattern of XY, whose confidence
+support(XY)/support(X) is above a threshold.
+
+No itemset is searched in another one: the sub-patterns of an itemset are
+found by traversing the lattice of the run (see lexical_apriori.lattice), and
+supports are the ones stored by the run.
+
+Rules are written in the format of paper_results/, as by the notebook
+extract_rules.ipynb this module replaces. The X and XY columns are
+searchable strings, which contain commas and are not quoted.
+
+Example:
+    The following example shows how to find the rules of a run, or of a
+    database it has been saved into:
+
+        >>> a = apriori(dataset, 0.05, database='p03.sqlite')
+        >>> frequent_itemsets = a.apriori()
+        >>> write_rules('rules-p03.csv', miner_rules(a))
+        >>> write_rules('rules-p03.csv', database_rules('p03.sqlite'))
+
+"""
+
+from __future__ import annotations
+
+from .lattice import patternLattice
+
+DEFAULT_CONFIDENCE = 0.8
+
+HEADER = 'X, XY, supX, supXY, conf \n'
+
+
+def find_rules(lattice: patternLattice, confidence: float = DEFAULT_CONFIDENCE) -> list[tuple]:
+    """Find the rules between the itemsets of a lattice
+
+    Args:
+        lattice: The lattice of the frequent itemsets.
+        confidence: The minimum confidence of the rules.
+
+    Returns:
+        The rules as (X, XY, support of X, support of XY, confidence), sorted
+        by the position of X, then of XY, in the lattice.
+    """
+
+    itemsets = lattice.itemsets
+    supports = lattice.supports
+
+    # Strict sub-patterns of every itemset, parents come before their children
+    ancestors = []
+    rules = []
+    for position in range(len(itemsets)):
+        found = set()
+        for parent in lattice.parents[position]:
+            if parent not in found:
+                found.add(parent)
+                found |= ancestors[parent]
+        ancestors.append(found)
+
+        for ancestor in found:
+            if supports[position]/supports[ancestor] >= confidence:
+                rules.append((ancestor, position))
+
+    rules.sort()
+    return [(itemsets[x], itemsets[xy], supports[x], supports[xy], supports[xy]/supports[x]) for x, xy in rules]
+
+
+def miner_rules(miner, confidence: float = DEFAULT_CONFIDENCE) -> list[tuple]:
+    """Find the rules between the frequent itemsets found by an apriori object
+
+    Args:
+        miner: The apriori object, after it has run.
+        confidence: The minimum confidence of the rules.
+
+    Returns:
+        The rules, see find_rules.
+    """
+
+    return find_rules(miner.lattice, confidence)
+
+
+def database_rules(database: str, confidence: float = DEFAULT_CONFIDENCE) -> list[tuple]:
+    """Find the rules between the frequent itemsets saved in a database by apriori
+
+    Args:
+        database: The path of the SQLite database.
+        confidence: The minimum confidence of the rules.
+
+    Returns:
+        The rules, see find_rules.
+    """
+
+    return find_rules(patternLattice.from_database(database), confidence)
+
+
+def write_rules(path: str, rules: list[tuple]) -> None:
+    """Save rules as CSV, in the format of paper_results/
+
+    Args:
+        path: The path of the CSV file.
+        rules: The rules, see find_rules.
+    """
+
+    with open(path, 'w') as file:
+        file.write(HEADER)
+        for x, xy, support_x, support_xy, conf in rules:
+            file.write(f'{x.as_searchable_string},{xy.as_searchable_string},{support_x},{support_xy},{conf} \n')
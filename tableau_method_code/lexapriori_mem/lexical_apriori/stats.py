@@ -0,0 +1,132 @@
+"""Per-level statistics of a mining run
+
+This module collects machine-readable numbers about every level of the
+apriori algorithm: how many candidates have been generated, where they have
+been pruned, how many containment checks support counting needed and where
+the time has been spent.
+
+Statistics are only collected when requested, otherwise the miner skips
+every measurement.
+
+Example:
+    The following example shows how to collect and save statistics:
+
+        >>> a = apriori(dataset, 0.5, stats=True)
+        >>> frequent_itemsets = a.apriori()
+        >>> a.stats.dump('stats.json')
+
+"""
+
+from __future__ import annotations
+import json
+
+from .budget import peak_memory
+
+# Phases whose time is measured, in seconds
+PHASES = ('generation', 'reasonable', 'support', 'database')
+
+
+class levelStats():
+    """Statistics of a single level
+
+    Attributes:
+        size: The size of the itemsets of the level.
+        merges: The number of merges performed.
+        candidates: The number of candidates generated by the merges.
+        pruned_forbidden: The insertions ruled out by the forbidden rules of the merged itemsets.
+        pruned_duplicates: The candidates generated more than once by the same merge.
+        pruned_cut: The candidates removed because they are in cut_solutions.
+        pruned_reasonable: The candidates not backed by the previous size, see apriori._check_reasonable.
+        measured: The candidates whose support has been counted.
+        frequent: The frequent itemsets found.
+        containment_checks: The (itemset, transaction) pairs searched while counting support.
+        time: The seconds spent in every phase of PHASES. Generation does not
+            include reasonableness checking.
+        peak_memory: The peak resident set size of the process at the end of the level, in bytes,
+            None where it can't be measured.
+    """
+
+    __slots__ = ('size', 'merges', 'candidates', 'pruned_forbidden', 'pruned_duplicates', 'pruned_cut',
+                 'pruned_reasonable', 'measured', 'frequent', 'containment_checks', 'time', 'peak_memory')
+
+    def __init__(self, size: int):
+        self.size = size
+        self.merges = 0
+        self.candidates = 0
+        self.pruned_forbidden = 0
+        self.pruned_duplicates = 0
+        self.pruned_cut = 0
+        self.pruned_reasonable = 0
+        self.measured = 0
+        self.frequent = 0
+        self.containment_checks = 0
+        self.time = dict.fromkeys(PHASES, 0.0)
+        self.peak_memory = None
+
+    def to_dict(self) -> dict:
+        """dict: The statistics of the level."""
+
+        output = {name: getattr(self, name) for name in self.__slots__}
+        output['time'] = dict(self.time)
+        return output
+
+
+class miningStats():
+    """Statistics of a mining run, level by level
+
+    Attributes:
+        levels: The statistics of every level, by size.
+    """
+
+    def __init__(self):
+        self.levels = {}
+
+    def level(self, size: int) -> levelStats:
+        """Get the statistics of a level, creating them the first time
+
+        Args:
+            size: The size of the itemsets of the level.
+
+        Returns:
+            The statistics of the level.
+        """
+
+        if size not in self.levels:
+            self.levels[size] = levelStats(size)
+        return self.levels[size]
+
+    def close_level(self, size: int, frequent: int) -> None:
+        """Record the end of a level
+
+        Args:
+            size: The size of the itemsets of the level.
+            frequent: The number of frequent itemsets found.
+        """
+
+        stats = self.level(size)
+        stats.frequent = frequent
+        stats.peak_memory = peak_memory()
+
+    def to_dict(self) -> dict:
+        """dict: The statistics of every level, with their totals."""
+
+        levels = [stats.to_dict() for stats in self.levels.values()]
+
+        total = {name: sum(level[name] for level in levels)
+                 for name in levelStats.__slots__ if name not in ('size', 'time', 'peak_memory')}
+        total['time'] = {phase: sum(level['time'][phase] for level in levels) for phase in PHASES}
+        total['peak_memory'] = max([level['peak_memory'] for level in levels if level['peak_memory'] is not None],
+                                   default=None)
+
+        return {'levels': levels, 'total': total}
+
+    def to_json(self, **kwargs) -> str:
+        """Serialize the statistics to JSON, kwargs are passed to json.dumps"""
+
+        return json.dumps(self.to_dict(), **kwargs)
+
+    def dump(self, path: str) -> None:
+        """Save the statistics to a JSON file"""
+
+        with open(path, 'w') as file:
+            file.write(self.to_json(indent=1))
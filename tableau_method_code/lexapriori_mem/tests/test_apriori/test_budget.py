@@ -0,0 +1,99 @@
+from lexapriori_mem.lex.lex_mem import memLexRepr
+from lexapriori_mem.lex import lex_store
+from lexapriori_mem.lexical_apriori.lexApriori import apriori
+from lexapriori_mem.lexical_apriori import budget
+from lexapriori_mem.tools.random_data_generator import generate_data
+from lexapriori_mem.tools import preprocess as preprocess
+from lexapriori_mem import cli
+import json
+import sys
+import pytest
+
+def generate_test_data(seed, n_tables=2, n_rows=3, events=['a', 'b']):
+    return preprocess.data_to_words(generate_data(n_tables, n_rows, events, seed))
+
+dataset = [memLexRepr(generate_test_data(i)) for i in range(6)]
+
+
+def test_levels():
+    expected = apriori(dataset, 0.3).apriori()
+
+    a = apriori(dataset, 0.3)
+    sizes = [size for size, _ in a.levels()]
+
+    assert sizes == list(expected.keys())
+    assert a.frequent_itemsets == expected
+
+
+# Raising epsilon keeps what would have been found with it
+def test_raise_threshold():
+    a = apriori(dataset, 0.3)
+    a.apriori()
+    a.raise_threshold(0.6)
+
+    expected = apriori(dataset, 0.6).apriori()
+    for size in expected:
+        assert set(a.frequent_itemsets[size]) == set(expected[size])
+
+    with pytest.raises(ValueError):
+        a.raise_threshold(0.3)
+
+
+@pytest.mark.parametrize("raise_threshold, action", [(False, 'stop'), (True, 'raise')])
+def test_budget_exceeded(monkeypatch, raise_threshold, action):
+    # Every level takes 100 bytes, the third one can't fit in 260 unless less itemsets are extended
+    memory = iter([0, 100, 200])
+    monkeypatch.setattr(budget, 'peak_memory', lambda: next(memory))
+
+    a = apriori(dataset, 0.3)
+    limits = budget.resourceBudget(memory=260, raise_threshold=raise_threshold)
+
+    actions = [limits.govern(a) for _ in zip(range(2), a.levels())]
+
+    assert actions == ['continue', action]
+    if action == 'raise':
+        assert a.epsilon > 0.3
+        expected = apriori(dataset, a.epsilon).apriori()
+        assert set(a.frequent_itemsets[2]) == set(expected[2])
+
+
+def test_budget_unlimited():
+    a = apriori(dataset, 0.3)
+    limits = budget.resourceBudget()
+
+    assert {limits.govern(a) for _ in a.levels()} == {'continue'}
+    assert a.frequent_itemsets == apriori(dataset, 0.3).apriori()
+
+
+def test_cli_mine(tmp_path):
+    lex_store.save_dataset(tmp_path / 'dataset', dataset)
+
+    assert cli.main(['mine', str(tmp_path / 'dataset'), str(tmp_path / 'output.json'), '--epsilon', '0.3']) == 0
+
+    output = json.loads((tmp_path / 'output.json').read_text())
+    a = apriori(dataset, 0.3)
+    expected = a.apriori()
+    assert output['complete']
+    assert output['transactions'] == len(dataset)
+    assert [item['support'] for item in output['itemsets']['2']] == [a.support(i) for i in expected[2]]
+    assert {int(size): len(itemsets) for size, itemsets in output['itemsets'].items()} == \
+        {size: len(itemsets) for size, itemsets in expected.items() if itemsets != []}
+
+
+@pytest.mark.parametrize("value, expected", [('512', 512), ('2K', 2048), ('1.5G', 3 * 2**29)])
+def test_parse_memory(value, expected):
+    assert cli.parse_memory(value) == expected
+
+
+# Without the resource module, as on Windows, memory is not measured
+def test_no_resource(monkeypatch):
+    monkeypatch.setitem(sys.modules, 'resource', None)
+
+    assert budget.peak_memory() is None
+    with pytest.raises(ValueError):
+        budget.resourceBudget(memory=2**30)
+
+    a = apriori(dataset, 0.3, stats=True)
+    limits = budget.resourceBudget(seconds=3600)
+    assert {limits.govern(a) for _ in a.levels()} == {'continue'}
+    assert a.stats.to_dict()['total']['peak_memory'] is None
@@ -0,0 +1,92 @@
+from lexapriori_mem.lexical_apriori.lexApriori import apriori
+from lexapriori_mem.lexical_apriori import budget
+from lexapriori_mem.lexical_apriori.distributed import coordinator, localTransport, socketTransport, serve_shard
+from lexapriori_mem.lex.lex_mem import memLexRepr
+from lexapriori_mem.tools.random_data_generator import generate_data
+from lexapriori_mem.tools import preprocess as preprocess
+import multiprocessing
+import pytest
+
+
+def generate_test_dataset(seed, n_transactions=7):
+    return [memLexRepr(preprocess.data_to_words(generate_data(2, 3, ['a', 'b'], seed * 10 + i)))
+            for i in range(n_transactions)]
+
+
+# Test that a sharded run finds the same itemsets as a local one
+@pytest.mark.parametrize('seed, epsilon, shards', [(0, 0.5, 1), (1, 0.5, 2), (2, 0.3, 3)])
+def test_coordinator(seed, epsilon, shards):
+    dataset = generate_test_dataset(seed)
+
+    expected = apriori(dataset, epsilon).apriori()
+
+    with localTransport(dataset, shards) as transport:
+        assert transport.size() == len(dataset)
+        result = coordinator(transport, epsilon).apriori()
+
+    assert expected.keys() == result.keys()
+    for size in expected:
+        assert set(expected[size]) == set(result[size])
+
+
+# Test that partial counts are summed over the shards
+def test_transport_count():
+    dataset = generate_test_dataset(3, 5)
+    itemsets = apriori._find_singlets(dataset)
+
+    with localTransport(dataset, 2) as transport:
+        assert transport.count(itemsets) == [sum([i in data for data in dataset]) for i in itemsets]
+        assert transport.count([]) == []
+
+
+# Test that shards only answer coordinators knowing their key
+def test_authkey():
+    dataset = generate_test_dataset(4, 2)
+
+    with localTransport(dataset, 1) as first, localTransport(dataset, 1) as second:
+        assert len(first.authkey) == 32 and first.authkey != second.authkey
+
+    receiver, sender = multiprocessing.Pipe(duplex=False)
+    process = multiprocessing.Process(target=serve_shard, args=(dataset, b'secret', ('localhost', 0), sender),
+                                      daemon=True)
+    process.start()
+    sender.close()
+    address = receiver.recv()
+
+    with pytest.raises(multiprocessing.AuthenticationError):
+        socketTransport([address], b'wrong')
+    process.join()
+
+
+# Test that the arguments of apriori are accepted, except the engines needing a local dataset
+def test_coordinator_arguments():
+    dataset = generate_test_dataset(5)
+
+    with localTransport(dataset, 2) as transport:
+        miner = coordinator(transport, 0.5, stats=True, workers=2)
+        result = miner.apriori()
+        assert list(miner.stats.levels) == list(result)
+
+        for engine in ['embeddings', 'group']:
+            with pytest.raises(ValueError):
+                coordinator(transport, 0.5, engine=engine)
+
+
+# Test that a budget governs a sharded run as a local one
+def test_coordinator_budget(monkeypatch):
+    dataset = generate_test_dataset(6)
+
+    # Every level takes 100 bytes, the third one can't fit in 260 unless less itemsets are extended
+    memory = iter([0, 100, 200])
+    monkeypatch.setattr(budget, 'peak_memory', lambda: next(memory))
+
+    with localTransport(dataset, 2) as transport:
+        miner = coordinator(transport, 0.3)
+        assert miner.n_transactions() == len(dataset)
+
+        limits = budget.resourceBudget(memory=260)
+        actions = [limits.govern(miner) for _ in zip(range(2), miner.levels())]
+
+    assert actions == ['continue', 'raise']
+    expected = apriori(dataset, miner.epsilon).apriori()
+    assert set(miner.frequent_itemsets[2]) == set(expected[2])
@@ -0,0 +1,104 @@
+from lexapriori_mem.lex.lex_base import baseLexRepr
+from lexapriori_mem.lex.lex_mem import memLexRepr
+from lexapriori_mem.lex import lex_store
+from lexapriori_mem.lexical_apriori.lexApriori import apriori
+from lexapriori_mem.lexical_apriori.export import levelExporter, read_export
+from lexapriori_mem.lexical_apriori import budget
+from lexapriori_mem.tools.random_data_generator import generate_data
+from lexapriori_mem.tools import preprocess as preprocess
+from lexapriori_mem import cli
+import itertools
+import json
+import pytest
+
+def generate_test_data(seed, n_tables=2, n_rows=3, events=['a', 'b']):
+    return preprocess.data_to_words(generate_data(n_tables, n_rows, events, seed))
+
+dataset = [memLexRepr(generate_test_data(i)) for i in range(6)]
+
+
+def exported(found):
+    return [(itemset.as_searchable_string, support) for _, itemset, support in found]
+
+
+@pytest.mark.parametrize('format', ['parquet', 'arrow'])
+def test_export(tmp_path, format):
+    pytest.importorskip('pyarrow')
+
+    a = apriori(dataset, 0.3)
+    exporter = levelExporter(str(tmp_path), format, row_group_size=4)
+    for size, itemsets in a.levels():
+        if itemsets != []:
+            exporter.write_level(size, itemsets, [a.lattice.support(i) for i in itemsets])
+
+    itemsets = [i for size in a.frequent_itemsets for i in a.frequent_itemsets[size]]
+    found = read_export(str(tmp_path), format)
+    assert exported(found) == [(i.as_searchable_string, a.support(i)) for i in itemsets]
+    assert [pattern for pattern, _, _ in found] == list(range(len(itemsets)))
+    for (_, itemset, _), expected in zip(found, itemsets):
+        assert itemset.data == expected.data
+        assert itemset.events_list == expected.events_list
+
+
+@pytest.mark.parametrize('size, min_support, label', [(2, None, None), (None, 0.5, None), (None, None, 'b'),
+                                                       (3, 0.3, 'a')])
+def test_read_filtered(tmp_path, size, min_support, label):
+    pytest.importorskip('pyarrow')
+
+    a = apriori(dataset, 0.3)
+    a.apriori()
+    levelExporter(str(tmp_path), row_group_size=4).export(a)
+
+    expected = [(i.as_searchable_string, a.support(i)) for s in a.frequent_itemsets for i in a.frequent_itemsets[s]
+                if (size is None or s == size) and (min_support is None or a.support(i) >= min_support)
+                and (label is None or label in [event[1] for event in i.events_list])]
+    assert expected != []
+    assert exported(read_export(str(tmp_path), size=size, min_support=min_support, label=label,
+                                cls=baseLexRepr)) == expected
+
+
+def test_cli_export(tmp_path):
+    pytest.importorskip('pyarrow')
+    lex_store.save_dataset(tmp_path / 'dataset', dataset)
+
+    assert cli.main(['mine', str(tmp_path / 'dataset'), str(tmp_path / 'output.json'), '--epsilon', '0.3',
+                     '--export', str(tmp_path / 'export')]) == 0
+
+    a = apriori(dataset, 0.3)
+    a.apriori()
+    assert exported(read_export(str(tmp_path / 'export'))) == \
+        [(i.as_searchable_string, a.support(i)) for s in a.frequent_itemsets for i in a.frequent_itemsets[s]]
+
+
+# Test that the levels written before epsilon is raised are written again
+def test_cli_export_raise(tmp_path, monkeypatch):
+    pytest.importorskip('pyarrow')
+    # Raising epsilon after the second level drops singlets as well
+    raised = [memLexRepr(generate_test_data(i, events=['a', 'b', 'c'])) for i in range(10)]
+    lex_store.save_dataset(tmp_path / 'dataset', raised)
+
+    # Every level takes 100 bytes, the third one can't fit in 260 unless less itemsets are extended
+    memory = itertools.chain([0, 100], itertools.repeat(200))
+    monkeypatch.setattr(budget, 'peak_memory', lambda: next(memory))
+
+    assert cli.main(['mine', str(tmp_path / 'dataset'), str(tmp_path / 'output.json'), '--epsilon', '0.3',
+                     '--memory', '260', '--export', str(tmp_path / 'export')]) == 0
+
+    output = json.loads((tmp_path / 'output.json').read_text())
+    assert [action['action'] for action in output['budget']][:2] == ['continue', 'raise']
+    a = apriori(raised, 0.3)
+    a.apriori()
+    assert min(a.support(i) for i in a.frequent_itemsets[1]) < output['epsilon']
+
+    # The exported itemsets are the ones kept in the output, not the ones found before the raise
+    found = read_export(str(tmp_path / 'export'))
+    expected = [item for size in sorted(output['itemsets'], key=int) for item in output['itemsets'][size]]
+    assert min(support for _, _, support in found) >= output['epsilon']
+    assert [support for _, _, support in found] == [item['support'] for item in expected]
+    assert [len(itemset.events_list) for _, itemset, _ in found] == \
+        [sum(len(events) for events in item['events'].values()) for item in expected]
+
+
+def test_unknown_format(tmp_path):
+    with pytest.raises(ValueError):
+        levelExporter(str(tmp_path), 'csv')
@@ -0,0 +1,72 @@
+from lexapriori_mem.lex.lex_base import baseLexRepr
+from lexapriori_mem.lex.lex_mem import memLexRepr
+from lexapriori_mem.lexical_apriori.lexApriori import apriori
+from lexapriori_mem.lexical_apriori.lattice import patternLattice, EDGES_TABLENAME
+from lexapriori_mem.tools.random_data_generator import generate_data
+from lexapriori_mem.tools import preprocess as preprocess
+import sqlite3
+import pytest
+
+def generate_test_data(seed, n_tables=2, n_rows=3, events=['a', 'b']):
+    return preprocess.data_to_words(generate_data(n_tables, n_rows, events, seed))
+
+dataset = [memLexRepr(generate_test_data(i)) for i in range(6)]
+
+
+def links(lattice):
+    return {itemset.as_searchable_string: sorted(parent.as_searchable_string for parent in lattice.parents_of(itemset))
+            for itemset in lattice}
+
+
+# Test that the parents are the frequent itemsets left by deleting every event
+@pytest.mark.parametrize('workers, engine', [(None, 'regex'), (2, 'regex'), (None, 'group')])
+def test_lattice(workers, engine):
+    a = apriori(dataset, 0.3, workers=workers, engine=engine)
+    result = a.apriori()
+
+    assert list(a.lattice) == [itemset for size in result for itemset in result[size]]
+    for itemset in a.lattice:
+        assert a.lattice.support(itemset) == a.support(itemset)
+
+        expected = []
+        if len(itemset.events_list) > 1:
+            expected = [itemset.delete_event(event) for event in itemset.events_list]
+        assert sorted(p.as_searchable_string for p in a.lattice.parents_of(itemset)) == \
+            sorted(set(p.as_searchable_string for p in expected))
+
+
+# Test that traversals find what searching the itemsets into each other finds
+def test_traversal():
+    a = apriori(dataset, 0.3)
+    a.apriori()
+
+    itemsets = list(a.lattice)
+    for itemset in itemsets:
+        pattern = baseLexRepr(itemset.data)
+        assert a.lattice.descendants(itemset) == \
+            [i for i in itemsets if i != itemset and pattern in baseLexRepr(i.data)]
+        assert a.lattice.ancestors(itemset) == \
+            [i for i in itemsets if i != itemset and baseLexRepr(i.data) in pattern]
+        assert a.lattice.is_closed(itemset) == \
+            all(a.lattice.support(i) < a.lattice.support(itemset) for i in a.lattice.descendants(itemset))
+
+
+def test_database_lattice(tmp_path):
+    database = str(tmp_path / 'test.sqlite')
+    a = apriori(dataset, 0.3, database=database)
+    a.apriori()
+
+    assert links(patternLattice.from_database(database)) == links(a.lattice)
+
+    # Databases saved without links
+    with sqlite3.connect(database) as conn:
+        conn.execute(f'DROP TABLE {EDGES_TABLENAME}')
+    assert links(patternLattice.from_database(database)) == links(a.lattice)
+
+
+def test_raise_threshold_lattice():
+    a = apriori(dataset, 0.3)
+    a.apriori()
+    a.raise_threshold(0.5)
+
+    assert list(a.lattice) == [itemset for size in a.frequent_itemsets for itemset in a.frequent_itemsets[size]]
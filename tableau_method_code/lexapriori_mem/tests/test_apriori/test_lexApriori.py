@@ -138,3 +138,133 @@ def test_solutions_cut(dataset, cutout):
     frequent_itemsets = a.apriori()
 
     assert {k:v for k,v in frequent_itemsets.items() if v} == {}
+
+
+# Test parallel candidate generation against the serial one
+@pytest.mark.parametrize('seed, epsilon', [(0, 0.5), (1, 0.5), (2, 0.3)])
+def test_parallel_generation(seed, epsilon):
+    dataset = [memLexRepr(generate_test_data(seed * 10 + i, 2, 3, ['a', 'b'])) for i in range(6)]
+
+    serial = apriori(dataset, epsilon)
+    serial_result = serial.apriori()
+
+    parallel = apriori(dataset, epsilon, workers=2)
+    parallel_result = parallel.apriori()
+
+    assert serial_result.keys() == parallel_result.keys()
+    for size in serial_result:
+        assert serial_result[size] == parallel_result[size]
+        assert [i.forbidden for i in serial_result[size]] == [i.forbidden for i in parallel_result[size]]
+    for size in serial.candidate_next:
+        assert serial.candidate_next[size] == parallel.candidate_next[size]
+
+
+# Test transactions bitmaps of frequent itemsets
+@pytest.mark.parametrize('seed, epsilon', [(0, 0.5), (3, 0.3)])
+def test_frequent_tids(seed, epsilon):
+    dataset = [memLexRepr(generate_test_data(seed * 10 + i, 2, 3, ['a', 'b'])) for i in range(6)]
+
+    a = apriori(dataset, epsilon)
+    result = a.apriori()
+
+    for size in result:
+        for itemset in result[size]:
+            expected = [i for i, data in enumerate(dataset) if itemset in data]
+            assert list(apriori._iter_tids(itemset.tids)) == expected
+            assert apriori._count_tids(itemset.tids)/len(dataset) == a.support(itemset)
+
+
+# Test that the embeddings engine finds the same itemsets as regular expressions
+@pytest.mark.parametrize('seed, epsilon, limit', [(0, 0.5, None), (3, 0.3, None), (3, 0.3, 1)])
+def test_embeddings_engine(seed, epsilon, limit):
+    dataset = [memLexRepr(generate_test_data(seed * 10 + i, 2, 3, ['a', 'b'])) for i in range(6)]
+
+    regex_result = apriori(dataset, epsilon).apriori()
+    embeddings_result = apriori(dataset, epsilon, engine='embeddings', embedding_limit=limit).apriori()
+
+    assert regex_result.keys() == embeddings_result.keys()
+    for size in regex_result:
+        assert regex_result[size] == embeddings_result[size]
+        assert [i.tids for i in regex_result[size]] == [i.tids for i in embeddings_result[size]]
+
+
+# Test that counting a whole level at once finds the same itemsets as regular expressions
+@pytest.mark.parametrize('seed, epsilon', [(0, 0.5), (3, 0.3)])
+def test_group_engine(seed, epsilon):
+    dataset = [memLexRepr(generate_test_data(seed * 10 + i, 2, 3, ['a', 'b'])) for i in range(6)]
+
+    regex_result = apriori(dataset, epsilon).apriori()
+    group_result = apriori(dataset, epsilon, engine='group').apriori()
+
+    assert regex_result.keys() == group_result.keys()
+    for size in regex_result:
+        assert regex_result[size] == group_result[size]
+        assert [i.tids for i in regex_result[size]] == [i.tids for i in group_result[size]]
+
+
+# Test support counted by worker processes attached to the shared dataset
+@pytest.mark.parametrize('seed, epsilon', [(0, 0.5), (2, 0.3)])
+def test_parallel_group_engine(seed, epsilon):
+    dataset = [memLexRepr(generate_test_data(seed * 10 + i, 2, 3, ['a', 'b'])) for i in range(6)]
+
+    serial = apriori(dataset, epsilon, engine='group')
+    serial_result = serial.apriori()
+    parallel = apriori(dataset, epsilon, engine='group', workers=2)
+    parallel_result = parallel.apriori()
+
+    assert serial_result.keys() == parallel_result.keys()
+    for size in serial_result:
+        assert serial_result[size] == parallel_result[size]
+        assert [i.tids for i in serial_result[size]] == [i.tids for i in parallel_result[size]]
+    assert parallel.shared_dataset is None
+
+def test_unknown_engine():
+    with pytest.raises(ValueError):
+        apriori(sample_dataset, 0.5, engine='unknown')
+
+
+# Test per-level statistics, serial and parallel runs must count the same
+@pytest.mark.parametrize('workers', [None, 2])
+def test_stats(workers):
+    dataset = [memLexRepr(generate_test_data(i, 2, 3, ['a', 'b'])) for i in range(6)]
+
+    a = apriori(dataset, 0.3, stats=True, workers=workers)
+    result = a.apriori()
+    output = a.stats.to_dict()
+
+    assert [level['size'] for level in output['levels']] == list(result.keys())
+    for level in output['levels']:
+        assert level['frequent'] == len(result[level['size']])
+        assert level['candidates'] == (level['measured'] + level['pruned_reasonable'] +
+                                       level['pruned_duplicates'] + level['pruned_cut'])
+        assert level['peak_memory'] > 0
+    assert output['total']['containment_checks'] > 0
+
+    serial = apriori(dataset, 0.3, stats=True)
+    serial.apriori()
+    for level, expected in zip(output['levels'], serial.stats.to_dict()['levels']):
+        assert {k: v for k, v in level.items() if k not in ('time', 'peak_memory')} == \
+            {k: v for k, v in expected.items() if k not in ('time', 'peak_memory')}
+
+    assert apriori(dataset, 0.3).stats is None
+
+
+# Test the frequent itemsets of the committed reference, see benchmarks/oracle.py
+def test_reference(tmp_path):
+    import sqlite3
+    from lexapriori_mem.tools.random_data_generator import read_intervals
+
+    reference = os.path.join(os.path.dirname(__file__), '..', '..', '..', 'benchmarks', 'reference')
+    if not os.path.exists(os.path.join(reference, 'synthetic.sqlite')):
+        pytest.skip('The benchmarks are not available')
+
+    words = [preprocess.intervals_to_words(preprocess.dict_to_list(t))
+             for t in read_intervals(os.path.join(reference, 'synthetic.jsonl'))]
+    database = str(tmp_path / 'synthetic.sqlite')
+    apriori(memLexRepr.from_many(words), 0.25, database=database, engine='group').apriori()
+
+    query = 'SELECT itemset, support FROM frequent_itemsets'
+    with sqlite3.connect(os.path.join(reference, 'synthetic.sqlite')) as conn:
+        expected = sorted(conn.execute(query).fetchall())
+    with sqlite3.connect(database) as conn:
+        assert sorted(conn.execute(query).fetchall()) == expected
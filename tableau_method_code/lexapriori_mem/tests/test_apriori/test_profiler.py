@@ -0,0 +1,122 @@
+from lexapriori_mem.lex.lex_mem import memLexRepr
+from lexapriori_mem.lex import lex_store
+from lexapriori_mem.lexical_apriori.lexApriori import apriori
+from lexapriori_mem.lexical_apriori.hooks import miningHooks, MERGE_STEPS
+from lexapriori_mem.lexical_apriori.profiler import phaseProfiler
+from lexapriori_mem.tools.random_data_generator import generate_data
+from lexapriori_mem.tools import preprocess as preprocess
+from lexapriori_mem import cli
+import json
+import pstats
+import pytest
+
+def generate_test_data(seed, n_tables=2, n_rows=3, events=['a', 'b']):
+    return preprocess.data_to_words(generate_data(n_tables, n_rows, events, seed))
+
+dataset = [memLexRepr(generate_test_data(i)) for i in range(6)]
+
+
+class recorder(miningHooks):
+    def __init__(self):
+        self.calls = []
+
+    def start_level(self, size):
+        self.calls.append(('start', size))
+
+    def end_level(self, size):
+        self.calls.append(('end', size))
+
+    def enter(self, phase):
+        self.calls.append(('enter', phase))
+
+    def exit(self, phase):
+        self.calls.append(('exit', phase))
+
+    def finish(self):
+        self.calls.append(('finish',))
+
+
+# Test that phases are reported well nested, inside their level
+def test_hooks(tmp_path):
+    hook = recorder()
+    a = apriori(dataset, 0.3, database=str(tmp_path / 'test.sqlite'), hooks=[hook])
+    result = a.apriori()
+
+    assert result == apriori(dataset, 0.3).apriori()
+    assert hook.calls[-1] == ('finish',)
+
+    levels = []
+    phases = []
+    for call in hook.calls[:-1]:
+        if call[0] == 'start':
+            assert phases == []
+            levels.append(call[1])
+        elif call[0] == 'end':
+            assert phases == [] and call[1] == levels[-1]
+        elif call[0] == 'enter':
+            phases.append(call[1])
+        else:
+            assert phases.pop() == call[1]
+    assert levels == list(result.keys())
+
+    entered = {call[1] for call in hook.calls if call[0] == 'enter'}
+    assert {'generation', 'merge', 'reasonable', 'support', 'database'} | set(MERGE_STEPS) == entered
+
+
+# Test that the hooks are told the run ended when it is stopped early
+def test_hooks_stopped():
+    hook = recorder()
+    a = apriori(dataset, 0.3, hooks=[hook])
+    for size, _ in a.levels():
+        break
+
+    assert hook.calls[-1] == ('finish',)
+    assert ('start', 2) not in hook.calls
+
+
+def test_sample_profiler(tmp_path):
+    profiler = phaseProfiler('sample', interval=0.0005)
+    a = apriori(dataset * 3, 0.3, hooks=[profiler])
+    a.apriori()
+
+    assert profiler.samples != {}
+    written = profiler.export(str(tmp_path / 'profile'))
+    assert len(written) == 2 * len(profiler.samples)
+
+    size = next(iter(profiler.samples))
+    lines = profiler.collapsed(size)
+    assert sum(int(line.rsplit(' ', 1)[1]) for line in lines) == \
+        sum(sum(stacks.values()) for stacks in profiler.samples[size].values())
+
+    with open(tmp_path / 'profile' / f'level-{size}.speedscope.json') as file:
+        output = json.load(file)
+    frames = output['shared']['frames']
+    for profile in output['profiles']:
+        assert len(profile['samples']) == len(profile['weights'])
+        assert all(0 <= frame < len(frames) for sample in profile['samples'] for frame in sample)
+
+
+def test_cprofile_profiler(tmp_path):
+    profiler = phaseProfiler('cprofile')
+    apriori(dataset, 0.3, hooks=[profiler]).apriori()
+
+    assert {'generation', 'support'} <= set(profiler.profiles[1])
+    assert 'generation;merge;forbidden' in profiler.profiles[2]
+
+    written = profiler.export(str(tmp_path / 'profile'))
+    assert len(written) == sum(len(profiles) for profiles in profiler.profiles.values())
+    for name in written:
+        pstats.Stats(name)
+
+
+def test_cli_profile(tmp_path):
+    lex_store.save_dataset(tmp_path / 'dataset', dataset)
+
+    assert cli.main(['mine', str(tmp_path / 'dataset'), str(tmp_path / 'output.json'), '--epsilon', '0.3',
+                     '--profile', str(tmp_path / 'profile')]) == 0
+    assert (tmp_path / 'profile').is_dir()
+
+
+def test_unknown_mode():
+    with pytest.raises(ValueError):
+        phaseProfiler('unknown')
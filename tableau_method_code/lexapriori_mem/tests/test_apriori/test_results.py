@@ -0,0 +1,60 @@
+from lexapriori_mem.lex.lex_base import baseLexRepr
+from lexapriori_mem.lex.lex_mem import memLexRepr
+from lexapriori_mem.lexical_apriori.lexApriori import apriori
+from lexapriori_mem.lexical_apriori import results
+from lexapriori_mem.tools.random_data_generator import generate_data
+from lexapriori_mem.tools import preprocess as preprocess
+import ast
+import sqlite3
+import pytest
+
+def generate_test_data(seed, n_tables=2, n_rows=3, events=['a', 'b']):
+    return preprocess.data_to_words(generate_data(n_tables, n_rows, events, seed))
+
+dataset = [memLexRepr(generate_test_data(i)) for i in range(6)]
+
+
+@pytest.fixture
+def mined(tmp_path):
+    database = str(tmp_path / 'test.sqlite')
+    a = apriori(dataset, 0.3, database=database)
+    a.apriori()
+    return a, database
+
+
+# Test that the normalized tables hold what frequent_itemsets holds
+def test_schema(mined):
+    a, database = mined
+
+    with sqlite3.connect(database) as conn:
+        legacy = conn.execute('SELECT rowid, itemset, support FROM frequent_itemsets ORDER BY rowid').fetchall()
+        patterns = conn.execute(f'SELECT id, size, support, key FROM {results.PATTERNS_TABLENAME} ORDER BY id').fetchall()
+        indexes = {name for name, in conn.execute("SELECT name FROM sqlite_master WHERE type='index'")}
+
+    assert [(rowid, support) for rowid, _, support in legacy] == [(id, support) for id, _, support, _ in patterns]
+    for (_, itemset, _), (_, size, _, key) in zip(legacy, patterns):
+        assert size == sum(len(events) for events in ast.literal_eval(itemset).values())
+    assert [key for _, _, _, key in patterns] == \
+        [i.as_searchable_string for size in a.frequent_itemsets for i in a.frequent_itemsets[size]]
+    assert {f'{results.PATTERNS_TABLENAME}_size', f'{results.PATTERNS_TABLENAME}_support'} <= indexes
+
+
+@pytest.mark.parametrize('cls', [memLexRepr, baseLexRepr])
+def test_read_patterns(mined, cls):
+    a, database = mined
+
+    found = results.read_patterns(database, cls=cls)
+    expected = [i for size in a.frequent_itemsets for i in a.frequent_itemsets[size]]
+    assert [itemset.data for _, itemset, _ in found] == [i.data for i in expected]
+    assert [support for _, _, support in found] == [a.support(i) for i in expected]
+    for _, itemset, _ in found:
+        assert type(itemset) is cls
+        assert itemset.events_list == cls(itemset.data).events_list
+
+
+def test_read_patterns_filtered(mined):
+    a, database = mined
+
+    found = results.read_patterns(database, size=2, min_support=0.5)
+    assert [itemset.as_searchable_string for _, itemset, _ in found] == \
+        [i.as_searchable_string for i in a.frequent_itemsets[2] if a.support(i) >= 0.5]
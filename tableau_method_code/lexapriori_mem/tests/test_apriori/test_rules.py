@@ -0,0 +1,59 @@
+from lexapriori_mem.lex.lex_base import baseLexRepr
+from lexapriori_mem.lex.lex_mem import memLexRepr
+from lexapriori_mem.lexical_apriori.lexApriori import apriori
+from lexapriori_mem.lexical_apriori import rules
+from lexapriori_mem.tools.random_data_generator import generate_data
+from lexapriori_mem.tools import preprocess as preprocess
+from lexapriori_mem import cli
+import os
+import pytest
+
+def generate_test_data(seed, n_tables=2, n_rows=3, events=['a', 'b']):
+    return preprocess.data_to_words(generate_data(n_tables, n_rows, events, seed))
+
+dataset = [memLexRepr(generate_test_data(i)) for i in range(6)]
+
+paper_results = os.path.join(os.path.dirname(__file__), '..', '..', '..', '..', 'paper_results')
+
+
+def as_strings(found):
+    return [(x.as_searchable_string, xy.as_searchable_string, support_x, support_xy, conf)
+            for x, xy, support_x, support_xy, conf in found]
+
+
+# Test the rules against searching every itemset in the ones found after it, as extract_rules.ipynb
+@pytest.mark.parametrize('epsilon, confidence', [(0.3, 0.8), (0.3, 0.5), (0.5, 0.0)])
+def test_miner_rules(epsilon, confidence):
+    a = apriori(dataset, epsilon)
+    a.apriori()
+
+    itemsets = [i for size in a.frequent_itemsets for i in a.frequent_itemsets[size]]
+    supports = [a.support(i) for i in itemsets]
+    expected = []
+    for x in range(len(itemsets)):
+        for xy in range(x + 1, len(itemsets)):
+            if supports[xy]/supports[x] >= confidence and \
+                    baseLexRepr(itemsets[x].data) in baseLexRepr(itemsets[xy].data):
+                expected.append((itemsets[x].as_searchable_string, itemsets[xy].as_searchable_string,
+                                 supports[x], supports[xy], supports[xy]/supports[x]))
+
+    assert as_strings(rules.miner_rules(a, confidence)) == expected
+
+
+def test_database_rules(tmp_path):
+    database = str(tmp_path / 'test.sqlite')
+    a = apriori(dataset, 0.3, database=database)
+    a.apriori()
+
+    assert as_strings(rules.database_rules(database)) == as_strings(rules.miner_rules(a))
+
+
+# Test the rules published with the paper, when available
+def test_paper_rules(tmp_path):
+    if not os.path.exists(os.path.join(paper_results, 'p09.sqlite')):
+        pytest.skip('paper_results is not available')
+
+    assert cli.main(['rules', os.path.join(paper_results, 'p09.sqlite'), str(tmp_path / 'rules.csv')]) == 0
+
+    with open(os.path.join(paper_results, 'rules-p09.csv')) as file:
+        assert (tmp_path / 'rules.csv').read_text() == file.read()
@@ -0,0 +1,81 @@
+from lexapriori_mem.lex.lex_mem import memLexRepr
+from lexapriori_mem.lex.lex_base import baseLexRepr
+from lexapriori_mem.lex.lex_encode import vocabulary
+from lexapriori_mem.lex import lex_match
+from lexapriori_mem.tools.random_data_generator import generate_data
+from lexapriori_mem.tools import preprocess as preprocess
+import pytest
+
+events = ['a', 'b', 'c']
+
+def generate_test_data(seed, n_tables=2, n_rows=3, events=events):
+    return preprocess.data_to_words(generate_data(n_tables, n_rows, events, seed))
+
+
+# Check that encoding is reversible
+@pytest.mark.parametrize("seed", range(5))
+def test_encode_decode(seed):
+    data = generate_test_data(seed)
+    v = vocabulary()
+    assert v.decode_rows(v.encode_rows(data)) == data
+
+
+# Check that invalid tokens are refused
+@pytest.mark.parametrize("token", ['a', 'X_a', 'S_a_b'])
+def test_encode_invalid(token):
+    with pytest.raises(ValueError):
+        vocabulary().encode_token(token)
+
+
+# Check matching against the regular expression of baseLexRepr
+@pytest.mark.parametrize("seed", range(5))
+def test_contains(seed):
+    transactions = [generate_test_data(seed * 10 + i) for i in range(5)]
+    patterns = [generate_test_data(seed * 10 + i, n_rows=1) for i in range(5)]
+    patterns += [[row] for data in transactions for row in data[:1]]
+
+    v = vocabulary()
+    for data in transactions:
+        encoded = v.encode_rows(data)
+        for pattern in patterns:
+            compiled = lex_match.compiledPattern(v.encode_rows(pattern))
+            expected = baseLexRepr(pattern) in baseLexRepr(data)
+            assert lex_match.contains(compiled, encoded) == expected
+            assert (len(lex_match.embeddings(compiled, encoded)) != 0) == expected
+
+
+# Check that embeddings extended from the base are the same as the ones found from scratch
+@pytest.mark.parametrize("seed", range(5))
+def test_extend_embeddings(seed):
+    transactions = [generate_test_data(seed * 10 + i) for i in range(5)]
+    v = vocabulary()
+    encoded = [v.encode_rows(data) for data in transactions]
+
+    base = memLexRepr([['S_a', '_'], ['E_a', '_']], ['1', '2'])
+    for singlet in [memLexRepr([['_', 'S_b'], ['_', 'E_b']], ['1', '2']),
+                    memLexRepr([['S_c', '_'], ['E_c', '_']], ['1', '2'])]:
+        for candidate in base.merge(singlet):
+            description = lex_match.describe_extension(base, candidate, v)
+            base_pattern = lex_match.compiledPattern(v.encode_rows(base.data))
+            pattern = lex_match.compiledPattern(v.encode_rows(candidate.data))
+
+            for transaction in encoded:
+                base_embeddings = lex_match.embeddings(base_pattern, transaction)
+                extended = lex_match.extend_embeddings(description, base_embeddings, transaction)
+                assert sorted(extended) == sorted(lex_match.embeddings(pattern, transaction))
+
+
+# Check that a trie of patterns finds the same patterns as matching them one by one
+@pytest.mark.parametrize("seed", range(5))
+def test_pattern_trie(seed):
+    transactions = [generate_test_data(seed * 10 + i) for i in range(5)]
+    base = memLexRepr([['S_a', '_'], ['E_a', '_']], ['1', '2'])
+    patterns = [base] + base.merge(memLexRepr([['_', 'S_b'], ['_', 'E_b']], ['1', '2'])) + \
+        base.merge(memLexRepr([['S_c', '_'], ['E_c', '_']], ['1', '2']))
+
+    v = vocabulary()
+    trie = lex_match.patternTrie([v.encode_rows(pattern.data) for pattern in patterns])
+    for data in transactions:
+        expected = sum(1 << i for i, pattern in enumerate(patterns) if pattern in baseLexRepr(data))
+        assert trie.match(v.encode_rows(data)) == expected
+        assert trie.match(v.encode_rows(data), 0b101) == expected & 0b101
@@ -216,4 +216,50 @@ for i in range(10):
         memLexRepr(memLexRepr.from_event(generate_test_event(0, 10*i), tables), ['1', '2']),
     )
 
-# TODO: More extensive testing on _generate_insertion_points, _prune_from_memory, _generate_combinations
\ No newline at end of file
+
+# Test compact storage and pickling of itemsets
+@pytest.mark.parametrize("data", [generate_test_data(i) for i in range(5)])
+def test_memLexRepr_slots(data):
+    import pickle
+
+    b = memLexRepr(data)
+    b.tids = 5
+    b.embeddings = {0: [(0, 1)]}
+    assert not hasattr(b, '__dict__')
+
+    c = pickle.loads(pickle.dumps(b))
+    assert c == b
+    assert c.tids == 5
+    assert c.embeddings is None
+    assert c.events_list == b.events_list
+    # Events are shared between representations
+    assert all(i is j for i, j in zip(c.events_list, b.events_list))
+
+
+# Test that events derived through merge, copy and delete_event match a full scan
+@pytest.mark.parametrize("singlet1, singlet2", [
+    (memLexRepr(memLexRepr.from_event(generate_test_event(0, 5*i), tables), ['1', '2']),
+     memLexRepr(memLexRepr.from_event(generate_test_event(1, 10*i), tables), ['1', '2'])) for i in range(5)])
+def test_memLexRepr_incremental_events(singlet1, singlet2):
+    for c in singlet1.merge(singlet2):
+        for d in c.merge(singlet1) + [c.copy()]:
+            assert d.events_list == d._get_events()
+            for event in d.events_list:
+                deleted = d.delete_event(event)
+                assert deleted.events_list == deleted._get_events()
+                assert deleted.size == d.size - 1
+
+
+# Test that strings cached through copy and delete_event match the ones built from scratch
+@pytest.mark.parametrize("singlet1, singlet2", [
+    (memLexRepr(memLexRepr.from_event(generate_test_event(0, 5*i), tables), ['1', '2']),
+     memLexRepr(memLexRepr.from_event(generate_test_event(1, 10*i), tables), ['1', '2'])) for i in range(5)])
+def test_memLexRepr_cached_strings(singlet1, singlet2):
+    for c in singlet1.merge(singlet2):
+        c.as_regex, c.as_searchable_string
+        for d in [c.copy()] + [c.delete_event(event) for event in c.events_list]:
+            fresh = baseLexRepr([i.copy() for i in d.data])
+            assert d.as_regex == fresh.as_regex
+            assert d.as_searchable_string == fresh.as_searchable_string
+
+# TODO: More extensive testing on _generate_insertion_points, _prune_from_memory, _generate_combinations
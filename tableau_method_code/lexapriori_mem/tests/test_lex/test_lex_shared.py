@@ -0,0 +1,34 @@
+from lexapriori_mem.lex.lex_mem import memLexRepr
+from lexapriori_mem.lex.lex_encode import vocabulary
+from lexapriori_mem.lex.lex_shared import sharedDataset
+from lexapriori_mem.lex import lex_match
+from lexapriori_mem.tools.random_data_generator import generate_data
+from lexapriori_mem.tools import preprocess as preprocess
+import pytest
+
+def generate_test_data(seed, n_tables=2, n_rows=3, events=['a', 'b']):
+    return preprocess.data_to_words(generate_data(n_tables, n_rows, events, seed))
+
+
+# Check that attached transactions match as the published ones
+def test_publish_attach():
+    v = vocabulary()
+    encoded = [v.encode_rows(memLexRepr(generate_test_data(i)).data) for i in range(6)]
+
+    shared = sharedDataset.publish(encoded)
+    attached = sharedDataset.attach(shared.handle())
+    try:
+        assert len(attached) == len(encoded)
+        for original, rows in zip(encoded, attached):
+            assert list(rows.cells) == list(original.cells)
+            assert (rows.rows, rows.width, rows.unsafe) == (original.rows, original.width, original.unsafe)
+
+        pattern = lex_match.compiledPattern(encoded[0])
+        assert [lex_match.contains(pattern, rows) for rows in attached] == \
+            [lex_match.contains(pattern, rows) for rows in encoded]
+    finally:
+        attached.close()
+        shared.close()
+
+    with pytest.raises(FileNotFoundError):
+        sharedDataset.attach(shared.handle())
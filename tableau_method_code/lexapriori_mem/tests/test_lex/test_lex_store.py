@@ -0,0 +1,67 @@
+from lexapriori_mem.lex.lex_mem import memLexRepr
+from lexapriori_mem.lex import lex_store
+from lexapriori_mem.lexical_apriori.lexApriori import apriori
+from lexapriori_mem.tools.random_data_generator import generate_data
+from lexapriori_mem.tools import preprocess as preprocess
+import json
+import pytest
+
+def generate_test_data(seed, n_tables=2, n_rows=3, events=['a', 'b']):
+    return preprocess.data_to_words(generate_data(n_tables, n_rows, events, seed))
+
+
+# Check that a saved dataset is loaded back as it was
+@pytest.mark.parametrize("mmap", [True, False])
+def test_save_load(tmp_path, mmap):
+    dataset = [memLexRepr(generate_test_data(i)) for i in range(6)]
+    lex_store.save_dataset(tmp_path, dataset)
+
+    stored = lex_store.load_dataset(tmp_path, mmap)
+    assert len(stored) == len(dataset)
+    assert list(stored) == dataset
+    assert [i.events_list for i in stored] == [i.events_list for i in dataset]
+    assert stored[-1] == dataset[-1]
+    assert stored[1:3] == dataset[1:3]
+    assert stored.vocabulary.decode_rows(stored.encoded(0)) == dataset[0].data
+
+
+# Check that only the most recently used transactions are kept decoded
+@pytest.mark.parametrize("cache_size", [0, 2])
+def test_cache_size(tmp_path, cache_size):
+    dataset = [memLexRepr(generate_test_data(i)) for i in range(6)]
+    lex_store.save_dataset(tmp_path, dataset)
+
+    stored = lex_store.load_dataset(tmp_path, cache_size=cache_size)
+    for _ in range(2):
+        assert list(stored) == dataset
+    assert len(stored._decoded) == cache_size
+
+    if cache_size > 0:
+        first = stored[4]
+        stored[0]
+        assert stored[4] is first and list(stored._decoded) == [0, 4]
+
+
+def test_load_version(tmp_path):
+    lex_store.save_dataset(tmp_path, [memLexRepr(generate_test_data(0))])
+
+    header = json.loads((tmp_path / 'header.json').read_text())
+    header['version'] = -1
+    (tmp_path / 'header.json').write_text(json.dumps(header))
+
+    with pytest.raises(ValueError):
+        lex_store.load_dataset(tmp_path)
+
+
+# Check mining a stored dataset
+@pytest.mark.parametrize("engine", ['regex', 'embeddings', 'group'])
+def test_from_encoded(tmp_path, engine):
+    dataset = [memLexRepr(generate_test_data(i)) for i in range(6)]
+    lex_store.save_dataset(tmp_path, dataset)
+
+    expected = apriori(dataset, 0.3, engine=engine).apriori()
+    result = apriori.from_encoded(lex_store.load_dataset(tmp_path), 0.3, engine=engine).apriori()
+
+    assert expected.keys() == result.keys()
+    for size in expected:
+        assert set(expected[size]) == set(result[size])
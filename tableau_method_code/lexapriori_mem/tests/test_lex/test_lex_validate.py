@@ -0,0 +1,41 @@
+from lexapriori_mem.lex.lex_mem import memLexRepr
+from lexapriori_mem.lex.lex_base import baseLexRepr
+from lexapriori_mem.lex.lex_validate import check_many
+from lexapriori_mem.tools.random_data_generator import generate_data
+from lexapriori_mem.tools import preprocess as preprocess
+import pytest
+import random
+
+events = ['a', 'b', 'c']
+
+def generate_test_data(seed, n_tables=3, n_rows=2, events=events):
+    return preprocess.data_to_words(generate_data(n_tables, n_rows, events, seed))
+
+tokens = ['_', 'S_a', 'I_a', 'E_a', 'S_b', 'I_b', 'E_b', 'S_', 'a', 'S_a_b']
+
+def generate_random_input(seed):
+    r = random.Random(seed)
+    width = r.randint(1, 3)
+    return [[r.choice(tokens) for _ in range(width)] for _ in range(r.randint(1, 5))]
+
+
+# Check that the vectorized validator agrees with check_format
+@pytest.mark.parametrize("seed", range(5))
+def test_check_many(seed):
+    inputs = [generate_test_data(seed * 10 + i) for i in range(5)]
+    inputs += [generate_random_input(seed * 1000 + i) for i in range(1000)]
+    inputs += [[], [[]], [['S_a'], ['E_a', '_']], [[1], ['E_a']]]
+
+    assert check_many(inputs) == [baseLexRepr.check_format(i) for i in inputs]
+
+
+# Check batch creation
+def test_from_many():
+    inputs = [generate_test_data(i) for i in range(5)]
+    created = memLexRepr.from_many(inputs)
+
+    assert created == [memLexRepr(i) for i in inputs]
+    assert all(i.instants == [] and i.tids is None for i in created)
+
+    with pytest.raises(ValueError):
+        memLexRepr.from_many(inputs + [[['E_a'], ['S_a']]])
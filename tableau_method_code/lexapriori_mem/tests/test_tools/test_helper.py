@@ -0,0 +1,57 @@
+from lexapriori_mem.tools import helper as utils
+import random
+import pytest
+
+nx = pytest.importorskip('networkx')
+
+
+# Every pair of events of every pair of timelines, as register_conflicts used to check them
+def reference_conflicts(subjects):
+    graph = nx.Graph()
+    for subject in subjects:
+        for timeline in subject:
+            graph.add_node(timeline)
+
+    for subject in subjects:
+        for timeline1 in subject:
+            for timeline2 in subject:
+                if timeline1 != timeline2:
+                    for event1 in subject[timeline1]:
+                        for event2 in subject[timeline2]:
+                            if event1[2] >= event2[1] and event1[1] <= event2[2]:
+                                graph.add_edge(timeline1, timeline2)
+    return graph
+
+
+def random_subjects(seed, n_subjects=8, n_timelines=10, horizon=60):
+    rng = random.Random(seed)
+    subjects = []
+    for _ in range(n_subjects):
+        # Timelines keyed in a different order in every subject, some of them empty
+        timelines = rng.sample(range(n_timelines), n_timelines)
+        subject = {}
+        for timeline in timelines:
+            starts = sorted(rng.sample(range(horizon), rng.randint(0, 3)))
+            subject[timeline] = [('a', start, start + rng.randint(0, 4)) for start in starts]
+        subjects.append(subject)
+    return subjects
+
+
+@pytest.mark.parametrize('seed', range(10))
+def test_register_conflicts(seed):
+    subjects = random_subjects(seed)
+
+    graph = utils.register_conflicts(subjects)
+    expected = reference_conflicts(subjects)
+
+    assert 0 < expected.number_of_edges() < expected.number_of_nodes() * (expected.number_of_nodes() - 1) // 2
+    assert list(graph.nodes) == list(expected.nodes)
+    assert list(graph.edges) == list(expected.edges)
+    assert {node: list(graph.adj[node]) for node in graph} == {node: list(expected.adj[node]) for node in expected}
+
+
+# Check that events sharing an instant are in conflict, and that events of the same timeline never are
+def test_overlapping_timelines():
+    subject = {'x': [('a', 0, 2), ('a', 2, 4)], 'y': [('b', 4, 5)], 'z': [('c', 6, 7)], 'w': []}
+
+    assert utils.overlapping_timelines(subject) == {(0, 1)}
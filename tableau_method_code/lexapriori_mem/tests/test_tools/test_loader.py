@@ -0,0 +1,47 @@
+from lexapriori_mem.tools import loader
+from lexapriori_mem.lex.lex_mem import memLexRepr
+import pytest
+
+pd = pytest.importorskip('pandas')
+
+
+def write_files(path):
+    rows = {
+        'calories': [(1, 'calories_1_x', '2020-01-01 00:00:00', '2020-01-01 00:10:00'),
+                     (1, 'calories_1_x', '2020-01-01 00:00:00', '2020-01-01 00:10:00'),
+                     (2, 'calories_2_y', '2020-01-02 00:00:00', '2020-01-02 00:05:00')],
+        'steps': [(2, 'steps_0_z', '2020-01-02 00:01:00', '2020-01-02 00:03:00')],
+        'distance': [],
+        'heart_rate': [],
+        'exercise': [(1, 'walk', '2020-01-01 00:05:00', '2020-01-01 00:20:00')],
+        'sleep': [],
+    }
+    for name, values in rows.items():
+        pd.DataFrame(values, columns=['transaction', 'cluster', 'begin', 'end']).to_csv(path / f'{name}.csv', index=False)
+
+
+# Check timelines, labels and timestamps of loaded transactions
+def test_load_transactions(tmp_path):
+    write_files(tmp_path)
+    start = pd.Timestamp('2020-01-01').timestamp()
+
+    # Timelines are caloriesB, caloriesC, exercise, stepsA
+    assert loader.load_transactions(tmp_path) == [
+        {0: [('caloriesB', start, start + 600)], 1: [], 2: [('walk', start + 300, start + 1200)], 3: []},
+        {0: [], 1: [('caloriesC', start + 86400, start + 86700)], 2: [], 3: [('stepsA', start + 86460, start + 86580)]},
+    ]
+
+
+def test_load_dataset(tmp_path):
+    write_files(tmp_path)
+
+    assert loader.load_dataset(tmp_path) == [
+        memLexRepr([['S_caloriesB', '_', '_', '_'],
+                    ['I_caloriesB', '_', 'S_walk', '_'],
+                    ['E_caloriesB', '_', 'I_walk', '_'],
+                    ['_', '_', 'E_walk', '_']]),
+        memLexRepr([['_', 'S_caloriesC', '_', '_'],
+                    ['_', 'I_caloriesC', '_', 'S_stepsA'],
+                    ['_', 'I_caloriesC', '_', 'E_stepsA'],
+                    ['_', 'E_caloriesC', '_', '_']]),
+    ]
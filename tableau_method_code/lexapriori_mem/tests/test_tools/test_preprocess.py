@@ -0,0 +1,81 @@
+from lexapriori_mem.tools.random_data_generator import generate_data
+from lexapriori_mem.tools import preprocess as preprocess
+import pytest
+import copy
+
+
+# Check conversion of intervals into words
+def test_intervals_to_words():
+    intervals = preprocess.dict_to_list(preprocess.data_to_intervals(
+        {0: [('a', 2), ('b', 3)], 1: [('c', 1), (None, 1), ('c', 2)]}))
+
+    assert intervals == [(0, [('a', 0, 2), ('b', 2, 5)]), (1, [('c', 0, 1), ('c', 2, 4)])]
+    assert preprocess.intervals_to_words(intervals) == [['S_a', 'S_c'],
+                                                        ['I_a', 'E_c'],
+                                                        ['S_b', 'S_c'],
+                                                        ['I_b', 'E_c'],
+                                                        ['E_b', '_']]
+
+
+def test_intervals_to_words_empty():
+    assert preprocess.intervals_to_words([(0, []), (1, [])]) == []
+
+
+# Check that the input is left untouched
+@pytest.mark.parametrize("seed", range(5))
+def test_intervals_to_words_input(seed):
+    intervals = preprocess.dict_to_list(preprocess.data_to_intervals(generate_data(3, 5, ['a', 'b', None], seed)))
+    expected = copy.deepcopy(intervals)
+
+    first = preprocess.intervals_to_words(intervals)
+    assert intervals == expected
+    assert preprocess.intervals_to_words(intervals) == first
+
+
+# Check bulk conversion, with and without workers
+@pytest.mark.parametrize("workers", [None, 2])
+def test_transactions_to_words(workers):
+    transactions = [preprocess.dict_to_list(preprocess.data_to_intervals(generate_data(3, 4, ['a', 'b'], i)))
+                    for i in range(10)]
+
+    assert preprocess.transactions_to_words(transactions, workers) == \
+        [preprocess.intervals_to_words(i) for i in transactions]
+
+
+XES_LOG = [[('a', '2011-01-01T08:00:00.000+01:00'), ('a', '2011-01-01T08:30:00.000+01:00'),
+            ('b', '2011-01-01T09:00:00.000+01:00'), ('c', '2011-01-01T09:10:00.000+01:00')],
+           [('b', '2011-01-01T06:55:00.000Z'), ('b', '2011-01-01T08:40:00.000+01:00')],
+           []]
+
+
+def write_xes(path, log=XES_LOG):
+    with open(path, 'w') as file:
+        file.write('<?xml version="1.0" encoding="UTF-8" ?>\n<log xes.version="1.0" xmlns="http://www.xes-standard.org/">\n')
+        file.write('<global scope="event"><string key="concept:name" value="__INVALID__"/></global>\n')
+        for index, trace in enumerate(log):
+            file.write(f'<trace><string key="concept:name" value="case {index}"/>\n')
+            for name, timestamp in trace:
+                file.write('<event>' + (f'<string key="concept:name" value="{name}"/>' if name else '') +
+                           (f'<date key="time:timestamp" value="{timestamp}"/>' if timestamp else '') + '</event>\n')
+            file.write('</trace>\n')
+        file.write('</log>\n')
+
+
+# Check that traces are streamed into the intervals of data_to_intervals
+def test_stream_xes(tmp_path):
+    write_xes(tmp_path / 'log.xes')
+
+    # Padded from the first timestamp of the log, the last event of a trace is dropped unless it ends a pair,
+    # empty traces are skipped
+    assert list(preprocess.stream_xes(str(tmp_path), 'log.xes')) == [
+        (0, [('a', 5, 35), ('b', 65, 66)]),
+        (1, [('b', 0, 45)])]
+
+
+# Check that events missing their name or timestamp are reported instead of shifting the others
+@pytest.mark.parametrize('event', [(None, '2011-01-01T08:00:00.000Z'), ('a', None)])
+def test_stream_xes_incomplete(tmp_path, event):
+    write_xes(tmp_path / 'log.xes', [XES_LOG[1], [XES_LOG[0][0], event]])
+
+    with pytest.raises(ValueError, match='Event 1 of trace 1'):
+        list(preprocess.stream_xes(str(tmp_path), 'log.xes'))
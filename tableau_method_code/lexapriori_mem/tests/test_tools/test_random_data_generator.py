@@ -0,0 +1,73 @@
+from lexapriori_mem.tools import random_data_generator as generator
+from lexapriori_mem.tools import preprocess
+from lexapriori_mem.lex.lex_mem import memLexRepr
+from lexapriori_mem.lex import lex_store
+from collections import Counter
+import pytest
+
+
+def to_words(transaction):
+    return memLexRepr(preprocess.intervals_to_words(preprocess.dict_to_list(transaction)))
+
+
+def test_generate_transactions():
+    transactions = list(generator.generate_transactions(50, 3, labels=8, skew=1.5, horizon=200, seed=1))
+
+    assert transactions == list(generator.generate_transactions(50, 3, labels=8, skew=1.5, horizon=200, seed=1))
+    assert transactions != list(generator.generate_transactions(50, 3, labels=8, skew=1.5, horizon=200, seed=2))
+
+    for transaction in transactions:
+        assert sorted(transaction) == [0, 1, 2]
+        for events in transaction.values():
+            assert all(0 <= begin < end <= 200 for _, begin, end in events)
+            assert all(a[2] <= b[1] for a, b in zip(events, events[1:]))
+
+    # Labels follow the skew
+    counts = Counter(label for transaction in transactions for events in transaction.values() for label, _, _ in events)
+    assert counts['a'] > counts['b'] > counts['e']
+
+
+@pytest.mark.parametrize('density', [0.2, 0.8])
+def test_density(density):
+    transactions = generator.generate_transactions(100, 2, horizon=500, density=density, seed=0)
+    active = sum(end - begin for t in transactions for events in t.values() for _, begin, end in events)
+    assert abs(active / (100 * 2 * 500) - density) < 0.1
+
+
+# Planted patterns are found in at least the requested fraction of transactions
+def test_planted_patterns():
+    timelines = 3
+    patterns = [(generator.random_pattern(3, timelines, ['x', 'y'], seed), support)
+                for seed, support in [(0, 0.3), (1, 0.6)]]
+    transactions = list(generator.generate_transactions(40, timelines, labels=5, patterns=patterns, seed=3))
+    planted = generator.plant_indexes(40, patterns, 3)
+
+    for (pattern, support), indexes in zip(patterns, planted):
+        itemset = to_words({t: pattern.get(t, []) for t in range(timelines)})
+        found = [i for i, transaction in enumerate(transactions) if itemset in to_words(transaction)]
+        assert len(indexes) == round(support * 40)
+        assert indexes <= set(found)
+
+
+def test_write_intervals(tmp_path):
+    transactions = list(generator.generate_transactions(5, 2, seed=0))
+    generator.write_intervals(tmp_path / 'dataset.jsonl', transactions)
+    assert generator.read_intervals(tmp_path / 'dataset.jsonl') == transactions
+
+
+def test_write_csv(tmp_path):
+    pytest.importorskip('pandas')
+    from lexapriori_mem.tools import loader
+
+    transactions = list(generator.generate_transactions(5, 3, density=0.9, seed=0))
+    generator.write_csv(tmp_path, transactions)
+
+    dataset = loader.load_dataset(tmp_path, features={}, states=[generator.timeline_name(t) for t in range(3)])
+    assert dataset == [to_words(transaction) for transaction in transactions]
+
+
+def test_write_binary(tmp_path):
+    transactions = list(generator.generate_transactions(5, 3, seed=0))
+    generator.write_binary(tmp_path, transactions)
+
+    assert list(lex_store.load_dataset(tmp_path)) == [to_words(transaction) for transaction in transactions]
@@ -1 +1 @@
-__all__ = ['preprocess', 'helper', 'random_data_generator']
\ No newline at end of file
+__all__ = ['preprocess', 'helper', 'random_data_generator', 'loader']
\ No newline at end of file
@@ -42,29 +42,49 @@ def reduce_intervals(intervals):
     return merged
 
 
+def overlapping_timelines(subject):
+    import heapq
+
+    # Events of every timeline, by start, with the position of their timeline
+    events = sorted((event[1], event[2], position)
+                    for position, timeline in enumerate(subject) for event in subject[timeline])
+
+    pairs = set()
+    # Ends of the events that started, and how many of them are still running on every timeline
+    ends = []
+    running = {}
+    for start, end, position in events:
+        # Events ending before this one starts can't overlap it nor the next ones
+        while ends and ends[0][0] < start:
+            _, ended = heapq.heappop(ends)
+            running[ended] -= 1
+            if running[ended] == 0:
+                del running[ended]
+
+        # Every other timeline with a running event is in conflict with this one
+        for other in running:
+            if other != position:
+                pairs.add((min(position, other), max(position, other)))
+
+        heapq.heappush(ends, (end, position))
+        running[position] = running.get(position, 0) + 1
+
+    return pairs
+
 def register_conflicts(subjects):
     import networkx as nx
 
-    # Crea un grafo diretto
     graph = nx.Graph()
 
-    # Aggiungi nodi al grafo per ogni timeline
-    for subject in subjects:
-        for timeline in subject:
-            graph.add_node(timeline)
+    # A node for every timeline, in the order they are found
+    graph.add_nodes_from(timeline for subject in subjects for timeline in subject)
 
-    # Verifica i conflitti tra le timeline
+    # Timelines with overlapping events are in conflict. Pairs are added in the order of the
+    # timelines in the subject, so that nodes and edges are iterated always in the same order
     for subject in subjects:
-        for timeline1 in subject:
-            for timeline2 in subject:
-                if timeline1 != timeline2:
-                    for event1 in subject[timeline1]:
-                        for event2 in subject[timeline2]:
-                            if event1[2] >= event2[1] and event1[1] <= event2[2]:
-                                # I due eventi si sovrappongono, c'è un conflitto
-                                graph.add_edge(timeline1, timeline2)
-
-    # Restituisci il grafo dei conflitti
+        timelines = list(subject)
+        graph.add_edges_from((timelines[i], timelines[j]) for i, j in sorted(overlapping_timelines(subject)))
+
     return graph
 
 def partition_conflicts(undirected_graph):
@@ -0,0 +1,88 @@
+import os
+
+from . import preprocess
+
+# Features whose clusters are split into a timeline each, with the number of parts of the cluster name to keep
+FEATURES = {'calories': 2, 'steps': 2, 'distance': 2, 'heart_rate': 3}
+# State variables using a single timeline each
+STATES = ('exercise', 'sleep')
+
+TIMESTAMP_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+# Labels can't contain '_' nor digits, see lex_encode
+LABEL_TABLE = str.maketrans({'_': '-', **{str(i): chr(ord('A') + i) for i in range(10)}})
+
+
+def sanitize_labels(labels):
+
+    # Translate every distinct label only once
+    codes, uniques = labels.factorize()
+    return uniques.map(lambda label: label.translate(LABEL_TABLE)).take(codes)
+
+def parse_timestamps(timestamps):
+    import pandas as pd
+
+    # Seconds since the epoch, as pd.Timestamp.timestamp() does for every single value
+    parsed = pd.to_datetime(timestamps, format=TIMESTAMP_FORMAT)
+    return parsed.astype('datetime64[ns]').astype('int64').to_numpy() / 10**9
+
+def read_timelines(path, features=FEATURES, states=STATES):
+    import pandas as pd
+
+    frames = []
+
+    # Every cluster of a feature is a timeline
+    for feature, parts in features.items():
+        frame = pd.read_csv(os.path.join(path, f'{feature}.csv'))
+        frame['cluster'] = frame.cluster.str.split('_').str[0:parts].str.join('')
+        frame['timeline'] = frame.cluster
+        frames.append(frame)
+
+    # Every state variable is a timeline
+    for state in states:
+        frame = pd.read_csv(os.path.join(path, f'{state}.csv'))
+        frame['timeline'] = state
+        frames.append(frame)
+
+    frame = pd.concat(frames, ignore_index=True)
+    # Duplicates are only searched inside the same timeline
+    frame = frame.drop_duplicates(ignore_index=True)
+
+    # Timelines are ordered as the files named after them
+    names = sorted(frame.timeline.unique(), key=lambda name: f'{name}.csv')
+    frame['timeline'] = frame.timeline.map({name: index for index, name in enumerate(names)})
+
+    return frame, names
+
+def load_transactions(path, features=FEATURES, states=STATES):
+    import numpy as np
+
+    frame, names = read_timelines(path, features, states)
+
+    labels = sanitize_labels(frame.cluster)
+    begins = parse_timestamps(frame.begin)
+    ends = parse_timestamps(frame.end)
+
+    # Transactions are ordered by the first timeline they appear in, then by name
+    first = frame.groupby('transaction').timeline.transform('min')
+    order = np.lexsort((frame.timeline.to_numpy(), frame.transaction.to_numpy(), first.to_numpy()))
+
+    transactions = {}
+    for transaction, timeline, label, begin, end in zip(frame.transaction.to_numpy()[order].tolist(),
+                                                        frame.timeline.to_numpy()[order].tolist(),
+                                                        np.asarray(labels)[order].tolist(),
+                                                        begins[order].tolist(),
+                                                        ends[order].tolist()):
+        if transaction not in transactions:
+            transactions[transaction] = {t: [] for t in range(len(names))}
+        transactions[transaction][timeline].append((label, begin, end))
+
+    return list(transactions.values())
+
+def load_dataset(path, features=FEATURES, states=STATES, workers=None):
+    from ..lex.lex_mem import memLexRepr
+
+    data = load_transactions(path, features, states)
+    words = preprocess.transactions_to_words([preprocess.dict_to_list(i) for i in data], workers)
+
+    return memLexRepr.from_many(words)
@@ -1,3 +1,5 @@
+import heapq
+
 from . import helper as utils
 
 def data_to_intervals(data):
@@ -46,69 +48,105 @@ def replace_current_event(current_events, parsed_data, i):
         current_events[i] = ()
 
 def intervals_to_words(data_intervals):
-    
-    # Extract next events
-    current_events = [()]*len(data_intervals)
-    [replace_current_event(current_events, data_intervals, i) for i in range(len(data_intervals))]    
-    # Keep track of which events are active (default none)
-    timelines_status = {data_intervals[i][0]: '_' for i in range(len(data_intervals))}
+
+    # Position of the current event of every timeline, the input is never modified
+    positions = [0]*len(data_intervals)
+
+    # Start and end times of the current events, as (time, timeline). Entries of
+    # replaced events are left in the heap and discarded when they come up
+    times = []
+
+    def current_event(i):
+        events = data_intervals[i][1]
+        return events[positions[i]] if positions[i] < len(events) else ()
+
+    def push_current_event(i):
+        event = current_event(i)
+        if event != ():
+            heapq.heappush(times, (event[1], i, positions[i]))
+            heapq.heappush(times, (event[2], i, positions[i]))
+
+    for i in range(len(data_intervals)):
+        push_current_event(i)
 
     # Check if there are no events
-    if current_events == [()]*len(data_intervals):
+    if len(times) == 0:
         return []
-    
+
+    # Value of every timeline in instants where nothing happens on it: Intermediate if an event is active
+    active = ['_']*len(data_intervals)
+    # Number of timelines that still have events
+    remaining = sum(current_event(i) != () for i in range(len(data_intervals)))
+
     # Prepare for the analysis starting from negative T and no instants
     lexical_representation = []
     next_t = -1
 
-    while not all(current_events[i] == () for i in range(len(current_events))):
-        
-        # Define current instant as empty, editing will be put in place by each timeline
-        instant_representation = ['_']*len(data_intervals)
+    while remaining != 0:
 
-        
-        # Get next interesting instant
-        next_t = min([j for j in [i[1] for i in current_events if i != ()] + [i[2] for i in current_events if i != ()] if j > next_t])
+        # Discard times already passed and entries of replaced events
+        while len(times) != 0 and (times[0][0] <= next_t or times[0][2] != positions[times[0][1]]):
+            heapq.heappop(times)
+        if len(times) == 0:
+            raise ValueError(f'Events do not advance after instant {next_t}')
 
-        # Cycles through each timeline
-        for i in range(len(data_intervals)):
+        # Get next interesting instant, and the timelines where something happens in it
+        next_t = times[0][0]
+        changed = set()
+        while len(times) != 0 and times[0][0] == next_t:
+            _, i, position = heapq.heappop(times)
+            if position == positions[i]:
+                changed.add(i)
+
+        # Timelines not involved keep their active event, if any
+        instant_representation = active.copy()
+
+        for i in changed:
+            event = current_event(i)
 
-            # There is no event, '_' is fine
-            if current_events[i] == ():
-                continue
-            
             # Check if this time instant is a start event
-            elif next_t == current_events[i][1]:
+            if next_t == event[1]:
                 # Place S_x
-                instant_representation[i] = f'S_{current_events[i][0]}'
+                instant_representation[i] = f'S_{event[0]}'
                 # Remember that event is active
-                timelines_status[data_intervals[i][0]] = current_events[i][0]
+                active[i] = f'I_{event[0]}'
 
                 # Check if skip E_ event
                 # If the end of this event is the same as the start of the next event
                 # Skip this event to replace this E_x with the next S_x
-                if len(data_intervals[i][1]) != 0 and current_events[i][2] == data_intervals[i][1][0][1]:
-                    replace_current_event(current_events, data_intervals, i)
-            
-            # Check if this time instant is a start event
-            elif next_t == current_events[i][2]:
+                events = data_intervals[i][1]
+                if positions[i] + 1 < len(events) and event[2] == events[positions[i] + 1][1]:
+                    positions[i] += 1
+                    push_current_event(i)
+
+            # Check if this time instant is an end event
+            elif next_t == event[2]:
                 # Place E_x
-                instant_representation[i] = f'E_{current_events[i][0]}'
+                instant_representation[i] = f'E_{event[0]}'
                 # Remember that event is not active
-                timelines_status[data_intervals[i][0]] = '_'
+                active[i] = '_'
                 # Update current event
-                replace_current_event(current_events, data_intervals, i)
-
-            # Check if this time instant does not involve this timeline
-            else:
-                # If timeline has an active event, place I_x
-                if timelines_status[data_intervals[i][0]] != '_':
-                    instant_representation[i] = f'I_{timelines_status[data_intervals[i][0]]}'
-                    
+                positions[i] += 1
+                push_current_event(i)
+                if current_event(i) == ():
+                    remaining -= 1
+
         # Add instant to representation
         lexical_representation.append(instant_representation)
     return lexical_representation
 
+def transactions_to_words(transactions, workers=None):
+
+    # Convert every transaction, in a pool of processes if requested
+    if workers is None or workers <= 1:
+        return [intervals_to_words(i) for i in transactions]
+
+    from concurrent.futures import ProcessPoolExecutor
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        return list(executor.map(intervals_to_words, transactions,
+                                 chunksize=max(1, len(transactions) // (workers * 4))))
+
 def data_to_words(data):
 
     # Turn data into intervals (could possibily be skipped)
@@ -121,7 +159,82 @@ def import_xes(path = '', file = ''):
     import pm4py
     log = pm4py.read_xes(path+'/'+file)
     return pm4py.convert_to_event_log(log)
-    
+
+
+def iter_xes_traces(filename):
+    import datetime
+    import xml.etree.ElementTree as ET
+
+    # Tags without the XES namespace, if any
+    def local(tag):
+        return tag.rsplit('}', 1)[-1]
+
+    # ISO 8601 timestamps, fromisoformat only accepts the Z suffix since Python 3.11
+    def timestamp(value):
+        if value.endswith('Z'):
+            value = value[:-1] + '+00:00'
+        return datetime.datetime.fromisoformat(value)
+
+    root = None
+    trace = None
+    trace_index = 0
+    for action, element in ET.iterparse(filename, events=('start', 'end')):
+        if root is None:
+            root = element
+        tag = local(element.tag)
+
+        if action == 'start':
+            if tag == 'trace':
+                trace = []
+            continue
+
+        # Events are read once complete, as (name, timestamp). Dropping one would shift the others
+        if tag == 'event' and trace is not None:
+            attributes = {child.get('key'): child.get('value') for child in element}
+            if 'concept:name' not in attributes or 'time:timestamp' not in attributes:
+                raise ValueError(f'Event {len(trace)} of trace {trace_index} has no concept:name or time:timestamp')
+            trace.append((attributes['concept:name'], timestamp(attributes['time:timestamp'])))
+            element.clear()
+        elif tag == 'trace':
+            if trace:
+                yield trace
+            trace = None
+            trace_index += 1
+            # Drop the parsed traces, so that memory doesn't grow with the log
+            root.clear()
+
+def trace_to_events(trace, start_time):
+
+    # Whole minutes between two timestamps
+    def minutes(begin, end):
+        return (end - begin).total_seconds()//60
+
+    events = [(None, minutes(start_time, trace[0][1]))]
+    event_index = 0
+    while event_index < len(trace)-1:
+        # Two consecutive events with the same name are the start and the end of a single one
+        if trace[event_index][0] == trace[event_index+1][0]:
+            events.append((trace[event_index][0], minutes(trace[event_index][1], trace[event_index+1][1])))
+            event_index += 1
+            if event_index < len(trace)-1:
+                events.append((None, minutes(trace[event_index][1], trace[event_index+1][1])))
+            event_index += 1
+        else:
+            events.append((trace[event_index][0], 1))
+            events.append((None, minutes(trace[event_index][1], trace[event_index+1][1])))
+            event_index += 1
+
+    return events
+
+def stream_xes(path = '', file = ''):
+    filename = path+'/'+file
+
+    # Every trace starts from the first timestamp of the log, found with a first pass
+    start_time = min((trace[0][1] for trace in iter_xes_traces(filename)), default=None)
+
+    # Yield the intervals of every trace, as data_to_intervals does for the whole log
+    for trace_index, trace in enumerate(iter_xes_traces(filename)):
+        yield trace_index, data_to_intervals({trace_index: trace_to_events(trace, start_time)})[trace_index]
 
 
 def import_fluxicon(path = '', file = 'PurchasingExample.xes'):
@@ -132,28 +245,8 @@ def import_fluxicon(path = '', file = 'PurchasingExample.xes'):
     else:
         path += 'Datasets/Fluxicon/'
 
-    # Import XES file
-    log = import_xes(path, file)
-
-    # Convert to dictionary
-    events = {}
-    start_time = min([log[trace][0]['time:timestamp'] for trace in range(len(log))])
-    for trace in range(len(log)):
-        events[trace] = []
-        events[trace].append((None, (log[trace][0]['time:timestamp'] - start_time).total_seconds()//60))
-        event_index = 0
-        while event_index < len(log[trace])-1:
-            if log[trace][event_index]['concept:name'] == log[trace][event_index+1]['concept:name']:
-                events[trace].append((log[trace][event_index]['concept:name'], (log[trace][event_index+1]['time:timestamp'] - log[trace][event_index]['time:timestamp']).total_seconds()//60))
-                event_index += 1
-                events[trace].append((None, (log[trace][event_index+1]['time:timestamp'] - log[trace][event_index]['time:timestamp']).total_seconds()//60))
-                event_index += 1
-            else:
-                events[trace].append((log[trace][event_index]['concept:name'], 1))
-                events[trace].append((None, (log[trace][event_index+1]['time:timestamp'] - log[trace][event_index]['time:timestamp']).total_seconds()//60))
-                event_index += 1
-
-    events = data_to_intervals(events)
+    # Stream the XES file, one trace at a time
+    events = dict(stream_xes(path, file))
     # Calculate how many timelines are needed
     event_names = list(set([event[0] for trace in events.values() for event in trace]))
     
@@ -1,4 +1,9 @@
 
+import csv
+import datetime
+import itertools
+import json
+import os
 import random
 
 def generate_data(num_tables, num_cols, col_values, seed):
@@ -19,4 +24,148 @@ def generate_event(timeline, seed, events):
     eventname = random.choice(events)
     start = random.randint(0, 10)
     end = random.randint(start+1, 20)
-    return (timeline, eventname, (start, end))
\ No newline at end of file
+    return (timeline, eventname, (start, end))
+
+# Scalable synthetic datasets, see generate_transactions
+
+# Start of the time axis when writing timestamps
+SYNTHETIC_START = datetime.datetime(2020, 1, 1)
+
+def label_name(index):
+    # a, b, ..., z, ba, bb, ... only letters are valid labels, see lex_encode
+    name = ''
+    while True:
+        name = chr(ord('a') + index % 26) + name
+        index //= 26
+        if index == 0:
+            return name
+
+def zipf_labels(count, skew=1.0):
+    # Label k is drawn with probability proportional to 1/(k+1)^skew, 0 gives uniform labels
+    labels = [label_name(i) for i in range(count)]
+    weights = [1 / (i + 1) ** skew for i in range(count)]
+    return labels, weights
+
+def uniform_duration(low=1, high=10):
+    return lambda rng: rng.randint(low, high)
+
+def exponential_duration(mean=5):
+    return lambda rng: max(1, round(rng.expovariate(1 / mean)))
+
+def generate_timeline(rng, horizon, labels, cum_weights, duration, density):
+    # Events of a timeline, active about density of the time
+    events = []
+    t = 0
+    while True:
+        length = duration(rng)
+        if t + length > horizon:
+            return events
+        label = rng.choices(labels, cum_weights=cum_weights)[0]
+        events.append((label, t, t + length))
+
+        # Gaps average length*(1-density)/density, so that events cover about density of the horizon
+        t += length + round(length * (1 - density) / density * rng.uniform(0, 2))
+
+def random_pattern(events, timelines, labels, seed, duration=uniform_duration()):
+    # Pattern of the given number of events, with times starting from 0, see plant_pattern
+    rng = random.Random(seed)
+    pattern = {}
+    for _ in range(events):
+        timeline = rng.randrange(timelines)
+        # Contiguous events of a timeline have no End in the lexical representation, leave a gap
+        begin = pattern[timeline][-1][2] + rng.randint(1, 3) if timeline in pattern else rng.randint(0, 5)
+        length = duration(rng)
+        pattern.setdefault(timeline, []).append((rng.choice(labels), begin, begin + length))
+    return pattern
+
+def pattern_span(pattern):
+    return max(end for events in pattern.values() for _, _, end in events)
+
+def plant_pattern(transaction, pattern, offset):
+    # Replace whatever happens in the window of the pattern with its events, on the timelines it uses
+    end = offset + pattern_span(pattern)
+    for timeline, events in pattern.items():
+        kept = [e for e in transaction[timeline] if e[2] <= offset or e[1] >= end]
+        shifted = [(label, begin + offset, finish + offset) for label, begin, finish in events]
+        transaction[timeline] = sorted(kept + shifted, key=lambda e: e[1])
+    return transaction
+
+def plant_indexes(transactions, patterns, seed):
+    # Transactions receiving every pattern, as a list of sets in the order of patterns
+    rng = random.Random(f'{seed}-planted')
+    return [set(rng.sample(range(transactions), round(support * transactions))) for _, support in patterns]
+
+def generate_transactions(transactions, timelines, labels=10, skew=1.0, horizon=100, duration=uniform_duration(),
+                          density=0.5, patterns=(), seed=0):
+    # Yield transactions as dicts of timelines with (label, begin, end) events, as data_to_intervals does.
+    # labels is either a number of labels drawn with a Zipf-like skew, or a (labels, weights) pair.
+    # patterns is a list of (pattern, support): every pattern is planted in that fraction of the transactions,
+    # so its support is at least the given one.
+    if not 0 < density <= 1:
+        raise ValueError(f'Density must be in (0, 1], got {density}')
+    spans = [pattern_span(pattern) for pattern, _ in patterns]
+    if sum(spans) > horizon or any(max(pattern) >= timelines for pattern, _ in patterns):
+        raise ValueError('Patterns must fit together in the horizon and in the timelines of the transactions')
+
+    names, weights = zipf_labels(labels, skew) if isinstance(labels, int) else labels
+    cum_weights = list(itertools.accumulate(weights))
+    planted = plant_indexes(transactions, patterns, seed)
+
+    for index in range(transactions):
+        rng = random.Random(f'{seed}-{index}')
+        transaction = {t: generate_timeline(rng, horizon, names, cum_weights, duration, density) for t in range(timelines)}
+
+        # Patterns planted in the same transaction get disjoint windows, so that they don't overwrite each other
+        chosen = [i for i, indexes in enumerate(planted) if index in indexes]
+        cuts = sorted(rng.randint(0, horizon - sum(spans[i] for i in chosen)) for _ in chosen)
+        offset = 0
+        for i, cut in zip(chosen, cuts):
+            plant_pattern(transaction, patterns[i][0], offset + cut)
+            offset += spans[i]
+
+        yield transaction
+
+def write_intervals(path, transactions):
+    # One JSON list of timelines per line, each one a list of [label, begin, end]
+    with open(path, 'w') as file:
+        for transaction in transactions:
+            file.write(json.dumps([transaction[t] for t in sorted(transaction)]) + '\n')
+
+def read_intervals(path):
+    with open(path) as file:
+        return [{t: [tuple(e) for e in events] for t, events in enumerate(json.loads(line))} for line in file]
+
+def timeline_name(timeline):
+    # Timelines are ordered by file name when loaded, see loader.read_timelines
+    return f'timeline{label_name(timeline)}'
+
+def write_csv(path, transactions):
+    # One file per timeline in the format of tools.loader, to be read with
+    # loader.load_dataset(path, features={}, states=[timeline_name(t) for t in range(timelines)])
+    from .loader import TIMESTAMP_FORMAT
+
+    os.makedirs(path, exist_ok=True)
+    files = {}
+    try:
+        for index, transaction in enumerate(transactions):
+            for timeline, events in transaction.items():
+                if timeline not in files:
+                    files[timeline] = open(os.path.join(path, f'{timeline_name(timeline)}.csv'), 'w', newline='')
+                    csv.writer(files[timeline]).writerow(['transaction', 'cluster', 'begin', 'end'])
+                writer = csv.writer(files[timeline])
+                for label, begin, end in events:
+                    writer.writerow([index, label,
+                                     (SYNTHETIC_START + datetime.timedelta(seconds=begin)).strftime(TIMESTAMP_FORMAT),
+                                     (SYNTHETIC_START + datetime.timedelta(seconds=end)).strftime(TIMESTAMP_FORMAT)])
+    finally:
+        for file in files.values():
+            file.close()
+
+def write_binary(path, transactions, workers=None):
+    # Dataset in the format of lex.lex_store, to be read with lex_store.load_dataset
+    from . import preprocess
+    from ..lex import lex_store
+    from ..lex.lex_mem import memLexRepr
+
+    words = preprocess.transactions_to_words([preprocess.dict_to_list(t) for t in transactions], workers)
+    lex_store.save_dataset(path, memLexRepr.from_many(words))
@@ -1,3 +1,4 @@
 from setuptools import setup, find_packages
 
-setup(name='lexapriori_mem', version='1.1', packages=['lexapriori_mem'])
\ No newline at end of file
+setup(name='lexapriori_mem', version='1.1', packages=find_packages(),
+      entry_points={'console_scripts': ['lexapriori=lexapriori_mem.cli:main']})